@@ -21,6 +21,7 @@ GMAS 数据收集系统 - 统一模块化入口
 1. **数据收集模式**：
    - 基本用法：``python __main__.py --date 20250830``
    - 使用今天日期：``python __main__.py``
+   - 批量补收：``python __main__.py --date-range 20250801 20250831``
 
 2. **文件监控模式**：
    - 基本监控：``python __main__.py --monitor``
@@ -55,6 +56,7 @@ import logging
 import argparse
 import cProfile
 import pstats
+import subprocess
 from datetime import datetime, timedelta
 from pathlib import Path
 
@@ -87,12 +89,23 @@ from __init__ import __version__, APP_FULL_VERSION, SYSTEM_TITLE
 from config import ConfigManager
 
 # 导入核心模块
-from core.mapsheet import CurrentDateFiles
+# 图幅处理、报告和监控模块依赖 lxml、numpy、GDAL、openpyxl 等, 在运行模式确定后才导入,
+# 使 --help 和参数错误提示不必等待这些依赖加载
 from core.data_models import DateType
-from core.reports import DataSubmition
-from core.monitor import MonitorManager
 from display import ReportDisplay
 
+# 各运行模式启动时导入的模块, 供 --profile-startup 测量导入耗时
+STARTUP_IMPORTS = {
+    'collection': [
+        'from core.mapsheet import CurrentDateFiles, FileOperationHelper',
+        'from core.reports import DataSubmition',
+    ],
+    'monitor': [
+        'from core.mapsheet import CurrentDateFiles',
+        'from core.monitor import MonitorManager',
+    ],
+}
+
 # ============================================================================
 # 全局配置和初始化
 # ============================================================================
@@ -378,6 +391,7 @@ def validate_time(time_str, time_format="%H%M%S"):
    - ``--dry-run``：模拟运行模式
    - ``--debug``：调试模式
    - ``--profile``：性能分析模式
+   - ``--profile-startup``：统计启动时各模块的导入耗时
 
 参数验证：
 ---------
@@ -432,6 +446,7 @@ def parse_args():
                     python __main__.py --date 20250830
                     python __main__.py --date=2025-08-30
                     python __main__.py                          # 使用今天日期
+                    python __main__.py --date-range 20250801 20250831   # 按日期顺序批量补收
                     
                 文件监控模式:
                     python __main__.py --monitor
@@ -468,6 +483,13 @@ def parse_args():
         help="收集数据的目标日期。支持多种格式: YYYYMMDD, YYYY-MM-DD, YYYY/MM/DD 等 (默认: 今天)"
     )
     
+    main_group.add_argument(
+        "--date-range",
+        nargs=2,
+        metavar=("START", "END"),
+        help="批量收集起止日期（含）内的每一天，按日期顺序处理并共享解析结果。日期格式同 --date"
+    )
+    
     main_group.add_argument(
         "--monitor",
         action='store_true',
@@ -606,6 +628,12 @@ def parse_args():
         help="启用性能分析模式"
     )
     
+    debug_group.add_argument(
+        "--profile-startup",
+        action='store_true',
+        help="统计当前运行模式启动时各模块的导入耗时（python -X importtime），不执行数据收集"
+    )
+    
     # 解析参数
     args = parser.parse_args()
     
@@ -615,6 +643,9 @@ def parse_args():
     if args.verbose and args.quiet:
         parser.error("--verbose 和 --quiet 不能同时使用")
     
+    if args.date_range and args.monitor:
+        parser.error("--date-range 不能与监控模式 (--monitor) 同时使用")
+    
     # 监控模式参数验证
     if args.endtime and not args.monitor:
         parser.error("--endtime 只能在监控模式 (--monitor) 下使用")
@@ -642,6 +673,11 @@ def parse_args():
         if args.date != datetime.now().strftime("%Y%m%d"):  # 如果不是默认值
             validate_date(args.date)  # 仅验证，不转换
         
+        if args.date_range:
+            start_date, end_date = (validate_date(date_str) for date_str in args.date_range)
+            if start_date.date_datetime > end_date.date_datetime:
+                raise ValueError(f"起始日期晚于结束日期: {args.date_range[0]} > {args.date_range[1]}")
+        
         # 验证时间格式
         if args.endtime:
             validate_time(args.endtime)  # 仅验证，不转换
@@ -774,6 +810,8 @@ class DataCollector:
         .. note::
            该方法使用 try-catch 结构确保异常被正确处理和记录。
         """
+        from core.mapsheet import CurrentDateFiles
+
         try:
             collection = CurrentDateFiles(self.collection_date)
             
@@ -972,6 +1010,8 @@ class DataCollector:
             print(f'\n今天是{weekday_name}, 需要生成周报\n')
             logger.info("今天是数据提交日，生成周报告...")
             
+            from core.reports import DataSubmition
+
             try:
                 submitter = DataSubmition(self.collection_date, collection.allPoints)
                 if submitter.weeklyPointToShp():
@@ -1086,6 +1126,78 @@ def collect_data(date_str: str = None, args=None):
         return 1
 
 
+def collect_date_range(start_str: str, end_str: str, args=None):
+    """批量数据收集模式
+    
+    按日期顺序依次收集起止日期（含）内每一天的数据。
+    
+    整个批次在同一进程中运行，因此：
+    
+    1. **共享状态**：
+       - 图幅信息表、微信文件夹的文件名索引和KMZ解析缓存只加载一次
+       - 前一天解析的当日文件即为后一天的"上一次"文件，直接复用解析结果
+    
+    2. **内存控制**：
+       - 每处理完一天，只保留当天文件的解析结果，并释放该日期的集合实例
+    
+    :param start_str: 起始日期字符串
+    :type start_str: str
+    :param end_str: 结束日期字符串（含）
+    :type end_str: str
+    :param args: 命令行参数对象，控制收集行为
+    :type args: argparse.Namespace, optional
+    
+    :return: 执行状态码，0表示全部成功，1表示存在失败的日期
+    :rtype: int
+    
+    :example:
+        >>> result = collect_date_range("20250801", "20250831")
+    """
+    try:
+        start_date = validate_date(start_str)
+        end_date = validate_date(end_str)
+    except ValueError as ve:
+        logger.error(f"日期验证失败: {ve}")
+        print(f"日期验证失败: {ve}")
+        return 1
+    
+    from core.mapsheet import CurrentDateFiles, FileOperationHelper
+
+    failed_dates = []
+    FileOperationHelper.enable_placemarks_memo()
+    try:
+        day = start_date.date_datetime
+        while day <= end_date.date_datetime:
+            current_date = DateType(date_datetime=day)
+            logger.info(f"开始数据收集 - 日期: {current_date.yyyymmdd_str}")
+            
+            try:
+                if not DataCollector(current_date, args)():
+                    failed_dates.append(current_date.yyyymmdd_str)
+                # 收集失败时当天的实例可能尚未创建, 此时不重新收集，保留已有的解析结果
+                collection = CurrentDateFiles.get_existing_instance(current_date)
+                if collection is not None:
+                    # 只保留当天文件的解析结果，供下一天作为上一次文件使用
+                    FileOperationHelper.retain_placemarks_memo(
+                        mapsheet.currentfilepath or mapsheet.lastfilepath
+                        for mapsheet in collection.currentDateFiles
+                        if mapsheet.currentfilepath or mapsheet.lastfilepath
+                    )
+                CurrentDateFiles.release_instance(current_date)
+            except Exception as e:
+                logger.error(f"数据收集失败 {current_date.yyyymmdd_str}: {e}")
+                failed_dates.append(current_date.yyyymmdd_str)
+            
+            day += timedelta(days=1)
+    finally:
+        FileOperationHelper.enable_placemarks_memo(False)
+    
+    if failed_dates:
+        print(f"以下日期的数据收集失败: {', '.join(failed_dates)}")
+        return 1
+    return 0
+
+
 def start_monitoring(date_str: str = None, endtime_str: str = None, args=None):
     """启动文件监控服务
     
@@ -1152,6 +1264,8 @@ def start_monitoring(date_str: str = None, endtime_str: str = None, args=None):
             end_datetime = config_manager.get_monitor_endtime()
         
         # 创建监控管理器
+        from core.monitor import MonitorManager
+
         monitor_manager = MonitorManager(
             current_date=current_date,
             enable_fuzzy_matching=config['monitoring']['enable_fuzzy_matching'],
@@ -1275,6 +1389,10 @@ def main():
         # ========== 日志配置 ==========
         setup_logging(args)
         
+        # ========== 启动耗时分析 ==========
+        if args.profile_startup:
+            return 0 if profile_startup(args) else 1
+        
         # ========== 配置管理 ==========
         setup_config(args)
         
@@ -1322,6 +1440,59 @@ def main():
         return 1
 
 
+def profile_startup(args, top: int = 20):
+    """统计运行模式启动时各模块的导入耗时
+    
+    在子进程中以 ``python -X importtime`` 导入该运行模式需要的模块，
+    解析标准错误输出中的导入耗时，按累计耗时列出最慢的模块。
+    
+    :param args: 命令行参数对象
+    :type args: argparse.Namespace
+    :param top: 显示的模块数量
+    :type top: int
+    
+    :return: 分析是否成功
+    :rtype: bool
+    
+    :example:
+        >>> profile_startup(parse_args())  # python __main__.py --profile-startup --monitor
+    """
+    mode = 'monitor' if args.monitor else 'collection'
+    code = '\n'.join(['import __init__', 'import config'] + STARTUP_IMPORTS[mode])
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', code],
+        cwd=str(project_root), capture_output=True, text=True, encoding='utf-8', errors='replace'
+    )
+    if result.returncode != 0:
+        error_lines = [line for line in result.stderr.splitlines() if not line.startswith('import time:')]
+        print("导入失败:\n" + '\n'.join(error_lines[-5:]))
+        return False
+    
+    # 每行格式: "import time: <self us> | <cumulative us> | <缩进表示层级的模块名>"
+    timings = []
+    total_us = 0
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:'):
+            continue
+        fields = line[len('import time:'):].split('|')
+        if len(fields) != 3 or not fields[0].strip().isdigit():
+            continue
+        self_us, cumulative_us = int(fields[0]), int(fields[1])
+        name = fields[2].rstrip()
+        # 没有缩进的是顶层导入, 其累计耗时之和即总导入耗时
+        if not name.startswith('  '):
+            total_us += cumulative_us
+        timings.append((cumulative_us, self_us, name.strip()))
+    
+    timings.sort(reverse=True)
+    print(f"\n启动导入耗时（运行模式: {'文件监控' if mode == 'monitor' else '数据收集'}）")
+    print(f"{'累计(ms)':>10} {'自身(ms)':>10}  模块")
+    for cumulative_us, self_us, name in timings[:top]:
+        print(f"{cumulative_us / 1000:>10.1f} {self_us / 1000:>10.1f}  {name}")
+    print(f"导入总耗时: {total_us / 1000:.1f} ms, 共 {len(timings)} 个模块")
+    return True
+
+
 def setup_logging(args):
     """根据参数设置日志配置
     
@@ -1577,7 +1748,12 @@ def execute_collection_mode(args):
         
         if args.force_weekly:
             print(f" 强制生成周报告")
+        
+        if args.date_range:
+            print(f" 批量收集: {args.date_range[0]} 至 {args.date_range[1]}")
     
+    if args.date_range:
+        return collect_date_range(args.date_range[0], args.date_range[1], args)
     return collect_data(args.date, args)
 
 
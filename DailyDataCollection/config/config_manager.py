@@ -69,7 +69,7 @@ class ConfigManager:
         ]
         
         # 可选配置节
-        optional_sections = ['reports']
+        optional_sections = ['reports', 'performance']
         
         for section in required_sections:
             if section not in self._config:
@@ -286,6 +286,18 @@ class ConfigManager:
             )
             return fallback_path
     
+    def get_cache_directory(self, *subdirs: str) -> str:
+        """
+        获取缓存目录路径，支持模板解析，不存在时自动创建
+        
+        :param subdirs: 缓存目录下的子目录
+        :return: 缓存目录完整路径
+        """
+        template = self.get('performance.cache_directory') or '{workspace}\\.gmas_cache'
+        directory = os.path.join(self.resolve_path_template(template), *subdirs)
+        self._ensure_directory_exists(directory)
+        return directory
+    
     def _ensure_directory_exists(self, directory_path: str) -> bool:
         """
         确保目录存在，如果不存在则尝试创建
@@ -3,22 +3,24 @@
 
 包含系统中使用的各种数据模型类：
 - ObservationData: 观测数据模型
+- PointStore: 点要素列式存储
 - FileAttributes: 文件属性模型
 - DateType: 日期类型
 - DateIterator: 日期迭代器
+
+各名称在首次访问时才导入（DateType 不依赖 lxml 和 numpy）
 """
 
-try:
-    from .observation_data import ObservationData
-    from .file_attributes import FileAttributes
-    from .date_types import DateIterator, DateType
+from ..lazy_import import lazy_exports
+
+_EXPORTS = {
+    'ObservationData': '.observation_data',
+    'PointStore': '.point_store',
+    'FileAttributes': '.file_attributes',
+    'DateType': '.date_types',
+    'DateIterator': '.date_types',
+}
+
+__all__ = list(_EXPORTS)
 
-    __all__ = [
-        'ObservationData',
-        'FileAttributes', 
-        'DateType',
-        'DateIterator'
-    ]
-except ImportError as e:
-    print(f"导入数据模型模块时出错: {e}")
-    __all__ = []
+__getattr__, __dir__ = lazy_exports(__name__, _EXPORTS, globals())
@@ -6,8 +6,9 @@
 
 import os
 import time
-import hashlib
-from typing import Optional
+from typing import Optional, Tuple
+
+from ..utils.file_utils import compute_file_hash
 
 
 class FileAttributes:
@@ -25,6 +26,29 @@ class FileAttributes:
         self._data = None
         self._hashMD5 = None
         self._hashSHA265 = None
+        # 计算哈希值时文件的 (大小, 修改时间), 文件变化后重新计算
+        self._hash_stamp: Optional[Tuple[int, int]] = None
+
+    def _file_hash(self, algorithm: str) -> Optional[str]:
+        """
+        分块计算文件哈希值, 不保留文件内容
+
+        以文件大小和修改时间作为预检查, 文件未变化时直接返回已计算的哈希值
+        """
+        stat = os.stat(self._filepath)
+        stamp = (stat.st_size, stat.st_mtime_ns)
+        if stamp != self._hash_stamp:
+            self._hashMD5 = None
+            self._hashSHA265 = None
+            self._hash_stamp = stamp
+
+        if algorithm == 'md5':
+            if self._hashMD5 is None:
+                self._hashMD5 = compute_file_hash(self._filepath, 'md5')
+            return self._hashMD5
+        if self._hashSHA265 is None:
+            self._hashSHA265 = compute_file_hash(self._filepath, 'sha256')
+        return self._hashSHA265
 
     def __getattr__(self, name: str):
         """动态获取文件属性"""
@@ -67,26 +91,16 @@ class FileAttributes:
             return self._data
         elif name == 'hashMD5':
             if self._filepath:
-                if self._hashMD5 is None and self._data is None:
-                    # Read file content
-                    with open(self._filepath, 'rb') as file:
-                        self._data = file.read()
-                    self._hashMD5 = hashlib.md5(self._data).hexdigest()
+                return self._file_hash('md5')
             else:
                 print(f"File path is None, hashMD5 is None")
                 return None
-            return self._hashMD5
         elif name == 'hashSHA265':
             if self._filepath:
-                if self._hashSHA265 is None and self._data is None:
-                    # Read file content
-                    with open(self._filepath, 'rb') as file:
-                        self._data = file.read()
-                    self._hashSHA265 = hashlib.sha256(self._data).hexdigest()
+                return self._file_hash('sha256')
             else:
                 print(f"File path is None, hashSHA265 is None")
                 return None
-            return self._hashSHA265
         else:
             # print(f"AttributeError: {name} is not a valid attribute")
             return None
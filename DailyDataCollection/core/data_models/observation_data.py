@@ -4,12 +4,15 @@
 包含观测数据的处理和验证逻辑
 """
 
+import io
 import re
 import logging
 from dataclasses import dataclass, field
-from typing import Dict, List, Optional, Union
+from typing import Any, Dict, List, Optional, Union
 from lxml import etree
 
+from .point_store import PointStore
+
 # 创建 logger 实例
 logger = logging.getLogger('Observation Data')
 logger.setLevel(logging.ERROR)
@@ -18,6 +21,9 @@ formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(messag
 handler.setFormatter(formatter)
 logger.addHandler(handler)
 
+# KML 2.2 命名空间
+KML_NS = '{http://www.opengis.net/kml/2.2}'
+
 
 @dataclass
 class ObservationData:
@@ -27,6 +33,12 @@ class ObservationData:
     LONGITUDE_PATTERN = r'<td>Longitude</td>\s*<td>(-?\d+\.\d+)</td>'
     LATITUDE_PATTERN = r'<td>Latitude</td>\s*<td>(-?\d+\.\d+)</td>'
 
+    # 默认使用 iterparse 单次流式解析; 设为 False 时回退到完整 DOM 解析
+    STREAMING_PARSE = True
+    # 解析完成后将点要素转换为列式存储（PointStore）, 设为 False 时保留为字典
+    COMPACT_POINTS = True
+
+    # 点要素 {OBSID: {'longitude': 经度, 'latitude': 纬度}}, 可以是字典或只读的 PointStore
     points: Dict[str, Dict[str, float]] = field(default_factory=dict)
     pointsCount: int = 0
     routes: List[str] = field(default_factory=list)
@@ -37,74 +49,95 @@ class ObservationData:
     __errorMsg: List[str] = field(default_factory=list)
 
     kml_content: Optional[str] = None
+    # 可读取的KML数据流（文件对象或文件路径）, 用于流式解析而无需先读入整个KML内容
+    kml_source: Optional[Any] = None
 
     def __post_init__(self):
         """初始化后处理"""
-        if self.kml_content:
-            self.__getPoints()
-            self.__getRoutes()
+        if self.kml_source is not None or self.kml_content:
+            if self.kml_source is not None:
+                self.__parseStream(self.kml_source)
+            elif ObservationData.STREAMING_PARSE:
+                content = self.kml_content
+                if isinstance(content, str):
+                    content = content.encode('utf-8')
+                self.__parseStream(io.BytesIO(content))
+            else:
+                self.__getPoints()
+                self.__getRoutes()
             # 在解析KML内容后删除KML内容, 以释放内存
             del self.kml_content
+            del self.kml_source
             # 检查点号
             self.__pointCheck()
+            if ObservationData.COMPACT_POINTS:
+                self.points = PointStore.from_mapping(self.points)
+
+    @classmethod
+    def from_parsed(cls, points: Union[Dict[str, Dict[str, float]], PointStore], routes: List[str],
+                    errors: Optional[List[str]] = None) -> 'ObservationData':
+        """由已解析的数据（如缓存中的数据）直接构建观测数据对象, 不再重复解析KML"""
+        if ObservationData.COMPACT_POINTS:
+            points = PointStore.from_mapping(points)
+        data = cls(points=points, pointsCount=len(points), routes=routes, routesCount=len(routes))
+        if errors:
+            data.__errorMsg.extend(errors)
+        return data
+
+    def __parseStream(self, source: Any) -> None:
+        """
+        使用 lxml.etree.iterparse 单次流式解析KML
+
+        一次遍历同时提取点要素、描述信息和线要素, 每个 Placemark 处理完后立即清理,
+        避免为整个文档构建完整的DOM树
+        """
+        placemark_tag = f'{KML_NS}Placemark'
+        description_tag = f'{KML_NS}description'
+        # 与DOM解析保持一致: 属性表中的错误信息排在Label错误信息之后
+        description_errors: List[str] = []
+
+        context = etree.iterparse(
+            source,
+            events=('end',),
+            tag=(placemark_tag, description_tag),
+            encoding='utf-8',
+            recover=True,
+            huge_tree=True
+        )
+        for _, element in context:
+            if element.tag == description_tag:
+                self.__handleDescription(element, description_errors)
+                continue
+
+            self.__handlePlacemarkPoint(element)
+            self.__handlePlacemarkRoute(element)
+
+            # 清理已处理的 Placemark 及其之前的兄弟节点, 释放内存
+            element.clear(keep_tail=True)
+            parent = element.getparent()
+            if parent is not None:
+                while element.getprevious() is not None:
+                    del parent[0]
+        del context
+
+        self.__errorMsg.extend(description_errors)
+
+        # 合并两个字点典, 如果有重复的键, 则覆盖
+        self.points = {**self.__lablePoints, **self.__ospidPoints}
+        self.pointsCount = len(self.points)
+        self.routesCount = len(self.routes)
 
     def __getPoints(self) -> None: 
         """从KML内容中提取点要素, 包括OBSID、经度和纬度"""
         root = etree.fromstring(self.kml_content, parser=etree.XMLParser(encoding='utf-8',recover=True))
         
         # Step 1: 通过Point元素提取点要素
-        for placemark in root.findall('.//{http://www.opengis.net/kml/2.2}Placemark'):
-            point = placemark.find('.//{http://www.opengis.net/kml/2.2}Point')
-            if point is not None:
-                name = placemark.find('.//{http://www.opengis.net/kml/2.2}name')
-                if name is not None and name.text:
-                    obspid_pattern = re.compile(ObservationData.OSPID_PATTERN)
-                    if obspid_pattern.match(name.text):
-                        obspid = name.text
-                        coordinates = point.find('.//{http://www.opengis.net/kml/2.2}coordinates').text.split(',')
-                        longitude, latitude = coordinates[0], coordinates[1]
-                        if obspid and longitude and latitude:
-                            if not obspid in self.__lablePoints:
-                                self.__lablePoints[obspid] = {'longitude': float(longitude), 'latitude': float(latitude)}
-                            else:
-                                error = f"点要素{obspid}的Label中存在OBSID重复(The Lable of Point feature {obspid} is dupulicated)"
-                                self.__errorMsg.append(error)
-                    else:
-                        error = f"点要素{name.text}的标签格式不符合OBSID命名规范(The name pattern of the point feature '{name.text}' is not right)"
-                        self.__errorMsg.append(error)
+        for placemark in root.findall(f'.//{KML_NS}Placemark'):
+            self.__handlePlacemarkPoint(placemark)
 
         # Step 2: 通过Description元素提取点要素
-        for description in root.findall('.//{http://www.opengis.net/kml/2.2}description'):
-            if description is not None and description.text:
-                obspidPattern = re.compile(ObservationData.OSPID_PATTERN)
-                longitudePattern = re.compile(ObservationData.LONGITUDE_PATTERN)
-                latitudePattern = re.compile(ObservationData.LATITUDE_PATTERN)
-
-                obspid_match = obspidPattern.search(description.text)
-                longitude_match = longitudePattern.search(description.text)
-                latitude_match = latitudePattern.search(description.text)
-
-                obspid = obspid_match.group(0) if obspid_match else None
-                longitude = float(longitude_match.group(1)) if longitude_match else None
-                latitude = float(latitude_match.group(1)) if latitude_match else None
-
-                if obspid and longitude and latitude:
-                    if not obspid in self.__ospidPoints:
-                        self.__ospidPoints[obspid] = { 'longitude': longitude, 'latitude': latitude}
-                    else:
-                        error = f"点要素{obspid}的属性表中存在OBSID重复(Dupulicated point feature {obspid} in attributed table)"
-                        self.__errorMsg.append(error)
-
-                # 如果OBSID、经度和纬度中有一个为空, 则记录日志
-                if obspid and (not longitude and not latitude):
-                    error = f"点要素{obspid}的属性表中缺少经度值和纬度值(Missing Longtitude or Lattitude value in the attribue table of point feature {obspid})"
-                    self.__errorMsg.append(error)
-                elif obspid and not longitude and latitude:
-                    error = f"点要素{obspid}的属性表中缺少经度值(Missing Longtitude value in the attribue table of point feature {obspid})"
-                    self.__errorMsg.append(error)
-                elif obspid and longitude and not latitude:
-                    error = f"点要素{obspid}的属性表中缺少纬度值(Missing Lattitude value in the attribue table of point feature {obspid})"
-                    self.__errorMsg.append(error)
+        for description in root.findall(f'.//{KML_NS}description'):
+            self.__handleDescription(description, self.__errorMsg)
 
         # 合并两个字点典, 如果有重复的键, 则覆盖
         self.points = {**self.__lablePoints, **self.__ospidPoints}
@@ -113,14 +146,70 @@ class ObservationData:
     def __getRoutes(self) -> None:
         """从KML内容中提取路径要素"""
         root = etree.fromstring(self.kml_content, parser=etree.XMLParser(encoding='utf-8',recover=True))
-        for placemark in root.findall('.//{http://www.opengis.net/kml/2.2}Placemark'):
-            linestring = placemark.find('.//{http://www.opengis.net/kml/2.2}LineString')
-            if linestring is not None:
-                coordinates = linestring.find('.//{http://www.opengis.net/kml/2.2}coordinates')
-                if coordinates is not None:
-                    self.routes.append(coordinates.text.strip())
+        for placemark in root.findall(f'.//{KML_NS}Placemark'):
+            self.__handlePlacemarkRoute(placemark)
         self.routesCount = len(self.routes)
 
+    def __handlePlacemarkPoint(self, placemark) -> None:
+        """通过 Placemark 中的 Point 元素和名称提取点要素"""
+        point = placemark.find(f'.//{KML_NS}Point')
+        if point is None:
+            return
+        name = placemark.find(f'.//{KML_NS}name')
+        if name is not None and name.text:
+            if _OSPID_RE.match(name.text):
+                obspid = name.text
+                coordinates = point.find(f'.//{KML_NS}coordinates').text.split(',')
+                longitude, latitude = coordinates[0], coordinates[1]
+                if obspid and longitude and latitude:
+                    if not obspid in self.__lablePoints:
+                        self.__lablePoints[obspid] = {'longitude': float(longitude), 'latitude': float(latitude)}
+                    else:
+                        error = f"点要素{obspid}的Label中存在OBSID重复(The Lable of Point feature {obspid} is dupulicated)"
+                        self.__errorMsg.append(error)
+            else:
+                error = f"点要素{name.text}的标签格式不符合OBSID命名规范(The name pattern of the point feature '{name.text}' is not right)"
+                self.__errorMsg.append(error)
+
+    def __handleDescription(self, description, errors: List[str]) -> None:
+        """通过 description 元素中的属性表提取点要素"""
+        if description is None or not description.text:
+            return
+
+        obspid_match = _OSPID_RE.search(description.text)
+        longitude_match = _LONGITUDE_RE.search(description.text)
+        latitude_match = _LATITUDE_RE.search(description.text)
+
+        obspid = obspid_match.group(0) if obspid_match else None
+        longitude = float(longitude_match.group(1)) if longitude_match else None
+        latitude = float(latitude_match.group(1)) if latitude_match else None
+
+        if obspid and longitude and latitude:
+            if not obspid in self.__ospidPoints:
+                self.__ospidPoints[obspid] = { 'longitude': longitude, 'latitude': latitude}
+            else:
+                error = f"点要素{obspid}的属性表中存在OBSID重复(Dupulicated point feature {obspid} in attributed table)"
+                errors.append(error)
+
+        # 如果OBSID、经度和纬度中有一个为空, 则记录日志
+        if obspid and (not longitude and not latitude):
+            error = f"点要素{obspid}的属性表中缺少经度值和纬度值(Missing Longtitude or Lattitude value in the attribue table of point feature {obspid})"
+            errors.append(error)
+        elif obspid and not longitude and latitude:
+            error = f"点要素{obspid}的属性表中缺少经度值(Missing Longtitude value in the attribue table of point feature {obspid})"
+            errors.append(error)
+        elif obspid and longitude and not latitude:
+            error = f"点要素{obspid}的属性表中缺少纬度值(Missing Lattitude value in the attribue table of point feature {obspid})"
+            errors.append(error)
+
+    def __handlePlacemarkRoute(self, placemark) -> None:
+        """通过 Placemark 中的 LineString 元素提取线要素"""
+        linestring = placemark.find(f'.//{KML_NS}LineString')
+        if linestring is not None:
+            coordinates = linestring.find(f'.//{KML_NS}coordinates')
+            if coordinates is not None:
+                self.routes.append(coordinates.text.strip())
+
     def __pointCheck(self) -> bool:
         """检查点要素的完整性和连续性"""
         # 通过第self.points字典的键, 第6位解析组号并存储在字典中
@@ -188,7 +277,10 @@ class ObservationData:
         # 创建新的ObservationData对象
         new_file = ObservationData()
         # 合并点要素（相同的键进行了覆盖）
-        new_file.points = {**self.points, **other.points}
+        if ObservationData.COMPACT_POINTS or isinstance(self.points, PointStore) or isinstance(other.points, PointStore):
+            new_file.points = PointStore.concat([self.points, other.points])
+        else:
+            new_file.points = {**self.points, **other.points}
         new_file.pointsCount = len(new_file.points)
         # 合并线要素（列表相加并去重）
         new_file.routes = list(set(self.routes + other.routes))
@@ -206,20 +298,25 @@ class ObservationData:
             logger.error(error)
             return None
             
-        # 验证一个字典的键是否是另一个字典键的子集
-        if not (other.points.keys() <= self.points.keys()):
+        # 点要素的顺序减法, 差集只计算一次（PointStore 使用向量化的 np.isin）
+        if isinstance(self.points, PointStore):
+            diff_points = self.points.difference(other.points)
+        else:
+            diff_points = {
+                key: value for key, value in self.points.items() if key not in other.points
+            }
+
+        # 验证一个字典的键是否是另一个字典键的子集: 键唯一时, 交集大小等于 other 的大小即为子集
+        if len(self.points) - len(diff_points) != len(other.points):
             error = f"两个KML文件中的点要素不是另一个的子集"
             self.__errorMsg.append(error)
             logger.error(error)
             return new_file
 
-        # 点要素的顺序减法
-        new_file.points = {
-            key: value for key, value in self.points.items() if key not in other.points
-        }
+        new_file.points = diff_points
         
         # 根据字典中元素差异判断是否今日点有误
-        pointCount = len(set(self.points.keys())) - len(set(other.points.keys()))
+        pointCount = len(self.points) - len(other.points)
         if pointCount < 0:
             error = f"今日文件有误，点数少于上一天，今日增加点为负数: {pointCount}"
             self.__errorMsg.append(error)
@@ -228,12 +325,13 @@ class ObservationData:
 
         new_file.pointsCount = len(new_file.points)
 
-        # 线要素的顺序减法
-        new_file.routes = [route for route in self.routes if route not in other.routes]
+        # 线要素的顺序减法: 基于哈希集合查找, 每条线要素的坐标字符串只哈希一次
+        other_routes = frozenset(other.routes)
+        new_file.routes = [route for route in self.routes if route not in other_routes]
         new_file.routesCount = len(new_file.routes)
         
         return new_file
-    
+
     @property
     def errorMsg(self) -> Union[List[str], None]:
         """获取错误消息"""
@@ -244,3 +342,9 @@ class ObservationData:
                 return self.__errorMsg
         else:
             return [str(self.__errorMsg)] if self.__errorMsg else None
+
+
+# 预编译的正则表达式, 避免在每个元素上重复编译
+_OSPID_RE = re.compile(ObservationData.OSPID_PATTERN)
+_LONGITUDE_RE = re.compile(ObservationData.LONGITUDE_PATTERN)
+_LATITUDE_RE = re.compile(ObservationData.LATITUDE_PATTERN)
@@ -0,0 +1,170 @@
+"""
+点要素列式存储模块
+
+以数组形式保存观测点: OBSID 为字符串数组, 经度和纬度为 float64 数组,
+相比每个点一个字典的表示方式显著减少内存占用, 并支持向量化的合并与差集运算
+"""
+
+import os
+from collections.abc import Mapping
+from typing import Dict, Iterable, Iterator, Optional, Tuple
+
+import numpy as np
+
+
+class PointStore(Mapping):
+    """
+    观测点的列式存储
+
+    实现 Mapping 接口, 对现有调用方表现为 {OBSID: {'longitude': 经度, 'latitude': 纬度}} 的只读字典;
+    按键取值时才临时构建坐标字典, OBSID 到行号的索引在首次按键访问时才建立
+    """
+
+    __slots__ = ('_obsids', '_longitudes', '_latitudes', '_index')
+
+    def __init__(self, obsids: Iterable[str] = (), longitudes: Iterable[float] = (),
+                 latitudes: Iterable[float] = ()):
+        obsids = np.asarray(obsids if isinstance(obsids, np.ndarray) else list(obsids), dtype=str)
+        longitudes = np.asarray(longitudes, dtype=np.float64)
+        latitudes = np.asarray(latitudes, dtype=np.float64)
+        if not (len(obsids) == len(longitudes) == len(latitudes)):
+            raise ValueError("OBSID、经度和纬度数组的长度必须一致")
+
+        self._obsids = obsids
+        self._longitudes = longitudes
+        self._latitudes = latitudes
+        self._index: Optional[Dict[str, int]] = None
+        self._deduplicate()
+
+    def _deduplicate(self) -> None:
+        """与字典更新的语义一致: 重复的 OBSID 保留首次出现的位置和最后一次出现的坐标"""
+        if len(self._obsids) < 2:
+            return
+        unique, first_rows = np.unique(self._obsids, return_index=True)
+        if len(unique) == len(self._obsids):
+            return
+        _, reversed_rows = np.unique(self._obsids[::-1], return_index=True)
+        last_rows = len(self._obsids) - 1 - reversed_rows
+        order = np.argsort(first_rows, kind='stable')
+        value_rows = last_rows[order]
+        self._obsids = unique[order]
+        self._longitudes = self._longitudes[value_rows]
+        self._latitudes = self._latitudes[value_rows]
+
+    @classmethod
+    def from_mapping(cls, points: Mapping) -> 'PointStore':
+        """由点要素字典（或另一个 PointStore）构建"""
+        if isinstance(points, PointStore):
+            return points
+        obsids = list(points.keys())
+        return cls(
+            obsids,
+            np.fromiter((points[obsid]['longitude'] for obsid in obsids), dtype=np.float64, count=len(obsids)),
+            np.fromiter((points[obsid]['latitude'] for obsid in obsids), dtype=np.float64, count=len(obsids)),
+        )
+
+    @classmethod
+    def concat(cls, stores: Iterable[Mapping]) -> 'PointStore':
+        """
+        合并多个点要素集合, 重复的 OBSID 以后出现的坐标为准（与依次调用 dict.update 的结果一致）
+
+        Args:
+            stores: PointStore 或点要素字典的序列
+
+        Returns:
+            合并后的 PointStore
+        """
+        parts = [cls.from_mapping(store) for store in stores if store]
+        if not parts:
+            return cls()
+        if len(parts) == 1:
+            return parts[0]
+        return cls(
+            np.concatenate([part._obsids for part in parts]),
+            np.concatenate([part._longitudes for part in parts]),
+            np.concatenate([part._latitudes for part in parts]),
+        )
+
+    def difference(self, other: Mapping) -> 'PointStore':
+        """返回不在 other 中的点, 保持原有顺序"""
+        if not len(self._obsids):
+            return PointStore()
+        other_obsids = other._obsids if isinstance(other, PointStore) else np.asarray(list(other.keys()), dtype=str)
+        if not len(other_obsids):
+            return self
+        mask = ~np.isin(self._obsids, other_obsids)
+        return PointStore(self._obsids[mask], self._longitudes[mask], self._latitudes[mask])
+
+    def _row_index(self) -> Dict[str, int]:
+        if self._index is None:
+            self._index = {obsid: row for row, obsid in enumerate(self._obsids.tolist())}
+        return self._index
+
+    def __getitem__(self, obsid: str) -> Dict[str, float]:
+        row = self._row_index()[obsid]
+        return {'longitude': float(self._longitudes[row]), 'latitude': float(self._latitudes[row])}
+
+    def __contains__(self, obsid: object) -> bool:
+        return obsid in self._row_index()
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._obsids.tolist())
+
+    def __len__(self) -> int:
+        return len(self._obsids)
+
+    def items(self):
+        """按顺序遍历 (OBSID, 坐标字典), 无需经过索引查找"""
+        for obsid, longitude, latitude in zip(self._obsids.tolist(), self._longitudes.tolist(),
+                                              self._latitudes.tolist()):
+            yield obsid, {'longitude': longitude, 'latitude': latitude}
+
+    @property
+    def obsids(self) -> np.ndarray:
+        """OBSID 数组"""
+        return self._obsids
+
+    @property
+    def longitudes(self) -> np.ndarray:
+        """经度数组"""
+        return self._longitudes
+
+    @property
+    def latitudes(self) -> np.ndarray:
+        """纬度数组"""
+        return self._latitudes
+
+    def columns(self) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """返回 (OBSID, 经度, 纬度) 三个数组"""
+        return self._obsids, self._longitudes, self._latitudes
+
+    def to_dict(self) -> Dict[str, Dict[str, float]]:
+        """转换为普通的点要素字典"""
+        return dict(self.items())
+
+    def save(self, path: str) -> None:
+        """将三个数组保存为 .npz 文件（先写入临时文件再替换）"""
+        temp_path = f"{path}.{os.getpid()}.tmp"
+        with open(temp_path, 'wb') as file:
+            np.savez(file, obsids=self._obsids, longitudes=self._longitudes, latitudes=self._latitudes)
+        os.replace(temp_path, path)
+
+    @classmethod
+    def load(cls, path: str) -> 'PointStore':
+        """
+        从 save 生成的 .npz 文件载入
+
+        Raises:
+            OSError: 文件不存在或无法读取
+            KeyError: 文件缺少所需的数组
+        """
+        with np.load(path, allow_pickle=False) as data:
+            return cls(data['obsids'], data['longitudes'], data['latitudes'])
+
+    @property
+    def nbytes(self) -> int:
+        """数组占用的字节数（不含索引）"""
+        return self._obsids.nbytes + self._longitudes.nbytes + self._latitudes.nbytes
+
+    def __repr__(self) -> str:
+        return f"PointStore({len(self)} points)"
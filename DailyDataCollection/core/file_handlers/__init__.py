@@ -5,17 +5,34 @@
 - FileIO: 抽象文件IO基类
 - GeneralIO: 通用文件IO
 - KMZFile: KMZ文件处理器
+- KMZParseCache: KMZ解析结果缓存
+- KMLSchemaRegistry / validate_kmz_files: 已编译KML模式的共享与批量验证
+- write_kmz / KMZFragmentCache: KMZ文件流式写入与按图幅的片段缓存
+- write_points: 点要素批量写入 SHP / GPKG / FGB 文件
+
+各名称在首次访问时才导入（矢量文件读写依赖 GDAL）
 """
 
-try:
-    from .base_io import FileIO, GeneralIO
-    from .kmz_handler import KMZFile
+from ..lazy_import import lazy_exports
+
+_EXPORTS = {
+    'FileIO': '.base_io',
+    'GeneralIO': '.base_io',
+    'KMZFile': '.kmz_handler',
+    'parse_kmz_file': '.kmz_handler',
+    'KMZParseCache': '.kmz_cache',
+    'get_kmz_parse_cache': '.kmz_cache',
+    'KMLSchemaRegistry': '.kml_schema',
+    'get_schema_registry': '.kml_schema',
+    'validate_kmz_files': '.kml_schema',
+    'write_kmz': '.kmz_writer',
+    'KMZFragmentCache': '.kmz_fragments',
+    'MapsheetFragment': '.kmz_fragments',
+    'write_kmz_from_fragments': '.kmz_fragments',
+    'VECTOR_DRIVERS': '.vector_writer',
+    'write_points': '.vector_writer',
+}
+
+__all__ = list(_EXPORTS)
 
-    __all__ = [
-        'FileIO',
-        'GeneralIO',
-        'KMZFile'
-    ]
-except ImportError as e:
-    print(f"导入文件处理模块时出错: {e}")
-    __all__ = []
+__getattr__, __dir__ = lazy_exports(__name__, _EXPORTS, globals())
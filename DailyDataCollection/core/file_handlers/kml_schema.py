@@ -0,0 +1,267 @@
+"""
+KML模式验证模块
+
+编译 OGC KML XSD 模式的开销很大（需要解析多个模式文件并下载外部导入的模式）,
+编译后的模式在进程内只保留一份, 并以 pickle 格式保存到缓存目录, 下次启动时直接载入;
+批量验证时所有文件共用同一份已编译的模式, 由进程池并行验证
+"""
+
+import os
+import sys
+import pickle
+import logging
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Dict, Iterable, List, Optional, Tuple, Union
+
+import pyzipper
+
+logger = logging.getLogger('KML Schema')
+logger.setLevel(logging.ERROR)
+
+# 模式名称 -> 配置中 file_paths 下的路径键
+SCHEMA_KEYS = {
+    'schema22': 'kml_schema_22',
+    'schema23': 'kml_schema_23',
+}
+
+# 每个文件最多记录的验证错误数
+MAX_ERRORS_PER_FILE = 20
+
+
+class KMLSchemaRegistry:
+    """
+    进程级的已编译KML模式注册表
+
+    模式在首次使用时编译; 指定缓存目录时, 编译结果以 (格式版本, 来源标识, 编译模式, 重试时间, 模式) 保存为 pickle 文件,
+    模式文件的大小、修改时间或 xmlschema 版本变化后重新编译。
+    缓存的是宽松模式编译的结果时, 超过重试时间后才重新尝试严格模式编译（成功后替换缓存, 失败则推迟下次重试）,
+    避免离线时每次启动都等待外部模式的下载
+    """
+
+    FORMAT_VERSION = 3
+
+    def __init__(self, schema_paths: Dict[str, str], cache_dir: Optional[str] = None,
+                 strict_retry_seconds: float = 86400):
+        self.schema_paths = dict(schema_paths)
+        self.cache_dir = cache_dir
+        self.strict_retry_seconds = strict_retry_seconds
+        self._schemas: Dict[str, object] = {}
+        self._lock = threading.Lock()
+        if cache_dir:
+            os.makedirs(cache_dir, exist_ok=True)
+
+    def get(self, name: str = 'schema22', retry_strict: bool = True):
+        """
+        获取已编译的模式
+
+        Args:
+            name: 模式名称（schema22 / schema23）
+            retry_strict: 缓存为宽松模式且已到重试时间时是否重新尝试严格模式编译;
+                进程池的子进程传入 False, 直接使用主进程准备好的缓存
+
+        Returns:
+            xmlschema.XMLSchema 实例
+
+        Raises:
+            KeyError: 未配置该名称的模式
+        """
+        schema = self._schemas.get(name)
+        if schema is not None:
+            return schema
+
+        with self._lock:
+            schema = self._schemas.get(name)
+            if schema is None:
+                path = self.schema_paths[name]
+                source_key = self._source_key(path)
+                cached = self._load_pickle(name, source_key)
+                if cached is not None and (cached[0] == 'strict' or not retry_strict or time.time() < cached[1]):
+                    schema = cached[2]
+                else:
+                    schema, mode = self._compile(path, lax_fallback=cached is None)
+                    if schema is None:
+                        # 严格模式仍无法编译, 沿用缓存中宽松模式编译的结果, 推迟下次重试
+                        schema, mode = cached[2], 'lax'
+                    self._save_pickle(name, source_key, mode, schema)
+                self._schemas[name] = schema
+        return schema
+
+    def validate(self, kml_content: Union[bytes, str], name: str = 'schema22') -> List[str]:
+        """
+        验证KML内容
+
+        Args:
+            kml_content: KML文本或字节串
+            name: 模式名称
+
+        Returns:
+            验证错误信息列表, 验证通过时为空列表
+        """
+        schema = self.get(name)
+        errors = []
+        for error in schema.iter_errors(kml_content):
+            errors.append(f"{error.reason} (路径: {error.path})")
+            if len(errors) >= MAX_ERRORS_PER_FILE:
+                break
+        return errors
+
+    @staticmethod
+    def _compile(path: str, lax_fallback: bool = True) -> Tuple[Optional[object], Optional[str]]:
+        """
+        编译模式; 外部导入的模式无法访问（如离线）时以宽松模式编译, 仅跳过缺失的部分
+
+        Returns:
+            (模式, 编译模式 strict / lax); 严格模式失败且 lax_fallback 为 False 时返回 (None, None)
+        """
+        import xmlschema
+
+        try:
+            return xmlschema.XMLSchema(path), 'strict'
+        except xmlschema.XMLSchemaParseError as e:
+            if not lax_fallback:
+                logger.warning(f"严格模式编译KML模式仍然失败, 继续使用宽松模式的缓存: {path}: {e.message}")
+                return None, None
+            logger.warning(f"严格模式编译KML模式失败, 改用宽松模式: {path}: {e.message}")
+            return xmlschema.XMLSchema(path, validation='lax'), 'lax'
+
+    @staticmethod
+    def _source_key(path: str) -> Tuple:
+        """模式文件及 xmlschema 版本的标识"""
+        import xmlschema
+
+        stat = os.stat(path)
+        return (os.path.abspath(path), stat.st_size, stat.st_mtime_ns,
+                xmlschema.__version__, sys.version_info[:2])
+
+    def _pickle_path(self, name: str) -> str:
+        return os.path.join(self.cache_dir, f"{name}.pickle")
+
+    def _load_pickle(self, name: str, source_key: Tuple) -> Optional[Tuple[str, float, object]]:
+        """载入缓存的模式, 返回 (编译模式, 严格模式重试时间, 模式), 缓存不存在或已失效时返回 None"""
+        if not self.cache_dir:
+            return None
+        try:
+            with open(self._pickle_path(name), 'rb') as file:
+                version, cached_key, mode, retry_after, schema = pickle.load(file)
+        except (OSError, pickle.UnpicklingError, EOFError, ValueError, AttributeError, ImportError, TypeError):
+            return None
+        if version != self.FORMAT_VERSION or cached_key != source_key:
+            return None
+        return mode, retry_after, schema
+
+    def _save_pickle(self, name: str, source_key: Tuple, mode: str, schema) -> None:
+        if not self.cache_dir:
+            return
+        retry_after = time.time() + self.strict_retry_seconds if mode == 'lax' else 0.0
+        path = self._pickle_path(name)
+        temp_path = f"{path}.{os.getpid()}.tmp"
+        try:
+            with open(temp_path, 'wb') as file:
+                pickle.dump((self.FORMAT_VERSION, source_key, mode, retry_after, schema), file,
+                            protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(temp_path, path)
+        except (OSError, pickle.PicklingError, TypeError) as e:
+            logger.warning(f"保存已编译的KML模式失败 {name}: {e}")
+            try:
+                os.remove(temp_path)
+            except OSError:
+                pass
+
+
+_schema_registry: Optional[KMLSchemaRegistry] = None
+_schema_registry_lock = threading.Lock()
+
+
+def get_schema_registry() -> KMLSchemaRegistry:
+    """获取进程级的KML模式注册表实例"""
+    global _schema_registry
+    if _schema_registry is not None:
+        return _schema_registry
+
+    with _schema_registry_lock:
+        if _schema_registry is None:
+            from config.config_manager import ConfigManager
+            config_manager = ConfigManager()
+            schema_paths = {name: config_manager.get_resolved_path(key) for name, key in SCHEMA_KEYS.items()}
+            cache_dir = None
+            if config_manager.get('performance.kml_schema.persistent', True):
+                try:
+                    cache_dir = config_manager.get_cache_directory('kml_schema')
+                except Exception as e:
+                    logger.warning(f"无法创建KML模式缓存目录, 将不保存已编译的模式: {e}")
+            strict_retry_seconds = config_manager.get('performance.kml_schema.strict_retry_hours', 24) * 3600
+            _schema_registry = KMLSchemaRegistry(schema_paths, cache_dir, strict_retry_seconds)
+    return _schema_registry
+
+
+def read_kml_content(filepath: str) -> bytes:
+    """读取KMZ文件中第一个KML文件的内容"""
+    with pyzipper.AESZipFile(filepath, 'r') as kmz:
+        kml_files = [name for name in kmz.namelist() if name.endswith('.kml')]
+        if not kml_files:
+            raise ValueError(f"在KMZ文件中没有找到KML文件: {os.path.basename(filepath)}")
+        return kmz.read(kml_files[0])
+
+
+def validate_kmz_file(filepath: str, schema_name: str = 'schema22') -> List[str]:
+    """
+    验证单个KMZ文件
+
+    定义为模块级函数, 以便提交到进程池中执行
+
+    Returns:
+        验证错误信息列表, 验证通过时为空列表
+    """
+    try:
+        kml_content = read_kml_content(filepath)
+    except Exception as e:
+        return [f"读取文件时发生错误: {e}"]
+    return get_schema_registry().validate(kml_content, schema_name)
+
+
+def _prepare_worker(schema_name: str) -> None:
+    """进程池初始化: 每个子进程载入一次主进程已准备好的模式, 不再重新尝试严格模式编译"""
+    get_schema_registry().get(schema_name, retry_strict=False)
+
+
+def validate_kmz_files(filepaths: Iterable[str], schema_name: str = 'schema22',
+                       max_workers: Optional[int] = None) -> Dict[str, List[str]]:
+    """
+    使用同一份已编译的模式批量验证KMZ文件
+
+    Args:
+        filepaths: KMZ文件路径
+        schema_name: 模式名称（schema22 / schema23）
+        max_workers: 进程数, 默认使用配置中的 performance.parallel.process_workers（0 表示CPU核心数）
+
+    Returns:
+        {文件路径: 验证错误信息列表}, 验证通过的文件对应空列表
+    """
+    filepaths = list(dict.fromkeys(filepaths))
+    if not filepaths:
+        return {}
+
+    # 先在当前进程中编译（或载入）模式并保存到缓存目录, 子进程直接载入
+    get_schema_registry().get(schema_name)
+
+    if max_workers is None:
+        from config.config_manager import ConfigManager
+        max_workers = ConfigManager().get('performance.parallel.process_workers', 0)
+    if not max_workers:
+        max_workers = os.cpu_count() or 1
+    max_workers = min(max_workers, len(filepaths))
+
+    if max_workers > 1:
+        try:
+            with ProcessPoolExecutor(max_workers=max_workers, initializer=_prepare_worker,
+                                     initargs=(schema_name,)) as pool:
+                results = pool.map(validate_kmz_file, filepaths, [schema_name] * len(filepaths),
+                                   chunksize=max(1, len(filepaths) // (max_workers * 4)))
+                return dict(zip(filepaths, results))
+        except (OSError, NotImplementedError, ValueError, BrokenProcessPool) as e:
+            logger.warning(f"验证进程池不可用，将在当前进程中验证: {e}")
+
+    return {filepath: validate_kmz_file(filepath, schema_name) for filepath in filepaths}
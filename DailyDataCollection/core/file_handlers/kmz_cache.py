@@ -0,0 +1,245 @@
+"""
+KMZ解析结果缓存模块
+
+将已解析的KMZ文件内容（点要素、线要素和错误信息）以紧凑的二进制格式持久化到磁盘,
+对未发生变化的历史文件跳过重复的解压和解析
+"""
+
+import os
+import time
+import zlib
+import pickle
+import sqlite3
+import logging
+import threading
+from typing import Optional, Tuple
+
+import numpy as np
+
+from ..data_models.observation_data import ObservationData
+from ..data_models.point_store import PointStore
+from ..utils.file_utils import compute_file_hash
+
+# 创建 logger 实例
+logger = logging.getLogger('KMZ Cache')
+logger.setLevel(logging.ERROR)
+handler = logging.StreamHandler()
+formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+handler.setFormatter(formatter)
+logger.addHandler(handler)
+
+
+class KMZParseCache:
+    """
+    KMZ解析结果的持久化缓存
+
+    缓存以SQLite文件存储, 包含两张表:
+    - paths: 文件路径 -> (文件大小, 修改时间, 内容哈希), 用于快速判断文件是否变化
+    - entries: 内容哈希 -> 压缩后的解析结果, 相同内容的不同副本（如微信文件夹与工作目录中的拷贝）共享同一条记录
+
+    超出容量上限时按最近最少使用（LRU）原则清理
+    """
+
+    # 缓存格式版本, 解析逻辑或序列化格式变化时递增以使旧缓存失效
+    FORMAT_VERSION = 1
+    DB_FILENAME = 'kmz_parse_cache.sqlite'
+
+    def __init__(self, cache_dir: str, max_size_mb: float = 256):
+        self.cache_dir = cache_dir
+        self.db_path = os.path.join(cache_dir, self.DB_FILENAME)
+        self.max_bytes = int(max_size_mb * 1024 * 1024)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+        os.makedirs(cache_dir, exist_ok=True)
+        self._conn = sqlite3.connect(self.db_path, timeout=10, check_same_thread=False)
+        self._setup()
+
+    def _setup(self) -> None:
+        """初始化数据表, 版本不一致时清空旧缓存"""
+        with self._lock:
+            version = self._conn.execute('PRAGMA user_version').fetchone()[0]
+            if version != self.FORMAT_VERSION:
+                self._conn.execute('DROP TABLE IF EXISTS entries')
+                self._conn.execute('DROP TABLE IF EXISTS paths')
+                self._conn.execute(f'PRAGMA user_version = {self.FORMAT_VERSION}')
+            self._conn.execute(
+                'CREATE TABLE IF NOT EXISTS entries ('
+                'digest TEXT PRIMARY KEY, payload BLOB NOT NULL, '
+                'nbytes INTEGER NOT NULL, last_access REAL NOT NULL)'
+            )
+            self._conn.execute(
+                'CREATE TABLE IF NOT EXISTS paths ('
+                'path TEXT PRIMARY KEY, size INTEGER NOT NULL, '
+                'mtime_ns INTEGER NOT NULL, digest TEXT NOT NULL)'
+            )
+            self._conn.commit()
+
+    def _digest_for(self, filepath: str) -> Optional[str]:
+        """获取文件内容哈希, 文件大小和修改时间未变时直接使用记录中的哈希值"""
+        try:
+            stat = os.stat(filepath)
+        except OSError:
+            return None
+
+        path = os.path.abspath(filepath)
+        row = self._conn.execute(
+            'SELECT size, mtime_ns, digest FROM paths WHERE path = ?', (path,)
+        ).fetchone()
+        if row and row[0] == stat.st_size and row[1] == stat.st_mtime_ns:
+            return row[2]
+
+        digest = compute_file_hash(filepath)
+        self._conn.execute(
+            'INSERT OR REPLACE INTO paths (path, size, mtime_ns, digest) VALUES (?, ?, ?, ?)',
+            (path, stat.st_size, stat.st_mtime_ns, digest)
+        )
+        self._conn.commit()
+        return digest
+
+    def get(self, filepath: str) -> Optional[ObservationData]:
+        """
+        获取文件的缓存解析结果
+
+        Args:
+            filepath: KMZ文件路径
+
+        Returns:
+            缓存命中时返回 ObservationData, 否则返回 None
+        """
+        try:
+            with self._lock:
+                digest = self._digest_for(filepath)
+                if digest is None:
+                    return None
+                row = self._conn.execute(
+                    'SELECT payload FROM entries WHERE digest = ?', (digest,)
+                ).fetchone()
+                if row is None:
+                    self.misses += 1
+                    return None
+                self._conn.execute(
+                    'UPDATE entries SET last_access = ? WHERE digest = ?', (time.time(), digest)
+                )
+                self._conn.commit()
+                self.hits += 1
+            return self._decode(row[0])
+        except Exception as e:
+            logger.warning(f"读取KMZ缓存失败 {filepath}: {e}")
+            return None
+
+    def put(self, filepath: str, placemarks: ObservationData) -> None:
+        """
+        写入文件的解析结果
+
+        Args:
+            filepath: KMZ文件路径
+            placemarks: 解析得到的观测数据
+        """
+        try:
+            payload = self._encode(placemarks)
+            with self._lock:
+                digest = self._digest_for(filepath)
+                if digest is None:
+                    return
+                self._conn.execute(
+                    'INSERT OR REPLACE INTO entries (digest, payload, nbytes, last_access) VALUES (?, ?, ?, ?)',
+                    (digest, payload, len(payload), time.time())
+                )
+                self._evict()
+                self._conn.commit()
+        except Exception as e:
+            logger.warning(f"写入KMZ缓存失败 {filepath}: {e}")
+
+    def _evict(self) -> None:
+        """超出容量上限时, 按最近访问时间从旧到新删除缓存条目"""
+        total = self._conn.execute('SELECT COALESCE(SUM(nbytes), 0) FROM entries').fetchone()[0]
+        if total <= self.max_bytes:
+            return
+
+        rows = self._conn.execute('SELECT digest, nbytes FROM entries ORDER BY last_access ASC').fetchall()
+        evicted = []
+        for digest, nbytes in rows:
+            if total <= self.max_bytes:
+                break
+            evicted.append((digest,))
+            total -= nbytes
+        self._conn.executemany('DELETE FROM entries WHERE digest = ?', evicted)
+        self._conn.executemany('DELETE FROM paths WHERE digest = ?', evicted)
+        logger.info(f"KMZ缓存超出容量上限, 已清理 {len(evicted)} 条记录")
+
+    def clear(self) -> None:
+        """清空缓存"""
+        with self._lock:
+            self._conn.execute('DELETE FROM entries')
+            self._conn.execute('DELETE FROM paths')
+            self._conn.commit()
+
+    def close(self) -> None:
+        """关闭缓存数据库连接"""
+        with self._lock:
+            self._conn.close()
+
+    @staticmethod
+    def _encode(placemarks: ObservationData) -> bytes:
+        """将观测数据编码为压缩的二进制格式, 坐标以 float64 数组存储"""
+        store = PointStore.from_mapping(placemarks.points)
+        record = (
+            store.obsids.tolist(),
+            store.longitudes.tobytes(),
+            store.latitudes.tobytes(),
+            list(placemarks.routes),
+            list(placemarks.errorMsg or []),
+        )
+        return zlib.compress(pickle.dumps(record, protocol=pickle.HIGHEST_PROTOCOL))
+
+    @staticmethod
+    def _decode(payload: bytes) -> ObservationData:
+        """从二进制格式还原观测数据"""
+        obsids, longitude_bytes, latitude_bytes, routes, errors = pickle.loads(zlib.decompress(payload))
+        points = PointStore(
+            obsids,
+            np.frombuffer(longitude_bytes, dtype=np.float64),
+            np.frombuffer(latitude_bytes, dtype=np.float64),
+        )
+        return ObservationData.from_parsed(points, routes, errors)
+
+    @property
+    def stats(self) -> Tuple[int, int]:
+        """缓存命中和未命中次数"""
+        return self.hits, self.misses
+
+
+# 进程级缓存实例
+_kmz_parse_cache: Optional[KMZParseCache] = None
+_kmz_parse_cache_initialized = False
+_kmz_parse_cache_lock = threading.Lock()
+
+
+def get_kmz_parse_cache() -> Optional[KMZParseCache]:
+    """
+    获取进程级的KMZ解析缓存实例
+
+    Returns:
+        缓存实例; 配置中禁用缓存或初始化失败时返回 None
+    """
+    global _kmz_parse_cache, _kmz_parse_cache_initialized
+    if _kmz_parse_cache_initialized:
+        return _kmz_parse_cache
+
+    with _kmz_parse_cache_lock:
+        if not _kmz_parse_cache_initialized:
+            try:
+                from config.config_manager import ConfigManager
+                config_manager = ConfigManager()
+                if config_manager.get('performance.kmz_cache.enabled', True):
+                    _kmz_parse_cache = KMZParseCache(
+                        config_manager.get_cache_directory(),
+                        max_size_mb=config_manager.get('performance.kmz_cache.max_size_mb', 256)
+                    )
+            except Exception as e:
+                logger.warning(f"初始化KMZ缓存失败, 将不使用缓存: {e}")
+                _kmz_parse_cache = None
+            _kmz_parse_cache_initialized = True
+    return _kmz_parse_cache
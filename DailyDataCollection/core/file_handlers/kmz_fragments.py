@@ -0,0 +1,121 @@
+"""
+KMZ片段缓存模块
+
+为累计KMZ文件（GMAS_Points_and_tracks_until_*.kmz）按图幅保存预先序列化的要素片段,
+源文件未变化的图幅直接复用上一次的片段, 最终文件由各图幅片段拼接而成
+"""
+
+import os
+import pickle
+import logging
+from dataclasses import dataclass, field
+from typing import Iterable, List, Mapping, Optional
+
+from lxml import etree
+
+from .kmz_writer import (
+    atomic_zip_writer, add_icon, icon_href,
+    build_line_style, build_point_style, build_route_placemark, build_point_placemark,
+)
+
+logger = logging.getLogger('KMZ Fragments')
+logger.setLevel(logging.ERROR)
+
+# 线要素片段中编号的占位名称, 拼接时替换为全局连续编号
+_ROUTE_NAME_PLACEHOLDER = b'<name>Route 0</name>'
+
+
+@dataclass
+class MapsheetFragment:
+    """单个图幅的已序列化要素"""
+    source_hash: Optional[str]
+    # 每条线要素以编号占位符分隔的 (前半部分, 后半部分)
+    routes: List[tuple] = field(default_factory=list)
+    # 所有点要素拼接后的字节串
+    points: bytes = b''
+    pointsCount: int = 0
+
+    @classmethod
+    def build(cls, source_hash: Optional[str], points: Mapping[str, Mapping[str, float]],
+              routes: Iterable[str]) -> 'MapsheetFragment':
+        """序列化图幅的点要素和线要素"""
+        route_parts = []
+        for coordinates in routes:
+            serialized = etree.tostring(build_route_placemark(0, coordinates), pretty_print=True)
+            head, tail = serialized.split(_ROUTE_NAME_PLACEHOLDER, 1)
+            route_parts.append((head, tail))
+        point_bytes = b''.join(
+            etree.tostring(build_point_placemark(obspid, coords), pretty_print=True)
+            for obspid, coords in points.items()
+        )
+        return cls(source_hash, route_parts, point_bytes, len(points))
+
+
+class KMZFragmentCache:
+    """按图幅保存序列化片段的磁盘缓存"""
+
+    FORMAT_VERSION = 1
+
+    def __init__(self, cache_dir: str):
+        self.cache_dir = cache_dir
+        os.makedirs(cache_dir, exist_ok=True)
+
+    def _path(self, mapsheet: str) -> str:
+        return os.path.join(self.cache_dir, f"{mapsheet}.fragment")
+
+    def get(self, mapsheet: str, source_hash: Optional[str]) -> Optional[MapsheetFragment]:
+        """获取源文件哈希一致的片段, 不存在或已过期时返回 None"""
+        try:
+            with open(self._path(mapsheet), 'rb') as file:
+                version, fragment = pickle.load(file)
+        except (OSError, pickle.UnpicklingError, EOFError, ValueError, AttributeError):
+            return None
+        if version != self.FORMAT_VERSION or fragment.source_hash != source_hash:
+            return None
+        return fragment
+
+    def put(self, mapsheet: str, fragment: MapsheetFragment) -> None:
+        """保存图幅片段"""
+        path = self._path(mapsheet)
+        temp_path = f"{path}.{os.getpid()}.tmp"
+        try:
+            with open(temp_path, 'wb') as file:
+                pickle.dump((self.FORMAT_VERSION, fragment), file, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(temp_path, path)
+        except OSError as e:
+            logger.warning(f"保存KMZ片段失败 {mapsheet}: {e}")
+
+
+def write_kmz_from_fragments(output_path: str, fragments: List[MapsheetFragment],
+                             icon_path: Optional[str] = None) -> None:
+    """
+    拼接各图幅片段写入KMZ文件, 要素顺序与完整生成时一致: 线样式、全部线要素、点样式、全部点要素
+
+    Args:
+        output_path: 输出KMZ文件路径
+        fragments: 按图幅顺序排列的片段
+        icon_path: 点要素图标文件路径
+    """
+    temp_path, kmz = atomic_zip_writer(output_path)
+    try:
+        with kmz:
+            with kmz.open('doc.kml', 'w') as stream:
+                stream.write(b"<?xml version='1.0' encoding='UTF-8'?>\n<Document>")
+                stream.write(etree.tostring(build_line_style(), pretty_print=True))
+                number = 0
+                for fragment in fragments:
+                    for head, tail in fragment.routes:
+                        number += 1
+                        stream.write(head)
+                        stream.write(b'<name>Route %d</name>' % number)
+                        stream.write(tail)
+                stream.write(etree.tostring(build_point_style(icon_href(icon_path)), pretty_print=True))
+                for fragment in fragments:
+                    stream.write(fragment.points)
+                stream.write(b"</Document>\n")
+            add_icon(kmz, icon_path)
+        os.replace(temp_path, output_path)
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
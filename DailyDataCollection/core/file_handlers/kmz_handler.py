@@ -5,27 +5,25 @@ KMZ文件处理器
 """
 
 import os
-import stat
-import shutil
 import zipfile
 import pyzipper
-import xmlschema
 import logging
-from typing import Optional, Union
-from lxml import etree
-from osgeo import ogr, osr
+from typing import Optional, Tuple, Union
 
 from ..data_models.file_attributes import FileAttributes
 from ..data_models.observation_data import ObservationData
 from .base_io import GeneralIO
+from .kmz_cache import get_kmz_parse_cache
+from .kmz_writer import write_kmz
+from .kml_schema import SCHEMA_KEYS, get_schema_registry
 
 # 导入配置
 from config.config_manager import ConfigManager
 
 config_manager = ConfigManager()
-KML_SCHEMA_22 = config_manager.get('resources.kml_schema_22', '')
-KML_SCHEMA_23 = config_manager.get('resources.kml_schema_23', '')
-ICON_1 = config_manager.get('resources.icon_1', '')
+KML_SCHEMA_22 = config_manager.get_resolved_path('kml_schema_22')
+KML_SCHEMA_23 = config_manager.get_resolved_path('kml_schema_23')
+ICON_1 = config_manager.get_resolved_path('icon_file')
 
 # 创建 logger 实例
 logger = logging.getLogger('KMZ Handler')
@@ -42,8 +40,11 @@ class KMZFile(FileAttributes, GeneralIO):
     SCHEMA_22 = KML_SCHEMA_22
     SCHEMA_23 = KML_SCHEMA_23
 
-    def __init__(self, filepath: Optional[str] = None, placemarks: Optional[ObservationData] = None):
+    def __init__(self, filepath: Optional[str] = None, placemarks: Optional[ObservationData] = None,
+                 use_cache: bool = True):
         super().__init__(filepath)
+        # 是否使用磁盘上的解析结果缓存
+        self.use_cache = use_cache
         
         self.filepath = filepath
         if self.filepath:
@@ -77,26 +78,21 @@ class KMZFile(FileAttributes, GeneralIO):
                 print("KMZ初始化时发现的错误", self.errorMsg)
 
     def __validateKMZ(self, defaultSchema: str = "schema22") -> bool:
-        """验证KMZ文件是否符合KML的XSD模式"""
-        if defaultSchema == "schema22":
-            schema = xmlschema.XMLSchema(KMZFile.SCHEMA_22) 
-        elif defaultSchema == "schema23":
-            schema = xmlschema.XMLSchema(KMZFile.SCHEMA_22)
-        else:
-            return print(f"无效的输入参数, 将使用默认的'{defaultSchema}'")
+        """验证KMZ文件是否符合KML的XSD模式（使用进程内共享的已编译模式）"""
+        if defaultSchema not in SCHEMA_KEYS:
+            return print(f"无效的输入参数: '{defaultSchema}'")
         
         if self._kml_content is None:
             return print("KML内容为空")
         else:
-            try:
-                schema.validate(self._kml_content)
+            errors = get_schema_registry().validate(self._kml_content, defaultSchema)
+            if not errors:
                 logger.info(f"XML文件与XSD'{defaultSchema}'验证通过")
                 return True
-            except xmlschema.validators.exceptions.XMLSchemaValidationError as e:
-                warning = f"XML文件与XSD'{defaultSchema}'验证不符"
-                logger.warning(warning)
-                self.__errorMsg.extend([warning])
-                return False
+            warning = f"XML文件与XSD'{defaultSchema}'验证不符: {errors[0]}"
+            logger.warning(warning)
+            self.__errorMsg.extend([warning])
+            return False
 
     def read(self, filepath: Optional[str] = None, validate: bool = False, defaultSchema: str = "schema22") -> bool:
         """解压 KMZ 文件并提取 KML 内容"""
@@ -115,6 +111,14 @@ class KMZFile(FileAttributes, GeneralIO):
         else:
             filepath = self.filepath
         
+        # 优先从解析缓存中读取, 验证模式需要完整的KML内容, 不使用缓存
+        cache = get_kmz_parse_cache() if self.use_cache and not validate else None
+        if cache is not None:
+            cached = cache.get(filepath)
+            if cached is not None:
+                self.__applyPlacemarks(cached)
+                return True
+
         try:
             # 首先尝试检查文件是否是有效的ZIP文件
             try:
@@ -135,21 +139,19 @@ class KMZFile(FileAttributes, GeneralIO):
                     kml_file = kml_files[0]
                     # 读取 KML 文件内容
                     with kmz.open(kml_file) as kml:
-                        self._kml_content = kml.read()
-                        # 验证KML文件是否符合XSD模式
                         if validate:
+                            # 验证需要完整的KML内容
+                            self._kml_content = kml.read()
+                            # 验证KML文件是否符合XSD模式
                             self.__validateKMZ(defaultSchema)
-                        # 解析KML内容
-                        placemarks = ObservationData(kml_content=self._kml_content)
-                        self._points = placemarks.points
-                        self._pointsCount = placemarks.pointsCount
-                        self._routes = placemarks.routes
-                        self._routesCount = placemarks.routesCount
-                        if placemarks.errorMsg:
-                            self.__errorMsg.extend(placemarks.errorMsg)
-                        self._placemarks = placemarks
-                        # 删除KML内容, 释放内存
-                        del self._kml_content
+                            # 解析KML内容
+                            placemarks = ObservationData(kml_content=self._kml_content)
+                        else:
+                            # 直接从压缩包数据流中流式解析, 无需将整个KML读入内存
+                            placemarks = ObservationData(kml_source=kml)
+                        self.__applyPlacemarks(placemarks)
+                        # 释放KML内容占用的内存
+                        self._kml_content = None
                 else:
                     error = f"在KMZ文件中没有找到KML文件: {os.path.basename(filepath)}"
                     logger.error(error)
@@ -161,9 +163,22 @@ class KMZFile(FileAttributes, GeneralIO):
             logger.error(error)
             self.__errorMsg.append(error)
             return False
+
+        if cache is not None:
+            cache.put(filepath, self._placemarks)
         
         return True
 
+    def __applyPlacemarks(self, placemarks: ObservationData) -> None:
+        """将解析得到的观测数据设置到当前对象"""
+        self._points = placemarks.points
+        self._pointsCount = placemarks.pointsCount
+        self._routes = placemarks.routes
+        self._routesCount = placemarks.routesCount
+        if placemarks.errorMsg:
+            self.__errorMsg.extend(placemarks.errorMsg)
+        self._placemarks = placemarks
+
     def write(self, file_type: str = 'kmz') -> bool:
         """写入文件"""
         if self.filepath is not None:
@@ -177,12 +192,14 @@ class KMZFile(FileAttributes, GeneralIO):
                     logger.error(f"KMZ文件保存失败{self.filepath}")
                     return False
             elif file_type == 'shp':
+                from .vector_writer import format_label
+                label = format_label(self.filepath)
                 if self.__toShp(self.filepath):
-                    print(f"SHP文件已保存到: {self.filepath}")
+                    print(f"{label}文件已保存到: {self.filepath}")
                     return True
                 else:
-                    print(f"SHP文件保存失败")
-                    logger.error(f"SHP文件保存失败{self.filepath}")
+                    print(f"{label}文件保存失败")
+                    logger.error(f"{label}文件保存失败{self.filepath}")
                     return False
             else:
                 logger.error(f"无效的输出文件类型: {file_type}")
@@ -197,6 +214,9 @@ class KMZFile(FileAttributes, GeneralIO):
         if os.path.exists(newpath) and os.path.isfile(newpath):
             logger.warning(f"文件路径{newpath}将覆盖原文件")
         
+        # 矢量文件读写依赖 GDAL, 在需要时才导入
+        from .vector_writer import VECTOR_DRIVERS
+
         filetype = os.path.splitext(newpath)[1].lower()
         if filetype == '.kmz':
             if self.__toKMZ(newpath):
@@ -206,13 +226,13 @@ class KMZFile(FileAttributes, GeneralIO):
                 print(f"KMZ文件保存失败")
                 logger.error(f"KMZ文件保存失败{newpath}")
                 return False
-        elif filetype == '.shp':
+        elif filetype in VECTOR_DRIVERS:
             if self.__toShp(newpath):
-                print(f"SHP文件已保存到: {newpath}")
+                print(f"{filetype[1:].upper()}文件已保存到: {newpath}")
                 return True
             else:
-                print(f"SHP文件保存失败")
-                logger.error(f"SHP文件保存失败{newpath}")
+                print(f"{filetype[1:].upper()}文件保存失败")
+                logger.error(f"{filetype[1:].upper()}文件保存失败{newpath}")
                 return False
         else:
             print(f"无效的输出文件类型: {filetype}")
@@ -233,128 +253,21 @@ class KMZFile(FileAttributes, GeneralIO):
             logger.error("ObservationData is empty")
             return False
         
-        # 创建输出目录
         if os.path.exists(output_path) and os.path.isfile(output_path):
             if not output_path.endswith('.kmz'):
                 logger.error("Output file must be a KMZ file")
                 return False
         
-        output_dir = os.path.dirname(output_path)
-        temp_dir = os.path.join(output_dir, "temp_kmz")
-        os.makedirs(temp_dir, exist_ok=True)
-        files_dir = os.path.join(temp_dir, 'files')
-        os.makedirs(files_dir, exist_ok=True)
-        
-        # 创建临时KML文件
-        temp_kml_file = os.path.join(output_dir, "temp_combined.kml")
-        
-        # 根节点
-        document = etree.Element("Document")
-        
-        # 添加线样式
-        style = etree.SubElement(document, "Style", id="lineStyle")
-        line_style = etree.SubElement(style, "LineStyle")
-        color = etree.SubElement(line_style, "color")
-        color.text = "ff000000"  # 黑色, 格式为 AABBGGRR
-        width = etree.SubElement(line_style, "width")
-        width.text = "1"  # 线宽度
-        
-        # 添加线数据
-        for i, coordinates in enumerate(self.routes):
-            placemark = etree.SubElement(document, "Placemark")
-            style_url = etree.SubElement(placemark, "styleUrl")
-            style_url.text = "#lineStyle"
-            name = etree.SubElement(placemark, "name")
-            name.text = f"Route {i+1}"
-            linestring = etree.SubElement(placemark, "LineString")
-            coord_elem = etree.SubElement(linestring, "coordinates")
-            coord_elem.text = coordinates
-        
-        # 添加点样式
-        style = etree.SubElement(document, "Style", id="pointStyle")
-        icon_style = etree.SubElement(style, "IconStyle")
-        icon = etree.SubElement(icon_style, "Icon")
-        href = etree.SubElement(icon, "href")
-        href.text = "files/Layer0_Symbol_Square.png"  # 使用自定义图标的 URL
-        
-        # 添加点要素
-        for obspid, coords in self.points.items():
-            placemark = etree.SubElement(document, "Placemark")
-            style_url = etree.SubElement(placemark, "styleUrl")
-            style_url.text = "#pointStyle"
-            name = etree.SubElement(placemark, "name")
-            name.text = obspid
-            point = etree.SubElement(placemark, "Point")
-            coordinates = etree.SubElement(point, "coordinates")
-            coordinates.text = f"{coords['longitude']},{coords['latitude']}"
-        
-        # 保存KML文件
-        tree = etree.ElementTree(document)
-        tree.write(temp_kml_file, pretty_print=True, xml_declaration=True, encoding="UTF-8")
-        
-        # 将PNG文件移动到files文件夹中
-        if ICON_1 and os.path.exists(ICON_1):
-            shutil.copy(ICON_1, files_dir)
-            os.chmod(files_dir, stat.S_IWRITE | stat.S_IREAD)
-        
-        # 压缩为KMZ文件
-        with zipfile.ZipFile(output_path, 'w', zipfile.ZIP_DEFLATED) as kmz:
-            # 将doc.kml文件添加到KMZ文件中
-            kmz.write(temp_kml_file, 'doc.kml')
-            # 将files文件夹中的PNG文件添加到KMZ文件中
-            for root, _, files in os.walk(files_dir):
-                for file in files:
-                    file_path = os.path.join(root, file)
-                    arcname = os.path.relpath(file_path, temp_dir)
-                    kmz.write(file_path, arcname)
-        
-        # 删除临时目录
-        shutil.rmtree(temp_dir)
-        # 删除临时KML文件
-        os.remove(temp_kml_file)
+        # KML直接流式写入压缩包, 先写入同一文件夹下的临时文件再原子替换目标文件
+        write_kmz(output_path, self.points, self.routes, ICON_1)
         return True
 
     def __toShp(self, output_path: str) -> bool:
-        """转换为SHP文件"""
-        # 创建 SHP 文件驱动
-        shp_driver = ogr.GetDriverByName('ESRI Shapefile')
-        if os.path.exists(output_path):
-            shp_driver.DeleteDataSource(output_path)
-        shp_ds = shp_driver.CreateDataSource(output_path)
-        if shp_ds is None:
-            raise RuntimeError("Failed to create SHP file")
-        
-        # 创建 SHP 图层
-        srs = osr.SpatialReference()
-        srs.ImportFromEPSG(4326)  # WGS84
-        shp_layer = shp_ds.CreateLayer('points', srs, ogr.wkbPoint)
-        
-        # 创建字段
-        field_name = ogr.FieldDefn('Name', ogr.OFTString)
-        field_name.SetWidth(24)
-        shp_layer.CreateField(field_name)
-        field_longitude = ogr.FieldDefn('Longitude', ogr.OFTReal)
-        shp_layer.CreateField(field_longitude)
-        field_latitude = ogr.FieldDefn('Latitude', ogr.OFTReal)
-        shp_layer.CreateField(field_latitude)
-        
-        # 创建要素并添加到图层
-        for obspid, coords in self.placemarks.points.items():
-            feature = ogr.Feature(shp_layer.GetLayerDefn())
-            feature.SetField('Name', obspid)
-            feature.SetField('Longitude', float(coords['longitude']))
-            feature.SetField('Latitude', float(coords['latitude']))
-            # 创建点要素
-            point = ogr.Geometry(ogr.wkbPoint)
-            point.AddPoint(float(coords['longitude']), float(coords['latitude']))
-            feature.SetGeometry(point)
-            # 添加要素
-            shp_layer.CreateFeature(feature)
-            feature = None  # 清理要素
-        
-        # 清理
-        shp_ds = None
-        print(f"点要素已成功生成 SHP 文件: {output_path}")
+        """转换为矢量文件（SHP / GPKG / FGB, 由扩展名决定格式）"""
+        from .vector_writer import format_label, write_points
+
+        write_points(output_path, self.placemarks.points)
+        print(f"点要素已成功生成 {format_label(output_path)} 文件: {output_path}")
         return True
 
     def __getattr__(self, name):
@@ -396,3 +309,20 @@ class KMZFile(FileAttributes, GeneralIO):
         new_file = KMZFile()
         new_file._placemarks = self.placemarks - other.placemarks
         return new_file
+
+
+def parse_kmz_file(filepath: str) -> Tuple[Optional[ObservationData], Optional[list]]:
+    """
+    解析单个KMZ文件, 返回观测数据和错误信息
+
+    定义为模块级函数, 以便提交到进程池中执行; 子进程中不访问解析缓存,
+    由调用方负责缓存的读写
+
+    Args:
+        filepath: KMZ文件路径
+
+    Returns:
+        (观测数据, 错误信息列表或None)
+    """
+    file = KMZFile(filepath=filepath, use_cache=False)
+    return file.placemarks, file.errorMsg
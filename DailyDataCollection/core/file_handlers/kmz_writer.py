@@ -0,0 +1,147 @@
+"""
+KMZ文件写入模块
+
+使用 lxml.etree.xmlfile 将KML增量序列化, 直接写入KMZ压缩包中的 doc.kml 条目,
+图标文件以字节形式直接写入压缩包, 不产生临时KML文件和临时文件夹
+"""
+
+import os
+import stat
+import zipfile
+import tempfile
+import logging
+from typing import Iterable, Mapping, Optional
+
+from lxml import etree
+
+logger = logging.getLogger('KMZ Writer')
+logger.setLevel(logging.ERROR)
+
+# 压缩包中图标文件所在的文件夹
+ICON_FOLDER = "files"
+DEFAULT_ICON_NAME = "Layer0_Symbol_Square.png"
+
+# 进程的 umask（只能通过设置后恢复的方式读取, 在导入时读取一次）
+_UMASK = os.umask(0o022)
+os.umask(_UMASK)
+
+
+def icon_href(icon_path: Optional[str] = None) -> str:
+    """点样式中引用的图标路径（相对于压缩包根目录）"""
+    name = os.path.basename(icon_path) if icon_path else DEFAULT_ICON_NAME
+    return f"{ICON_FOLDER}/{name}"
+
+
+def build_line_style() -> etree._Element:
+    """线样式"""
+    style = etree.Element("Style", id="lineStyle")
+    line_style = etree.SubElement(style, "LineStyle")
+    color = etree.SubElement(line_style, "color")
+    color.text = "ff000000"  # 黑色, 格式为 AABBGGRR
+    width = etree.SubElement(line_style, "width")
+    width.text = "1"  # 线宽度
+    return style
+
+
+def build_point_style(href: str) -> etree._Element:
+    """点样式"""
+    style = etree.Element("Style", id="pointStyle")
+    icon_style = etree.SubElement(style, "IconStyle")
+    icon = etree.SubElement(icon_style, "Icon")
+    href_element = etree.SubElement(icon, "href")
+    href_element.text = href  # 使用自定义图标的 URL
+    return style
+
+
+def build_route_placemark(number: int, coordinates: str) -> etree._Element:
+    """线要素, number 为从1开始的线路编号"""
+    placemark = etree.Element("Placemark")
+    style_url = etree.SubElement(placemark, "styleUrl")
+    style_url.text = "#lineStyle"
+    name = etree.SubElement(placemark, "name")
+    name.text = f"Route {number}"
+    linestring = etree.SubElement(placemark, "LineString")
+    coord_elem = etree.SubElement(linestring, "coordinates")
+    coord_elem.text = coordinates
+    return placemark
+
+
+def build_point_placemark(obspid: str, coords: Mapping[str, float]) -> etree._Element:
+    """点要素"""
+    placemark = etree.Element("Placemark")
+    style_url = etree.SubElement(placemark, "styleUrl")
+    style_url.text = "#pointStyle"
+    name = etree.SubElement(placemark, "name")
+    name.text = obspid
+    point = etree.SubElement(placemark, "Point")
+    coordinates = etree.SubElement(point, "coordinates")
+    coordinates.text = f"{coords['longitude']},{coords['latitude']}"
+    return placemark
+
+
+def atomic_zip_writer(output_path: str):
+    """
+    在目标文件夹中创建唯一命名的临时压缩包, 返回 (临时文件路径, ZipFile)
+
+    写入完成后由调用方通过 os.replace 替换目标文件, 多个写入方同时写入同一文件夹时互不干扰。
+    mkstemp 创建的文件权限为 0600, 因此改为目标文件原有的权限（新文件按 umask 使用 0666 & ~umask）,
+    替换后的文件权限与直接写入时相同
+    """
+    output_dir = os.path.dirname(os.path.abspath(output_path))
+    os.makedirs(output_dir, exist_ok=True)
+    fd, temp_path = tempfile.mkstemp(
+        dir=output_dir, prefix=f".{os.path.basename(output_path)}.", suffix=".tmp"
+    )
+    os.close(fd)
+    try:
+        mode = stat.S_IMODE(os.stat(output_path).st_mode)
+    except OSError:
+        mode = 0o666 & ~_UMASK
+    try:
+        os.chmod(temp_path, mode)
+    except OSError:
+        os.remove(temp_path)
+        raise
+    return temp_path, zipfile.ZipFile(temp_path, 'w', zipfile.ZIP_DEFLATED)
+
+
+def add_icon(kmz: zipfile.ZipFile, icon_path: Optional[str]) -> None:
+    """将图标文件写入压缩包"""
+    if icon_path and os.path.exists(icon_path):
+        with open(icon_path, 'rb') as icon_file:
+            kmz.writestr(icon_href(icon_path), icon_file.read())
+
+
+def write_kmz(output_path: str, points: Mapping[str, Mapping[str, float]], routes: Iterable[str],
+              icon_path: Optional[str] = None) -> None:
+    """
+    将点要素和线要素写入KMZ文件
+
+    Args:
+        output_path: 输出KMZ文件路径
+        points: 点要素 {OBSID: {'longitude': 经度, 'latitude': 纬度}}
+        routes: 线要素坐标字符串列表
+        icon_path: 点要素图标文件路径
+
+    Raises:
+        OSError: 文件写入失败
+    """
+    temp_path, kmz = atomic_zip_writer(output_path)
+    try:
+        with kmz:
+            with kmz.open('doc.kml', 'w') as stream:
+                with etree.xmlfile(stream, encoding='UTF-8') as xf:
+                    xf.write_declaration()
+                    with xf.element("Document"):
+                        xf.write(build_line_style(), pretty_print=True)
+                        for i, coordinates in enumerate(routes):
+                            xf.write(build_route_placemark(i + 1, coordinates), pretty_print=True)
+                        xf.write(build_point_style(icon_href(icon_path)), pretty_print=True)
+                        for obspid, coords in points.items():
+                            xf.write(build_point_placemark(obspid, coords), pretty_print=True)
+            add_icon(kmz, icon_path)
+        os.replace(temp_path, output_path)
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
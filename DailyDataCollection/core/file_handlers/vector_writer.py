@@ -0,0 +1,237 @@
+"""
+矢量文件读写模块
+
+将点要素批量写入 ESRI Shapefile / GeoPackage / FlatGeobuf 文件:
+按批次开启事务提交要素, 图层定义、要素对象和点几何对象在整个写入过程中复用;
+读取时优先通过 Arrow 流按列读取属性, 不逐个构建要素
+"""
+
+import os
+import logging
+from typing import List, Mapping, Optional
+
+import numpy as np
+from osgeo import ogr, osr
+
+from ..data_models.point_store import PointStore
+
+logger = logging.getLogger('Vector Writer')
+logger.setLevel(logging.ERROR)
+
+# 文件扩展名 -> OGR 驱动名称
+VECTOR_DRIVERS = {
+    '.shp': 'ESRI Shapefile',
+    '.gpkg': 'GPKG',
+    '.fgb': 'FlatGeobuf',
+}
+
+# 每个事务提交的要素数
+DEFAULT_BATCH_SIZE = 10000
+
+# 点要素的属性字段
+NAME_FIELD = 'Name'
+LONGITUDE_FIELD = 'Longitude'
+LATITUDE_FIELD = 'Latitude'
+
+
+def driver_for_path(output_path: str) -> str:
+    """
+    根据文件扩展名确定 OGR 驱动名称
+
+    Raises:
+        ValueError: 不支持的文件类型
+    """
+    extension = os.path.splitext(output_path)[1].lower()
+    if extension not in VECTOR_DRIVERS:
+        raise ValueError(f"不支持的矢量文件类型: {extension}")
+    return VECTOR_DRIVERS[extension]
+
+
+def format_label(output_path: str) -> str:
+    """用于提示信息的文件格式名称, 如 SHP、GPKG、FGB"""
+    return os.path.splitext(output_path)[1].lstrip('.').upper() or '矢量'
+
+
+def _iter_point_rows(points: Mapping[str, Mapping[str, float]]):
+    """按顺序产生 (OBSID, 经度, 纬度), PointStore 直接按列读取"""
+    columns = getattr(points, 'columns', None)
+    if callable(columns):
+        obsids, longitudes, latitudes = columns()
+        return zip(obsids.tolist(), longitudes.tolist(), latitudes.tolist())
+    return ((obspid, float(coords['longitude']), float(coords['latitude']))
+            for obspid, coords in points.items())
+
+
+def write_points(output_path: str, points: Mapping[str, Mapping[str, float]],
+                 driver_name: Optional[str] = None, layer_name: str = 'points',
+                 batch_size: int = DEFAULT_BATCH_SIZE) -> int:
+    """
+    将点要素写入矢量文件（WGS84）, 已存在的文件会被覆盖
+
+    Args:
+        output_path: 输出文件路径
+        points: 点要素 {OBSID: {'longitude': 经度, 'latitude': 纬度}}
+        driver_name: OGR 驱动名称, 为空时根据扩展名确定
+        layer_name: 图层名称
+        batch_size: 每个事务提交的要素数
+
+    Returns:
+        写入的要素数
+
+    Raises:
+        ValueError: 不支持的文件类型
+        RuntimeError: 文件创建或要素写入失败
+    """
+    driver_name = driver_name or driver_for_path(output_path)
+    driver = ogr.GetDriverByName(driver_name)
+    if driver is None:
+        raise RuntimeError(f"OGR驱动不可用: {driver_name}")
+    if os.path.exists(output_path):
+        driver.DeleteDataSource(output_path)
+
+    data_source = driver.CreateDataSource(output_path)
+    if data_source is None:
+        raise RuntimeError(f"无法创建文件: {output_path}")
+
+    srs = osr.SpatialReference()
+    srs.ImportFromEPSG(4326)  # WGS84
+    layer = data_source.CreateLayer(layer_name, srs, ogr.wkbPoint)
+    if layer is None:
+        raise RuntimeError(f"无法创建图层: {layer_name}")
+
+    field_name = ogr.FieldDefn(NAME_FIELD, ogr.OFTString)
+    field_name.SetWidth(24)
+    layer.CreateField(field_name)
+    layer.CreateField(ogr.FieldDefn(LONGITUDE_FIELD, ogr.OFTReal))
+    layer.CreateField(ogr.FieldDefn(LATITUDE_FIELD, ogr.OFTReal))
+
+    layer_defn = layer.GetLayerDefn()
+    name_index = layer_defn.GetFieldIndex(NAME_FIELD)
+    longitude_index = layer_defn.GetFieldIndex(LONGITUDE_FIELD)
+    latitude_index = layer_defn.GetFieldIndex(LATITUDE_FIELD)
+
+    # 复用同一个要素和几何对象, SetGeometry 会复制几何, 不受后续修改影响
+    feature = ogr.Feature(layer_defn)
+    point = ogr.Geometry(ogr.wkbPoint)
+    point.AddPoint_2D(0.0, 0.0)
+
+    use_transactions = bool(layer.TestCapability(ogr.OLCTransactions))
+    count = 0
+    in_transaction = False
+    try:
+        for obspid, longitude, latitude in _iter_point_rows(points):
+            if use_transactions and not in_transaction:
+                layer.StartTransaction()
+                in_transaction = True
+
+            feature.SetFID(ogr.NullFID)
+            feature.SetField(name_index, obspid)
+            feature.SetField(longitude_index, longitude)
+            feature.SetField(latitude_index, latitude)
+            point.SetPoint_2D(0, longitude, latitude)
+            feature.SetGeometry(point)
+            if layer.CreateFeature(feature) != ogr.OGRERR_NONE:
+                raise RuntimeError(f"写入要素失败: {obspid}")
+            count += 1
+
+            if in_transaction and count % batch_size == 0:
+                layer.CommitTransaction()
+                in_transaction = False
+        if in_transaction:
+            layer.CommitTransaction()
+            in_transaction = False
+    except Exception:
+        if in_transaction:
+            layer.RollbackTransaction()
+        raise
+    finally:
+        feature = None
+        layer = None
+        data_source = None  # 关闭数据源, 写入文件
+
+    logger.info(f"已写入 {count} 个点要素: {output_path}")
+    return count
+
+
+def _string_column(values) -> np.ndarray:
+    """将 Arrow 流中的字符串列（bytes 或 str）转换为 str 数组"""
+    values = np.asarray(values)
+    if values.dtype.kind == 'S':
+        return np.char.decode(values, 'utf-8')
+    if values.dtype.kind == 'O':
+        return np.array(['' if value is None else
+                         value.decode('utf-8') if isinstance(value, bytes) else str(value)
+                         for value in values], dtype=str)
+    return values.astype(str)
+
+
+def _read_columns_arrow(layer) -> PointStore:
+    """通过 Arrow 流按批次读取三个属性列"""
+    layer.SetIgnoredFields(['OGR_GEOMETRY'])
+    obsid_parts: List[np.ndarray] = []
+    longitude_parts: List[np.ndarray] = []
+    latitude_parts: List[np.ndarray] = []
+    stream = layer.GetArrowStreamAsNumPy(options=['INCLUDE_FID=NO', 'USE_MASKED_ARRAYS=NO'])
+    for batch in stream:
+        obsid_parts.append(_string_column(batch[NAME_FIELD]))
+        longitude_parts.append(np.asarray(batch[LONGITUDE_FIELD], dtype=np.float64))
+        latitude_parts.append(np.asarray(batch[LATITUDE_FIELD], dtype=np.float64))
+    if not obsid_parts:
+        return PointStore()
+    obsids = np.concatenate(obsid_parts)
+    longitudes = np.concatenate(longitude_parts)
+    latitudes = np.concatenate(latitude_parts)
+    # 与逐要素读取一致: 跳过名称为空或坐标缺失的要素
+    valid = (obsids != '') & ~np.isnan(longitudes) & ~np.isnan(latitudes)
+    return PointStore(obsids[valid], longitudes[valid], latitudes[valid])
+
+
+def _read_columns_features(layer) -> PointStore:
+    """逐要素读取属性（GDAL 低于 3.6 时使用）, 不读取几何"""
+    layer.SetIgnoredFields(['OGR_GEOMETRY'])
+    layer_defn = layer.GetLayerDefn()
+    name_index = layer_defn.GetFieldIndex(NAME_FIELD)
+    longitude_index = layer_defn.GetFieldIndex(LONGITUDE_FIELD)
+    latitude_index = layer_defn.GetFieldIndex(LATITUDE_FIELD)
+    obsids: List[str] = []
+    longitudes: List[float] = []
+    latitudes: List[float] = []
+    for feature in layer:
+        obspid = feature.GetField(name_index)
+        if not obspid or not feature.IsFieldSetAndNotNull(longitude_index) \
+                or not feature.IsFieldSetAndNotNull(latitude_index):
+            continue
+        obsids.append(obspid)
+        longitudes.append(feature.GetFieldAsDouble(longitude_index))
+        latitudes.append(feature.GetFieldAsDouble(latitude_index))
+    return PointStore(obsids, longitudes, latitudes)
+
+
+def read_points(input_path: str) -> PointStore:
+    """
+    按列读取 write_points 生成的点要素文件
+
+    Args:
+        input_path: 矢量文件路径
+
+    Returns:
+        点要素的列式存储
+
+    Raises:
+        RuntimeError: 文件无法打开
+    """
+    data_source = ogr.Open(input_path, 0)  # 0 表示只读模式
+    if data_source is None:
+        raise RuntimeError(f"无法打开文件: {input_path}")
+    try:
+        layer = data_source.GetLayer()
+        if hasattr(layer, 'GetArrowStreamAsNumPy'):
+            try:
+                return _read_columns_arrow(layer)
+            except Exception as e:
+                logger.warning(f"Arrow 读取失败, 改为逐要素读取: {e}")
+                layer.ResetReading()
+        return _read_columns_features(layer)
+    finally:
+        layer = None
+        data_source = None
@@ -0,0 +1,36 @@
+"""
+延迟导入工具
+
+包的 __init__ 通过模块级 __getattr__（PEP 562）在首次访问时才导入子模块中的名称,
+避免只需要轻量功能（例如日期解析、命令行帮助）时也加载 lxml、numpy、GDAL、openpyxl 等依赖
+"""
+
+import importlib
+from typing import Callable, Dict, List, Tuple
+
+
+def lazy_exports(package: str, exports: Dict[str, str],
+                 namespace: dict) -> Tuple[Callable[[str], object], Callable[[], List[str]]]:
+    """
+    生成包的 __getattr__ 和 __dir__
+
+    Args:
+        package: 包名称（即包中的 __name__）
+        exports: {导出名称: 相对模块名称}
+        namespace: 包的 globals(), 导入后的名称写入其中, 之后的访问不再经过 __getattr__
+
+    Returns:
+        (__getattr__, __dir__)
+    """
+    def __getattr__(name: str) -> object:
+        module_name = exports.get(name)
+        if module_name is None:
+            raise AttributeError(f"module {package!r} has no attribute {name!r}")
+        value = getattr(importlib.import_module(module_name, package), name)
+        namespace[name] = value
+        return value
+
+    def __dir__() -> List[str]:
+        return sorted(set(namespace) | set(exports))
+
+    return __getattr__, __dir__
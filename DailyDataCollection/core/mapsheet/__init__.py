@@ -3,21 +3,26 @@
 
 包含图幅相关的处理类：
 - MapsheetDailyFile: 图幅日文件处理
+- FileOperationHelper: 图幅文件读取、复制和哈希缓存
 - CurrentDateFiles: 当前日期文件处理
-- MapsheetManager: 统一的图幅管理器
+- MapsheetManager: 统一的图幅管理器（实例通过 get_mapsheet_manager() 获取）
+- FinishedFileHistoryIndex: 历史完成文件索引
+
+各名称在首次访问时才导入, 图幅信息在首次调用 get_mapsheet_manager() 时才读取
 """
 
-try:
-    from .mapsheet_daily import MapsheetDailyFile
-    from .current_date_files import CurrentDateFiles
-    from .mapsheet_manager import MapsheetManager, mapsheet_manager
+from ..lazy_import import lazy_exports
+
+_EXPORTS = {
+    'MapsheetDailyFile': '.mapsheet_daily',
+    'FileOperationHelper': '.mapsheet_daily',
+    'CurrentDateFiles': '.current_date_files',
+    'MapsheetManager': '.mapsheet_manager',
+    'get_mapsheet_manager': '.mapsheet_manager',
+    'FinishedFileHistoryIndex': '.history_index',
+    'get_history_index': '.history_index',
+}
+
+__all__ = list(_EXPORTS)
 
-    __all__ = [
-        'MapsheetDailyFile',
-        'CurrentDateFiles',
-        'MapsheetManager',
-        'mapsheet_manager'
-    ]
-except ImportError as e:
-    print(f"导入图幅处理模块时出错: {e}")
-    __all__ = []
+__getattr__, __dir__ = lazy_exports(__name__, _EXPORTS, globals())
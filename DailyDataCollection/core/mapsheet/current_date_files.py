@@ -9,14 +9,18 @@ import logging
 import functools
 import threading
 import warnings
-from typing import Dict, List, Optional, Any, Tuple
-from openpyxl import Workbook, load_workbook
-from openpyxl.styles import Font, Border, Side, Alignment
+from typing import Dict, List, Optional, Any, Tuple, TYPE_CHECKING
 
 from ..data_models.observation_data import ObservationData
+from ..data_models.point_store import PointStore
 from ..data_models.date_types import DateType
-from ..file_handlers.kmz_handler import KMZFile
-from .mapsheet_daily import MapsheetDailyFile
+from ..file_handlers.kmz_handler import KMZFile, ICON_1
+from ..file_handlers.kmz_fragments import KMZFragmentCache, MapsheetFragment, write_kmz_from_fragments
+from .mapsheet_daily import MapsheetDailyFile, FileOperationHelper
+
+if TYPE_CHECKING:
+    # Excel 相关依赖（openpyxl、xlsxwriter）只在生成报告时导入
+    from ..reports.excel_writer import ReportSheet
 
 # 使用系统配置模块
 from config.config_manager import ConfigManager
@@ -28,6 +32,9 @@ SHEET_NAMES_FILE = config_manager.get_resolved_path('sheet_names_file')
 SEQUENCE_MIN = config_manager.get('mapsheet.sequence_min')
 SEQUENCE_MAX = config_manager.get('mapsheet.sequence_max')
 FOOTER_TOTAL_TITLE = config_manager.get('reports.excel.layout.footer.total_point_num_footer')
+EXCEL_ENGINE = config_manager.get('reports.excel.engine', 'auto')
+# 累计统计工作簿只修改受影响的单元格, 不经过 openpyxl 完整载入和保存
+STATISTICS_FAST_UPDATE = config_manager.get('reports.statistics_excel.fast_update', True)
 
 # 创建 logger 实例
 logger = logging.getLogger('Current Date Files')
@@ -55,8 +62,8 @@ class CurrentDateFiles:
             with cls._lock:
                 if date_key not in cls._instances:
                     # 使用新的图幅管理器
-                    from .mapsheet_manager import mapsheet_manager
-                    cls.maps_info = mapsheet_manager.maps_info
+                    from .mapsheet_manager import get_mapsheet_manager
+                    cls.maps_info = get_mapsheet_manager().maps_info
                     cls._instances[date_key] = super(CurrentDateFiles, cls).__new__(cls)
                     cls._instances[date_key]._initialized = False
         
@@ -82,6 +89,20 @@ class CurrentDateFiles:
         self.__datacollect()
         self._initialized = True
 
+    @classmethod
+    def get_existing_instance(cls, currentdate: 'DateType') -> Optional['CurrentDateFiles']:
+        """获取指定日期已完成初始化的缓存实例, 不存在时返回 None（不会创建新实例）"""
+        instance = cls._instances.get(str(currentdate))
+        if instance is None or not instance._initialized:
+            return None
+        return instance
+
+    @classmethod
+    def release_instance(cls, currentdate: 'DateType') -> None:
+        """移除指定日期的缓存实例, 批量收集多个日期时释放已处理日期占用的内存"""
+        with cls._lock:
+            cls._instances.pop(str(currentdate), None)
+
     def _clear_cache(self):
         """清理所有缓存属性"""
         self._cached_sorted_mapsheets = None
@@ -97,22 +118,22 @@ class CurrentDateFiles:
         """
         从100K图幅名称信息表中获取图幅的罗马名称和拉丁名称
         
-        注意：此方法已弃用，请使用 mapsheet_manager.maps_info 替代
+        注意：此方法已弃用，请使用 get_mapsheet_manager().maps_info 替代
         """
         warnings.warn(
-            "CurrentDateFiles.mapsInfo() 已弃用，请使用 mapsheet_manager.maps_info",
+            "CurrentDateFiles.mapsInfo() 已弃用，请使用 get_mapsheet_manager().maps_info",
             DeprecationWarning,
             stacklevel=2
         )
         
-        from .mapsheet_manager import mapsheet_manager
-        return mapsheet_manager.maps_info
+        from .mapsheet_manager import get_mapsheet_manager
+        return get_mapsheet_manager().maps_info
 
     def __datacollect(self) -> 'CurrentDateFiles':
         """收集当天的所有文件 - 使用统一的图幅管理器"""
-        from .mapsheet_manager import mapsheet_manager
+        from .mapsheet_manager import get_mapsheet_manager
         # 使用图幅管理器创建图幅对象集合
-        self.currentDateFiles = mapsheet_manager.create_mapsheet_collection(MapsheetDailyFile, self.currentDate)
+        self.currentDateFiles = get_mapsheet_manager().create_mapsheet_collection(MapsheetDailyFile, self.currentDate)
         return self
 
     @functools.cached_property
@@ -217,15 +238,15 @@ class CurrentDateFiles:
         return total
 
     @functools.cached_property
-    def allPoints(self) -> Dict:
-        """截止当天所有文件的点要素"""
-        all_points = {}
+    def allPoints(self) -> PointStore:
+        """截止当天所有文件的点要素（列式存储, 可按字典方式访问）"""
+        point_sets = []
         for mapsheet in self.currentDateFiles:
             if mapsheet.currentPlacemarks is not None:
-                all_points.update(mapsheet.currentPlacemarks.points)
+                point_sets.append(mapsheet.currentPlacemarks.points)
             elif mapsheet.lastPlacemarks is not None:
-                all_points.update(mapsheet.lastPlacemarks.points)
-        return all_points
+                point_sets.append(mapsheet.lastPlacemarks.points)
+        return PointStore.concat(point_sets)
 
     @functools.cached_property
     def totalRoutesNum(self) -> int:
@@ -263,17 +284,15 @@ class CurrentDateFiles:
         """重写__contains__方法, 用于判断图幅文件是否存在"""
         return key in self.currentDateFiles
 
-    def dailyKMZReport(self) -> bool:
-        """生成每日KMZ报告"""
+    def dailyKMZReport(self, incremental: Optional[bool] = None) -> bool:
+        """
+        生成每日KMZ报告
+        
+        Args:
+            incremental: 是否复用各图幅上一次序列化的片段, 只重新序列化源文件发生变化的图幅;
+                为None时使用配置文件中的设置
+        """
         try:
-            dailykmz = KMZFile(
-                placemarks=ObservationData(
-                    points=self.allPoints, 
-                    pointsCount=len(self.allPoints), 
-                    routes=self.allRoutes, 
-                    routesCount=len(self.allRoutes)
-                )
-            )
             output_path = os.path.join(
                 WORKSPACE, 
                 self.currentDate.yyyymm_str, 
@@ -284,6 +303,22 @@ class CurrentDateFiles:
             # 确保输出目录存在
             os.makedirs(os.path.dirname(output_path), exist_ok=True)
             
+            if incremental is None:
+                incremental = config_manager.get('performance.incremental_kmz.enabled', True)
+            if incremental and self._dailyKMZReportIncremental(output_path):
+                print(f"KMZ文件已保存到: {output_path}")
+                logger.info(f"成功生成每日KMZ报告: {output_path}")
+                return True
+            
+            dailykmz = KMZFile(
+                placemarks=ObservationData(
+                    points=self.allPoints, 
+                    pointsCount=len(self.allPoints), 
+                    routes=self.allRoutes, 
+                    routesCount=len(self.allRoutes)
+                )
+            )
+            
             success = dailykmz.write_as(newpath=output_path)
             if success:
                 logger.info(f"成功生成每日KMZ报告: {output_path}")
@@ -293,6 +328,46 @@ class CurrentDateFiles:
             logger.error(f"生成每日KMZ报告失败: {e}")
             return False
 
+    def _dailyKMZReportIncremental(self, output_path: str) -> bool:
+        """
+        由各图幅的序列化片段拼接生成每日KMZ报告
+        
+        Returns:
+            是否成功生成; 不同图幅之间存在重复点号（需要按完整生成的规则去重）或发生错误时返回 False,
+            由调用方回退到完整生成
+        """
+        sources = []
+        for mapsheet in self.currentDateFiles:
+            if mapsheet.currentPlacemarks is not None:
+                sources.append((mapsheet, mapsheet.currentfilepath, mapsheet.currentPlacemarks))
+            elif mapsheet.lastPlacemarks is not None:
+                sources.append((mapsheet, mapsheet.lastfilepath, mapsheet.lastPlacemarks))
+        
+        if sum(len(placemarks.points) for _, _, placemarks in sources) != len(self.allPoints):
+            logger.info("不同图幅之间存在重复点号, 使用完整生成方式")
+            return False
+        
+        try:
+            cache = KMZFragmentCache(config_manager.get_cache_directory('kmz_fragments'))
+            fragments = []
+            rebuilt = 0
+            for mapsheet, filepath, placemarks in sources:
+                source_hash = FileOperationHelper.get_file_hash(filepath) if filepath else None
+                fragment = cache.get(mapsheet.mapsheetFileName, source_hash) if source_hash else None
+                if fragment is None:
+                    fragment = MapsheetFragment.build(source_hash, placemarks.points, placemarks.routes)
+                    if source_hash:
+                        cache.put(mapsheet.mapsheetFileName, fragment)
+                    rebuilt += 1
+                fragments.append(fragment)
+            
+            write_kmz_from_fragments(output_path, fragments, ICON_1)
+            logger.info(f"增量生成每日KMZ报告: 重新序列化{rebuilt}个图幅, 复用{len(fragments) - rebuilt}个图幅")
+            return True
+        except Exception as e:
+            logger.warning(f"增量生成每日KMZ报告失败, 使用完整生成方式: {e}")
+            return False
+
     def dailyExcelReport(self) -> bool:
         """生成每日Excel报告"""
         try:
@@ -334,132 +409,64 @@ class CurrentDateFiles:
 
     def _create_excel_workbook(self, output_path: str) -> None:
         """创建Excel工作簿"""
+        from ..reports.excel_writer import write_report
+
+        engine = write_report(output_path, self._build_daily_statistics_sheet(), EXCEL_ENGINE)
+        logger.debug(f"Excel报告写入引擎: {engine}")
+
+    def _build_daily_statistics_sheet(self) -> 'ReportSheet':
+        """构建每日统计表的完整内容（表头、图幅数据、合计行和表尾）"""
         roman_names_list = self._get_roman_names_list()
         max_table_rows = len(roman_names_list) + 5
         max_table_columns = 4
-        
-        # 创建新的Excel文件
-        book = Workbook()
-        sheet = book.active
-        sheet.title = "Daily Statistics"
-        
-        # 设置表头、样式和数据
-        self._setup_excel_headers(sheet, max_table_rows, max_table_columns, roman_names_list)
-        self._setup_excel_styles(sheet, max_table_rows, max_table_columns)
-        self._setup_excel_data(sheet, max_table_rows)
-        
-        # 保存工作簿
-        book.save(output_path)
+        rows: List[List[Any]] = [[None] * max_table_columns for _ in range(max_table_rows)]
+
+        def set_row(row_number: int, values: List[Any]) -> None:
+            rows[row_number - 1][:len(values)] = values
 
-    def _setup_excel_headers(self, sheet, maxTableRows: int, maxTableColumns: int, romanNames_list: List[str]):
-        """设置Excel表头"""
         # 每日统计点文件的表头（前三行）
-        daily_stat_header1 = ['Date', self.currentDate.yyyy_str + "/" + self.currentDate.mm_str + "/" + self.currentDate.dd_str]
-        daily_stat_header2 = [
+        set_row(1, ['Date', self.currentDate.yyyy_str + "/" + self.currentDate.mm_str + "/" + self.currentDate.dd_str])
+        set_row(2, [
             'Map sheet name',
             'Regular observation points finished',
             'Field points on revised route'
-        ]
-        daily_stat_header3 = [
+        ])
+        set_row(3, [
             '', '', 'Added observation points',
             'Added Structure points, photo points, mineralization points'
-        ]
-        
-        # 写入表头
-        for col_num, value in enumerate(daily_stat_header1, start=1):
-            sheet.cell(row=1, column=col_num, value=value)
-        for col_num, value in enumerate(daily_stat_header2, start=1):
-            sheet.cell(row=2, column=col_num, value=value)
-        for col_num, value in enumerate(daily_stat_header3, start=1):
-            sheet.cell(row=3, column=col_num, value=value)
-        
+        ])
+
         # 写入图幅名称
-        for i, value in enumerate(romanNames_list, start=4):
-            sheet.cell(row=i, column=1, value=value)
-        
-        # 写入表尾
-        daily_stat_footer = ['Today', '', '', '']
-        total_Point_Num_footer = [FOOTER_TOTAL_TITLE, '', '', '']
-        
-        for col_num, value in enumerate(daily_stat_footer, start=1):
-            sheet.cell(row=maxTableRows-1, column=col_num, value=value)
-        for col_num, value in enumerate(total_Point_Num_footer, start=1):
-            sheet.cell(row=maxTableRows, column=col_num, value=value)
-
-    def _setup_excel_styles(self, sheet, maxTableRows: int, maxTableColumns: int):
-        """设置Excel样式"""
-        # 设置字体
-        font_header = Font(name='Calibri', size=12, bold=True)
-        font = Font(name='Calibri', size=11)
-        
-        # 设置边框
-        border = Border(
-            left=Side(border_style='thin'),
-            right=Side(border_style='thin'),
-            top=Side(border_style='thin'),
-            bottom=Side(border_style='thin')
+        for row_number, value in enumerate(roman_names_list, start=4):
+            rows[row_number - 1][0] = value
+
+        # 填充实际数据
+        self._fill_excel_data(rows, max_table_rows)
+
+        # 合计行: 第2列为当日新增总数, 其余列为求和公式
+        set_row(max_table_rows - 1, [
+            'Today',
+            self.totalDaiyIncreasePointNum,
+            f"=SUM(C4:C{max_table_rows-2})",
+            f"=SUM(D4:D{max_table_rows-2})"
+        ])
+        # 最后一行（TOTAL行）写入累计总数
+        set_row(max_table_rows, [FOOTER_TOTAL_TITLE, self.totalPointNum, '', ''])
+
+        from ..reports.excel_writer import ReportSheet
+
+        return ReportSheet(
+            title="Daily Statistics",
+            rows=rows,
+            header_rows={1, 2, 3, max_table_rows - 1, max_table_rows},
+            merged_ranges=['B1:D1', 'C2:D2', 'A2:A3', 'B2:B3'],
         )
-        
-        # 应用样式
-        for row in range(1, maxTableRows + 1):
-            for col in range(1, maxTableColumns + 1):
-                cell = sheet.cell(row=row, column=col)
-                cell.border = border
-                
-                # 设置字体
-                if row in [1, 2, 3, maxTableRows-1, maxTableRows]:
-                    cell.font = font_header
-                else:
-                    cell.font = font
-        
-        # 设置对齐
-        center_aligned = Alignment(horizontal='center', vertical='center')
-        for row in range(1, maxTableRows + 1):
-            for col in range(1, maxTableColumns + 1):
-                sheet.cell(row=row, column=col).alignment = center_aligned
-        
-        # 调整列宽
-        for column in sheet.columns:
-            max_length = 0
-            column = [cell for cell in column]
-            for cell in column:
-                try:
-                    if len(str(cell.value)) > max_length:
-                        max_length = len(cell.value)
-                except Exception:
-                    pass
-            adjusted_width = (max_length + 2)
-            sheet.column_dimensions[column[0].column_letter].width = adjusted_width
-
-    def _setup_excel_data(self, sheet, maxTableRows: int):
-        """设置Excel数据和公式"""
-        # 填充实际数据到Excel表格
-        self._fill_excel_data(sheet, maxTableRows)
-        
-        # 设置合计行的公式
-        sheet.cell(row=maxTableRows-1, column=2).value = f"=SUM(B4:B{maxTableRows-2})"
-        sheet.cell(row=maxTableRows-1, column=3).value = f"=SUM(C4:C{maxTableRows-2})"
-        sheet.cell(row=maxTableRows-1, column=4).value = f"=SUM(D4:D{maxTableRows-2})"
-
-        # 在倒数第二行（合计行）写入当日新增数量
-        sheet.cell(row=maxTableRows-1, column=2, value=self.totalDaiyIncreasePointNum) 
-
-        # 在最后一行（TOTAL行）写入总数
-        sheet.cell(row=maxTableRows, column=2, value=self.totalPointNum)             # 累计总数
 
-        # 合并单元格
-        sheet.merge_cells('B1:D1')
-        sheet.merge_cells('C2:D2')
-        sheet.merge_cells('A2:A3')
-        sheet.merge_cells('B2:B3')
-
-    def _fill_excel_data(self, sheet, maxTableRows: int):
-        """填充实际数据到Excel表格"""
+    def _fill_excel_data(self, rows: List[List[Any]], maxTableRows: int):
+        """填充实际数据到表格"""
         try:
             # 获取数据字典
             daily_increased = self.dailyIncreasedPoints
-            daily_finished = self.dailyFinishedPoints
-            daily_plans = self.DailyPlans
             
             # 按序号排序的图幅列表
             sorted_mapsheets = sorted(self.currentDateFiles, key=lambda mapsheet: mapsheet.sequence)
@@ -468,23 +475,17 @@ class CurrentDateFiles:
             current_row = 4
             
             for mapsheet in sorted_mapsheets:
-                roman_name = mapsheet.romanName
+                row = rows[current_row - 1]
                 
                 # 第1列：图幅名称
-                sheet.cell(row=current_row, column=1, value=roman_name)
+                row[0] = mapsheet.romanName
                 
                 # 第2列：当日新增点数 (如果为0显示空值)
-                increased_points = daily_increased.get(roman_name, 0)
-                sheet.cell(row=current_row, column=2, 
-                          value=increased_points if increased_points > 0 else None)
+                increased_points = daily_increased.get(mapsheet.romanName, 0)
+                row[1] = increased_points if increased_points > 0 else None
                 
                 # 第3列：当日新增线路/结构点等 (暂时留空，可以后续扩展)
-                sheet.cell(row=current_row, column=3, value=None)
-                
-                # 第4列：累计完成点数 (如果为0显示空值)
-                # finished_points = daily_finished.get(roman_name, 0)
-                # sheet.cell(row=current_row, column=4, 
-                #           value=finished_points if finished_points > 0 else None)
+                row[2] = None
                 
                 current_row += 1
                 
@@ -508,12 +509,42 @@ class CurrentDateFiles:
         Returns:
             bool: 写入成功返回True，失败返回False
         """
-        try:
-            # 检查目标文件是否存在
-            if not os.path.exists(target_excel_path):
-                logger.error(f"目标Excel文件不存在: {target_excel_path}")
+        # 检查目标文件是否存在
+        if not os.path.exists(target_excel_path):
+            logger.error(f"目标Excel文件不存在: {target_excel_path}")
+            return False
+
+        if STATISTICS_FAST_UPDATE:
+            from ..reports.statistics_workbook import PatchNotApplicable
+
+            try:
+                return self._write_statistics_column_fast(target_excel_path)
+            except PatchNotApplicable as e:
+                logger.info(f"无法直接修改工作簿, 改用openpyxl写入: {e}")
+            except Exception as e:
+                logger.error(f"写入当日新增数据到Excel文件失败: {e}")
                 return False
-            
+
+        return self._write_statistics_column_openpyxl(target_excel_path)
+
+    def _write_statistics_column_fast(self, target_excel_path: str) -> bool:
+        """通过日期索引定位列, 只修改工作表 XML 中受影响的单元格"""
+        from ..reports.statistics_workbook import StatisticsWorkbook
+
+        workbook = StatisticsWorkbook(target_excel_path, "总表")
+        target_col = workbook.find_date_column(self.currentDate.date_datetime)
+        if target_col is None:
+            logger.error(f"在Excel中未找到日期 {self.currentDate} 对应的列")
+            return False
+        workbook.write_column(target_col, 3, self._increased_column_values())
+        logger.info(f"成功将当日新增数据写入Excel文件: {target_excel_path}")
+        return True
+
+    def _write_statistics_column_openpyxl(self, target_excel_path: str) -> bool:
+        """使用 openpyxl 载入并保存整个工作簿"""
+        from openpyxl import load_workbook
+
+        try:
             # 加载现有工作簿
             wb = load_workbook(target_excel_path)
             
@@ -547,32 +578,25 @@ class CurrentDateFiles:
             logger.error(f"写入当日新增数据到Excel文件失败: {e}")
             return False
 
+    def _increased_column_values(self) -> List[Optional[int]]:
+        """按图幅序号排列的当日新增点数（为0时为空值）"""
+        daily_increased = self.dailyIncreasedPoints
+        sorted_mapsheets = sorted(self.currentDateFiles, key=lambda mapsheet: mapsheet.sequence)
+        values = []
+        for mapsheet in sorted_mapsheets:
+            increased_points = daily_increased.get(mapsheet.romanName, 0)
+            values.append(increased_points if increased_points > 0 else None)
+        return values
+
     def _fill_increased_data_to_col(self, ws, target_col):
-        """
-        Purpose: Fill in the increased data for the specified column
-        """
         """填充实际数据到Excel表格"""
         try:
-            # 获取数据字典
-            daily_increased = self.dailyIncreasedPoints
-            
-            # 按序号排序的图幅列表
-            sorted_mapsheets = sorted(self.currentDateFiles, key=lambda mapsheet: mapsheet.sequence)
-            
             # 从第3行开始填充数据 (前2行是表头)
-            current_row = 3
-
-            for mapsheet in sorted_mapsheets:
-                roman_name = mapsheet.romanName
-            
-                # 当日新增点数 (如果为0显示空值)
-                increased_points = daily_increased.get(roman_name, 0)
-                ws.cell(row=current_row, column=target_col, 
-                          value=increased_points if increased_points > 0 else None)
-                
-                current_row += 1
+            values = self._increased_column_values()
+            for current_row, value in enumerate(values, start=3):
+                ws.cell(row=current_row, column=target_col, value=value)
                     
-            logger.info(f"成功填充 {current_row-3} 行数据到Daily statics Excel表格")
+            logger.info(f"成功填充 {len(values)} 行数据到Daily statics Excel表格")
         
         except Exception as e:
             logger.error(f"写入当日新增数据到Daily statics Excel表格失败: {e}")
@@ -0,0 +1,204 @@
+"""
+历史完成文件索引模块
+
+一次扫描工作目录下的 YYYYMM/YYYYMMDD/Finished points 文件夹, 为每个图幅建立按日期排序的
+历史文件列表, 使查找"某日期之前最近一次完成的文件"成为二分查找, 无需逐日检查文件夹
+"""
+
+import os
+import re
+import time
+import bisect
+import logging
+import threading
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# 索引的默认有效期（秒）
+DEFAULT_MAX_AGE = 60.0
+
+_MONTH_DIR_RE = re.compile(r'^\d{6}$')
+_DAY_DIR_RE = re.compile(r'^\d{8}$')
+_FILENAME_DATE_RE = re.compile(r'_(\d{8})\.kmz$')
+
+
+class FinishedFileHistoryIndex:
+    """
+    完成点文件的历史索引
+
+    查找规则与逐日回溯保持一致: 在 [起始日期, 当前日期) 范围内从最近的日期文件夹开始,
+    优先使用标准命名的文件, 否则使用文件夹中以图幅名称开头、包含 finished_points_and_tracks 的
+    文件里文件名日期最新的一个
+    """
+
+    FOLDER_NAME = "Finished points"
+    FILE_KEYWORD = "finished_points_and_tracks"
+
+    def __init__(self, workspace: str, max_age: float = DEFAULT_MAX_AGE):
+        self.workspace = workspace
+        self.max_age = max_age
+
+        # 月份文件夹路径 -> (修改时间, 日期文件夹名称列表)
+        self._months: Dict[str, Tuple[int, List[str]]] = {}
+        # 日期字符串 -> (Finished points 文件夹修改时间, 文件名列表)
+        self._days: Dict[str, Tuple[int, List[str]]] = {}
+        # 图幅名称 -> (排序后的日期列表, 对应的 (文件路径, 是否标准命名) 列表)
+        self._by_mapsheet: Dict[str, Tuple[List[str], List[Tuple[str, bool]]]] = {}
+        self._last_refresh: Optional[float] = None
+        self._lock = threading.RLock()
+
+    def _folder_path(self, date_str: str) -> str:
+        return os.path.join(self.workspace, date_str[:6], date_str, self.FOLDER_NAME)
+
+    @staticmethod
+    def _list_names(path: str) -> List[str]:
+        try:
+            return sorted(os.listdir(path))
+        except OSError:
+            return []
+
+    def refresh(self) -> None:
+        """增量刷新索引, 只重新列出修改时间发生变化的文件夹"""
+        with self._lock:
+            changed = False
+            months: Dict[str, Tuple[int, List[str]]] = {}
+            days: Dict[str, Tuple[int, List[str]]] = {}
+
+            for month in self._list_names(self.workspace):
+                if not _MONTH_DIR_RE.match(month):
+                    continue
+                month_path = os.path.join(self.workspace, month)
+                try:
+                    month_mtime = os.stat(month_path).st_mtime_ns
+                except OSError:
+                    continue
+                cached = self._months.get(month_path)
+                if cached is None or cached[0] != month_mtime:
+                    day_names = [d for d in self._list_names(month_path) if _DAY_DIR_RE.match(d)]
+                    cached = (month_mtime, day_names)
+                months[month_path] = cached
+
+                for day in cached[1]:
+                    folder = self._folder_path(day)
+                    try:
+                        folder_mtime = os.stat(folder).st_mtime_ns
+                    except OSError:
+                        continue
+                    day_cached = self._days.get(day)
+                    if day_cached is None or day_cached[0] != folder_mtime:
+                        day_cached = (folder_mtime, self._list_names(folder))
+                        changed = True
+                    days[day] = day_cached
+
+            if changed or days.keys() != self._days.keys():
+                self._by_mapsheet.clear()
+            self._months = months
+            self._days = days
+            self._last_refresh = time.monotonic()
+
+    def invalidate(self) -> None:
+        """使索引过期, 下一次查询时重新刷新"""
+        with self._lock:
+            self._last_refresh = None
+
+    def add_file(self, path: str) -> None:
+        """记录程序写入工作目录的完成点文件, 无需等待下一次刷新"""
+        folder, name = os.path.split(path)
+        day = os.path.basename(os.path.dirname(folder))
+        if os.path.basename(folder) != self.FOLDER_NAME or not _DAY_DIR_RE.match(day):
+            return
+        with self._lock:
+            if self._last_refresh is None:
+                return
+            if day not in self._days:
+                # 新的日期文件夹, 交由下一次刷新处理
+                self._last_refresh = None
+                return
+            mtime_ns, names = self._days[day]
+            if name not in names:
+                self._days[day] = (mtime_ns, sorted(names + [name]))
+                self._by_mapsheet.clear()
+
+    def _ensure_fresh(self) -> None:
+        if self._last_refresh is None or time.monotonic() - self._last_refresh > self.max_age:
+            self.refresh()
+
+    def _mapsheet_history(self, mapsheet: str) -> Tuple[List[str], List[Tuple[str, bool]]]:
+        """构建单个图幅按日期排序的历史文件列表"""
+        history = self._by_mapsheet.get(mapsheet)
+        if history is not None:
+            return history
+
+        dates: List[str] = []
+        files: List[Tuple[str, bool]] = []
+        for day in sorted(self._days):
+            names = self._days[day][1]
+            exact_name = f"{mapsheet}_{self.FILE_KEYWORD}_{day}.kmz"
+            if exact_name in names:
+                dates.append(day)
+                files.append((os.path.join(self._folder_path(day), exact_name), True))
+                continue
+
+            matching = [
+                name for name in names
+                if name.startswith(mapsheet) and name.endswith('.kmz') and self.FILE_KEYWORD in name
+            ]
+            if matching:
+                # 多个匹配时选择文件名中日期最新的文件
+                matching.sort(key=self._filename_date_key, reverse=True)
+                dates.append(day)
+                files.append((os.path.join(self._folder_path(day), matching[0]), False))
+
+        history = (dates, files)
+        self._by_mapsheet[mapsheet] = history
+        return history
+
+    @staticmethod
+    def _filename_date_key(name: str) -> str:
+        match = _FILENAME_DATE_RE.search(name)
+        return match.group(1) if match else "00000000"
+
+    def find_latest(self, mapsheet: str, before: datetime,
+                    not_before: datetime) -> Optional[Tuple[datetime, str, bool]]:
+        """
+        查找图幅在指定日期之前最近一次完成的文件
+
+        Args:
+            mapsheet: 图幅文件名称
+            before: 查找早于该日期的文件（不含）
+            not_before: 最早的查找日期（含）
+
+        Returns:
+            (文件夹日期, 文件路径, 是否标准命名), 未找到时返回None
+        """
+        with self._lock:
+            self._ensure_fresh()
+            dates, files = self._mapsheet_history(mapsheet)
+            position = bisect.bisect_left(dates, before.strftime("%Y%m%d")) - 1
+            if position < 0 or dates[position] < not_before.strftime("%Y%m%d"):
+                return None
+            path, exact = files[position]
+            return datetime.strptime(dates[position], "%Y%m%d"), path, exact
+
+
+# 进程内共享的索引实例, 键为工作目录
+_history_indexes: Dict[str, FinishedFileHistoryIndex] = {}
+_history_indexes_lock = threading.Lock()
+
+
+def get_history_index(workspace: str) -> FinishedFileHistoryIndex:
+    """获取工作目录的共享历史文件索引"""
+    with _history_indexes_lock:
+        index = _history_indexes.get(workspace)
+        if index is None:
+            max_age = DEFAULT_MAX_AGE
+            try:
+                from config.config_manager import ConfigManager
+                max_age = ConfigManager().get('performance.file_index.max_age_seconds', DEFAULT_MAX_AGE)
+            except Exception:
+                pass
+            index = FinishedFileHistoryIndex(workspace, max_age=max_age)
+            _history_indexes[workspace] = index
+        return index
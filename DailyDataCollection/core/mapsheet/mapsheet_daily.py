@@ -9,13 +9,20 @@ import stat
 import shutil
 import json
 import logging
+import threading
 from datetime import datetime, timedelta
-from typing import Dict, Optional, Any, List
+from concurrent.futures import Executor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Dict, Iterable, Optional, Any, List, Tuple
 from pathlib import Path
 
 from ..data_models.observation_data import ObservationData
-from ..file_handlers.kmz_handler import KMZFile
-from ..utils.file_utils import list_fullpath_of_files_with_keywords
+from ..file_handlers.kmz_handler import KMZFile, parse_kmz_file
+from ..file_handlers.kmz_cache import get_kmz_parse_cache
+from ..utils.file_index import get_file_index
+from ..utils.file_utils import files_differ
+from ..utils.hash_cache import FileHashCache, get_hash_cache
+from .history_index import get_history_index
 
 # 使用系统配置模块
 from config.config_manager import ConfigManager
@@ -54,31 +61,103 @@ logger = logging.getLogger(__name__)
 class FileOperationHelper:
     """文件操作助手类，统一处理文件操作"""
     
-    # 文件哈希缓存，避免重复计算
-    _hash_cache: Dict[str, str] = {}
+    # 文件哈希缓存，避免重复计算（容量有限的LRU缓存, 持久化到缓存目录）
+    _hash_cache: Optional[FileHashCache] = None
+
+    # KMZ解析使用的进程池, 为None时在当前线程中解析（由图幅管理器在并行收集时设置）
+    parse_executor: Optional[Executor] = None
+
+    # 多日期批量收集时已解析的观测数据: 文件路径 -> ((大小, 修改时间), 观测数据, 错误信息)
+    # 前一日的当日文件即为后一日的上一次文件, 无需再次读取; 为None时不启用
+    _placemarks_memo: Optional[Dict[str, Tuple[Tuple[int, int], Optional[ObservationData], Optional[list]]]] = None
+    _placemarks_memo_lock = threading.Lock()
+
+    @classmethod
+    def enable_placemarks_memo(cls, enabled: bool = True) -> None:
+        """启用（或停用并清空）批量收集期间的观测数据记录"""
+        with cls._placemarks_memo_lock:
+            cls._placemarks_memo = {} if enabled else None
+
+    @classmethod
+    def retain_placemarks_memo(cls, file_paths: Iterable[str]) -> None:
+        """只保留指定文件的观测数据记录, 释放其余记录占用的内存"""
+        keep = set(file_paths)
+        with cls._placemarks_memo_lock:
+            if cls._placemarks_memo is not None:
+                cls._placemarks_memo = {
+                    path: entry for path, entry in cls._placemarks_memo.items() if path in keep
+                }
+
+    @staticmethod
+    def load_kmz(file_path: str) -> Tuple[Optional[ObservationData], Optional[list]]:
+        """
+        读取并解析KMZ文件
+
+        启用了批量收集记录时, 文件状态未变化则直接返回记录的结果;
+        设置了解析进程池时, 先在当前进程中查询解析缓存, 未命中再交由进程池解析并写回缓存;
+        进程池不可用时回退到在当前线程中解析
+
+        Returns:
+            (观测数据, 错误信息列表或None)
+        """
+        memo = FileOperationHelper._placemarks_memo
+        if memo is None:
+            return FileOperationHelper._load_kmz(file_path)
+
+        file_stat = os.stat(file_path)
+        stamp = (file_stat.st_size, file_stat.st_mtime_ns)
+        entry = memo.get(file_path)
+        if entry is not None and entry[0] == stamp:
+            return entry[1], entry[2]
+
+        placemarks, error_msg = FileOperationHelper._load_kmz(file_path)
+        with FileOperationHelper._placemarks_memo_lock:
+            if FileOperationHelper._placemarks_memo is not None:
+                FileOperationHelper._placemarks_memo[file_path] = (stamp, placemarks, error_msg)
+        return placemarks, error_msg
+
+    @staticmethod
+    def _load_kmz(file_path: str) -> Tuple[Optional[ObservationData], Optional[list]]:
+        executor = FileOperationHelper.parse_executor
+        if executor is None:
+            file = KMZFile(filepath=file_path)
+            return file.placemarks, file.errorMsg
+
+        cache = get_kmz_parse_cache()
+        if cache is not None:
+            cached = cache.get(file_path)
+            if cached is not None:
+                return cached, cached.errorMsg or None
+
+        try:
+            placemarks, error_msg = executor.submit(parse_kmz_file, file_path).result()
+        except (BrokenProcessPool, RuntimeError) as e:
+            logger.warning(f"解析进程池不可用，改为在当前线程中解析 {file_path}: {e}")
+            file = KMZFile(filepath=file_path)
+            return file.placemarks, file.errorMsg
+
+        if cache is not None and placemarks is not None:
+            cache.put(file_path, placemarks)
+        return placemarks, error_msg
     
     @staticmethod
     def get_file_hash(file_path: str) -> Optional[str]:
         """获取文件哈希值，使用缓存优化性能"""
         try:
-            # 获取文件修改时间作为缓存键的一部分
-            mtime = os.path.getmtime(file_path)
-            cache_key = f"{file_path}:{mtime}"
-            
-            if cache_key in FileOperationHelper._hash_cache:
-                return FileOperationHelper._hash_cache[cache_key]
-            
-            # 计算哈希值
-            kmz_file = KMZFile(filepath=file_path)
-            hash_value = kmz_file.hashMD5
-            
-            # 缓存结果
-            FileOperationHelper._hash_cache[cache_key] = hash_value
-            return hash_value
+            if FileOperationHelper._hash_cache is None:
+                FileOperationHelper._hash_cache = get_hash_cache()
+            return FileOperationHelper._hash_cache.get_hash(file_path)
         except Exception as e:
             logger.warning(f"计算文件哈希失败 {file_path}: {e}")
             return None
     
+    @staticmethod
+    def get_hash_cache_stats() -> Dict[str, float]:
+        """获取文件哈希缓存的命中统计"""
+        if FileOperationHelper._hash_cache is None:
+            FileOperationHelper._hash_cache = get_hash_cache()
+        return FileOperationHelper._hash_cache.stats()
+    
     @staticmethod
     def safe_copy_file(source_file: str, dest_file: str, max_retries: int = DEFAULT_MAX_RETRIES) -> None:
         """安全地复制文件，包含重试机制和权限处理"""
@@ -147,8 +226,8 @@ class MapsheetDailyFile:
         """加载图幅信息，只加载一次"""
         if cls._maps_info is None:
             try:
-                from .mapsheet_manager import mapsheet_manager
-                cls._maps_info = mapsheet_manager.maps_info
+                from .mapsheet_manager import get_mapsheet_manager
+                cls._maps_info = get_mapsheet_manager().maps_info
             except ImportError as e:
                 logger.error(f"无法导入图幅管理器: {e}")
                 cls._maps_info = {}
@@ -254,46 +333,58 @@ class MapsheetDailyFile:
         """
         获取当天的文件
         """
-        file_path = os.path.join(
+        # 查找微信聊天记录文件夹中该图幅当天的完成点文件
+        # 使用共享的文件名索引, 按文件名解析出的 (图幅, 日期, 类型) 直接查表, 避免每个图幅都遍历一次微信文件夹
+        searchedFile_list = get_file_index(WECHAT_FOLDER).find(
+            self.mapsheetFileName, self.currentDate.yyyymmdd_str, "finished_points_and_tracks"
+        )
+        
+        if len(searchedFile_list) >= 1:
+            # 选择时间最新的文件
+            fetched_file = max(searchedFile_list, key=os.path.getctime)
+            self._fetch_current_date_file(fetched_file)
+        
+        self._load_current_file_data()
+    
+    def _current_date_file_path(self) -> str:
+        """当天的完成文件在工作文件夹中的路径"""
+        return os.path.join(
             WORKSPACE, 
             self.currentDate.yyyymm_str, 
             self.currentDate.yyyymmdd_str, 
             "Finished points", 
             f"{self.mapsheetFileName}_finished_points_and_tracks_{self.currentDate.yyyymmdd_str}.kmz"
         )
+    
+    def _fetch_current_date_file(self, fetched_file: str) -> None:
+        """将微信文件夹中的当天文件拷贝（并重命名）至工作文件夹"""
+        file_path = self._current_date_file_path()
         
-        # 列出微信聊天记录文件夹中包含指定日期、图幅名称和finished_points的文件
-        folder = os.path.join(WECHAT_FOLDER)
-        searchedFile_list = list_fullpath_of_files_with_keywords(
-            folder, 
-            [self.currentDate.yyyymmdd_str, self.mapsheetFileName, "finished_points_and_tracks", ".kmz"]
-        )
-        
-        if len(searchedFile_list) >= 1:
-            # 选择时间最新的文件
-            fetched_file = max(searchedFile_list, key=os.path.getctime)
-            
-            # 如果工作文件夹中的文件存在
-            if os.path.exists(file_path) and os.path.isfile(file_path):
-                if self._files_are_different(file_path, fetched_file):
-                    # 将获取的文件拷贝至工作文件夹, 并进行了重命名
-                    self._safe_copy_file(fetched_file, file_path)
-                    self.currentfilepath = file_path
-                else:
-                    self.currentfilepath = file_path
-                    self._set_file_permissions(file_path)
-            else:
-                FileOperationHelper.ensure_directory_exists(file_path)
+        # 如果工作文件夹中的文件存在
+        if os.path.exists(file_path) and os.path.isfile(file_path):
+            if self._files_are_different(file_path, fetched_file):
+                # 将获取的文件拷贝至工作文件夹, 并进行了重命名
                 self._safe_copy_file(fetched_file, file_path)
+                get_history_index(WORKSPACE).add_file(file_path)
                 self.currentfilepath = file_path
-                
+            else:
+                self.currentfilepath = file_path
+                self._set_file_permissions(file_path)
+        else:
+            FileOperationHelper.ensure_directory_exists(file_path)
+            self._safe_copy_file(fetched_file, file_path)
+            get_history_index(WORKSPACE).add_file(file_path)
+            self.currentfilepath = file_path
+    
+    def _load_current_file_data(self) -> None:
+        """加载当天文件数据"""
         if self.currentfilepath:
             self.currentfilename = os.path.basename(self.currentfilepath)
             try:
-                file = KMZFile(filepath=self.currentfilepath)
-                self.currentPlacemarks = file.placemarks
-                if file.errorMsg:  # errorMsg现在返回None或错误列表
-                    self.__errorMsg[self.currentfilename] = file.errorMsg
+                placemarks, error_msg = FileOperationHelper.load_kmz(self.currentfilepath)
+                self.currentPlacemarks = placemarks
+                if error_msg:  # errorMsg现在返回None或错误列表
+                    self.__errorMsg[self.currentfilename] = error_msg
             except Exception as e:
                 logger.error(f"加载当前文件数据失败 {self.currentfilepath}: {e}")
                 raise MapsheetFileError(f"加载当前文件数据失败: {e}")
@@ -315,36 +406,32 @@ class MapsheetDailyFile:
         FileOperationHelper.set_file_permissions(file_path)
 
     def _find_last_finished_file(self) -> None:
-        """查找上一次完成的文件 - 改进版本，支持更灵活的文件名匹配"""
-        traceback_date = datetime.strptime(TRACEBACK_DATE, "%Y%m%d").date()
-        search_date = self.currentDate.date_datetime
+        """
+        查找上一次完成的文件 - 改进版本，支持更灵活的文件名匹配
         
-        while search_date.date() > traceback_date:
-            search_date -= timedelta(days=1)
-            
-            # 方法1: 尝试精确匹配（原有逻辑）
+        通过工作目录的历史文件索引, 二分查找 [TRACEBACK_DATE, 当前日期) 范围内最近的完成文件,
+        同一日期中精确匹配的文件优先于模糊匹配的文件
+        """
+        traceback_date = datetime.strptime(TRACEBACK_DATE, "%Y%m%d")
+        found = get_history_index(WORKSPACE).find_latest(
+            self.mapsheetFileName, self.currentDate.date_datetime, traceback_date
+        )
+        if found is None:
+            return
+        
+        search_date, file_path, exact = found
+        if exact:
+            # 方法1: 精确匹配（原有逻辑）
             # NOTE: 这里保留原有的精确匹配逻辑，以确保向后兼容, 存在的缺陷是文件名必须完全匹配，如果清除了历史文件夹则无法找到
-            exact_file_path = self._build_historical_file_path(search_date, "Finished points", "finished_points_and_tracks")
-            if os.path.exists(exact_file_path):
-                from ..data_models.date_types import DateType
-                self.lastDate = DateType(date_datetime=search_date)
-                self._handle_last_file_setup(exact_file_path)
-                logger.info(f"找到精确匹配的历史文件: {exact_file_path}")
-                return
-            
-            # 方法2: 模糊搜索该日期文件夹下所有匹配的文件（新增逻辑）
-            fuzzy_file_path = self._find_fuzzy_matching_file(search_date)
-            if fuzzy_file_path:
-                from ..data_models.date_types import DateType
-                # 从文件名中提取实际的数据日期
-                actual_date = self._extract_date_from_filename(fuzzy_file_path)
-                if actual_date:
-                    self.lastDate = DateType(date_datetime=actual_date)
-                else:
-                    self.lastDate = DateType(date_datetime=search_date)
-                self._handle_last_file_setup(fuzzy_file_path)
-                logger.info(f"找到模糊匹配的历史文件: {fuzzy_file_path}")
-                return
+            self.lastDate = DateType(date_datetime=search_date)
+            self._handle_last_file_setup(file_path)
+            logger.info(f"找到精确匹配的历史文件: {file_path}")
+        else:
+            # 方法2: 模糊匹配该日期文件夹下的文件, 从文件名中提取实际的数据日期
+            actual_date = self._extract_date_from_filename(file_path)
+            self.lastDate = DateType(date_datetime=actual_date or search_date)
+            self._handle_last_file_setup(file_path)
+            logger.info(f"找到模糊匹配的历史文件: {file_path}")
 
     def _build_historical_file_path(self, date: datetime, folder_type: str, file_type: str) -> str:
         """构建历史文件路径"""
@@ -356,37 +443,6 @@ class MapsheetDailyFile:
             f"{self.mapsheetFileName}_{file_type}_{date.strftime('%Y%m%d')}.kmz"
         )
 
-    def _find_fuzzy_matching_file(self, search_date: datetime) -> Optional[str]:
-        """在指定日期的文件夹中查找匹配图幅名称的文件"""
-        try:
-            folder_path = os.path.join(
-                WORKSPACE,
-                search_date.strftime("%Y%m"),
-                search_date.strftime("%Y%m%d"),
-                "Finished points"
-            )
-            
-            if not os.path.exists(folder_path):
-                return None
-            
-            # 搜索所有匹配图幅名称的文件
-            matching_files = []
-            for filename in os.listdir(folder_path):
-                if (filename.startswith(self.mapsheetFileName) and 
-                    filename.endswith('.kmz') and 
-                    'finished_points_and_tracks' in filename):
-                    matching_files.append(os.path.join(folder_path, filename))
-            
-            if matching_files:
-                # 如果有多个匹配文件，选择最新的（按文件名中的日期排序）
-                matching_files.sort(key=lambda x: self._extract_date_string_from_filename(x) or "00000000", reverse=True)
-                return matching_files[0]
-                
-        except Exception as e:
-            logger.warning(f"模糊搜索文件时发生错误: {e}")
-        
-        return None
-
     def _extract_date_from_filename(self, file_path: str) -> Optional[datetime]:
         """从文件名中提取日期"""
         try:
@@ -401,18 +457,6 @@ class MapsheetDailyFile:
             logger.warning(f"从文件名提取日期失败 {file_path}: {e}")
         return None
 
-    def _extract_date_string_from_filename(self, file_path: str) -> Optional[str]:
-        """从文件名中提取日期字符串，用于排序"""
-        try:
-            filename = os.path.basename(file_path)
-            import re
-            date_match = re.search(r'_(\d{8})\.kmz$', filename)
-            if date_match:
-                return date_match.group(1)
-        except Exception:
-            pass
-        return None
-
     def _handle_last_file_setup(self, file_path: str) -> None:
         """处理上一次文件的设置"""
         if self.currentfilename is None:
@@ -429,6 +473,7 @@ class MapsheetDailyFile:
                     FileOperationHelper.ensure_directory_exists(dest)
                     shutil.copy(file_path, dest)
                     FileOperationHelper.set_file_permissions(dest)
+                    get_history_index(WORKSPACE).add_file(dest)
                     self.lastfilepath = dest
                 except Exception as e:
                     logger.error(f"复制历史文件失败: {e}")
@@ -465,10 +510,10 @@ class MapsheetDailyFile:
         if self.lastfilepath:
             self.lastfilename = os.path.basename(self.lastfilepath)
             try:
-                file = KMZFile(filepath=self.lastfilepath)
-                self.lastPlacemarks = file.placemarks
-                if file.errorMsg:  # errorMsg现在返回None或错误列表
-                    self.__errorMsg[self.lastfilename] = file.errorMsg
+                placemarks, error_msg = FileOperationHelper.load_kmz(self.lastfilepath)
+                self.lastPlacemarks = placemarks
+                if error_msg:  # errorMsg现在返回None或错误列表
+                    self.__errorMsg[self.lastfilename] = error_msg
             except Exception as e:
                 logger.error(f"加载上一次文件数据失败 {self.lastfilepath}: {e}")
                 raise MapsheetFileError(f"加载上一次文件数据失败: {e}")
@@ -550,10 +595,7 @@ class MapsheetDailyFile:
     def _search_plan_files_for_date(self, date: datetime) -> list:
         """搜索指定日期的计划文件"""
         search_date_str = date.strftime("%Y%m%d")
-        return list_fullpath_of_files_with_keywords(
-            WECHAT_FOLDER, 
-            [search_date_str, self.mapsheetFileName, "plan_routes", ".kmz"]
-        )
+        return get_file_index(WECHAT_FOLDER).find(self.mapsheetFileName, search_date_str, "plan_routes")
 
     def _handle_plan_file_synchronization(self, searched_files: list, date: datetime) -> None:
         """处理计划文件同步"""
@@ -580,15 +622,9 @@ class MapsheetDailyFile:
             raise MapsheetFileError(f"处理计划文件同步失败: {e}")
 
     def _files_are_different(self, file1: str, file2: str) -> bool:
-        """检查两个文件是否不同，使用缓存优化性能"""
+        """检查两个文件是否不同，使用哈希缓存优化性能"""
         try:
-            hash1 = FileOperationHelper.get_file_hash(file1)
-            hash2 = FileOperationHelper.get_file_hash(file2)
-            
-            if hash1 is None or hash2 is None:
-                return True  # 如果无法获取哈希，假设不同
-            
-            return hash1 != hash2
+            return files_differ(file1, file2, hash_func=FileOperationHelper.get_file_hash)
         except Exception as e:
             logger.warning(f"比较文件时出错: {e}")
             return True  # 如果无法比较，假设不同
@@ -598,10 +634,10 @@ class MapsheetDailyFile:
         if hasattr(self, 'nextfilepath') and self.nextfilepath:
             try:
                 self.nextfilename = os.path.basename(self.nextfilepath)
-                file = KMZFile(filepath=self.nextfilepath)
-                self.planPlacemarks = file.placemarks
-                if file.errorMsg:
-                    self.__errorMsg[self.nextfilename] = file.errorMsg
+                placemarks, error_msg = FileOperationHelper.load_kmz(self.nextfilepath)
+                self.planPlacemarks = placemarks
+                if error_msg:
+                    self.__errorMsg[self.nextfilename] = error_msg
             except Exception as e:
                 logger.error(f"加载计划文件数据失败 {self.nextfilepath}: {e}")
                 raise MapsheetFileError(f"加载计划文件数据失败: {e}")
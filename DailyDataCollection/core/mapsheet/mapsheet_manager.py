@@ -4,9 +4,11 @@
 提供统一的图幅信息管理、初始化和配置功能，避免代码重复和配置不一致
 """
 
+import os
+import json
 import logging
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
 from typing import Dict, List, Any, Optional, Type, TYPE_CHECKING
-import pandas as pd
 from pathlib import Path
 
 from config.config_manager import ConfigManager
@@ -20,6 +22,11 @@ logger = logging.getLogger('Mapsheet Manager')
 logger.setLevel(logging.ERROR)
 
 
+def _native(value: Any) -> Any:
+    """将 numpy 标量转换为 Python 原生类型"""
+    return value.item() if hasattr(value, 'item') else value
+
+
 class MapsheetManager:
     """
     图幅管理器 - 提供统一的图幅信息管理和初始化功能
@@ -32,6 +39,8 @@ class MapsheetManager:
     """
     
     _instance: Optional['MapsheetManager'] = None
+    # 图幅信息缓存的格式版本
+    CACHE_VERSION = 1
     _maps_info: Dict[float, Dict[str, Any]] = {}
     _config_manager: Optional[ConfigManager] = None
     _initialized: bool = False
@@ -50,51 +59,20 @@ class MapsheetManager:
             self._initialized = True
     
     def _load_mapsheet_info(self) -> None:
-        """加载图幅信息"""
+        """加载图幅信息, 图幅信息表未变化时直接使用缓存"""
         try:
             config = self._config_manager.get_config()
             sheet_names_file = self._config_manager.get_resolved_path('sheet_names_file')
             sequence_min = config['mapsheet']['sequence_min']
             sequence_max = config['mapsheet']['sequence_max']
             
-            # 使用UTF-8编码读取Excel文件
-            df = pd.read_excel(sheet_names_file, sheet_name="Sheet1", header=0, engine='openpyxl')
-            
-            # 确保DataFrame中的字符串列使用UTF-8编码
-            for col in df.select_dtypes(include=['object']).columns:
-                try:
-                    df[col] = df[col].astype(str).apply(
-                        lambda x: x.encode('utf-8').decode('utf-8') if isinstance(x, str) else x
-                    )
-                except (UnicodeDecodeError, UnicodeEncodeError):
-                    pass
-            
-            # 筛选序号范围内的图幅
-            filtered_df = df[(df['Sequence'] >= sequence_min) & (df['Sequence'] <= sequence_max)]
-            
-            # 验证数据完整性
-            expected_count = sequence_max - sequence_min + 1
-            if len(filtered_df) != expected_count:
-                raise ValueError(f"图幅数量不匹配: 期望{expected_count}个，实际{len(filtered_df)}个")
-            
-            if filtered_df['Sequence'].duplicated().any():
-                raise ValueError("图幅信息表中存在重复的图幅序号")
-            
-            # 按序号排序并构建字典
-            sorted_df = filtered_df.sort_values(by='Sequence')
-            self._maps_info = {
-                float(row['Sequence']): {
-                    'Sheet ID': row['Alternative sheet ID'],  # Excel列名映射
-                    'Group': row['Group'],
-                    'File Name': row['File Name'],
-                    'Arabic Name': row['Arabic'],
-                    'Roman Name': row['Roman Name'],
-                    'Latin Name': row['Latin Name'],
-                    'Team Number': row['Team Number'],
-                    'Leaders': row['Leaders'],
-                }
-                for _, row in sorted_df.iterrows()
-            }
+            cache_path = self._maps_info_cache_path()
+            source_key = self._source_key(sheet_names_file, sequence_min, sequence_max)
+            maps_info = self._read_maps_info_cache(cache_path, source_key)
+            if maps_info is None:
+                maps_info = self._read_sheet_names_file(sheet_names_file, sequence_min, sequence_max)
+                self._write_maps_info_cache(cache_path, source_key, maps_info)
+            self._maps_info = maps_info
             
             logger.info(f"成功加载{len(self._maps_info)}个图幅信息")
             
@@ -102,6 +80,102 @@ class MapsheetManager:
             logger.error(f"加载图幅信息失败: {e}")
             self._maps_info = {}
             raise
+
+    @staticmethod
+    def _read_sheet_names_file(sheet_names_file: str, sequence_min: int,
+                               sequence_max: int) -> Dict[float, Dict[str, Any]]:
+        """读取图幅信息表（Excel）, 返回按序号排序的图幅信息字典"""
+        # 延迟导入: 只有缓存失效时才需要 pandas 和 openpyxl
+        import pandas as pd
+        
+        # 使用UTF-8编码读取Excel文件
+        df = pd.read_excel(sheet_names_file, sheet_name="Sheet1", header=0, engine='openpyxl')
+        
+        # 文本列统一转换为字符串（与逐个单元格转换的结果一致）
+        for col in df.select_dtypes(include=['object']).columns:
+            df[col] = df[col].astype(str)
+        
+        # 筛选序号范围内的图幅
+        filtered_df = df[(df['Sequence'] >= sequence_min) & (df['Sequence'] <= sequence_max)]
+        
+        # 验证数据完整性
+        expected_count = sequence_max - sequence_min + 1
+        if len(filtered_df) != expected_count:
+            raise ValueError(f"图幅数量不匹配: 期望{expected_count}个，实际{len(filtered_df)}个")
+        
+        if filtered_df['Sequence'].duplicated().any():
+            raise ValueError("图幅信息表中存在重复的图幅序号")
+        
+        # 按序号排序并构建字典（Excel列名映射）, 数值转换为 Python 原生类型以便缓存
+        sorted_df = filtered_df.sort_values(by='Sequence')
+        columns = {
+            'Sheet ID': 'Alternative sheet ID',
+            'Group': 'Group',
+            'File Name': 'File Name',
+            'Arabic Name': 'Arabic',
+            'Roman Name': 'Roman Name',
+            'Latin Name': 'Latin Name',
+            'Team Number': 'Team Number',
+            'Leaders': 'Leaders',
+        }
+        records = sorted_df[['Sequence'] + list(columns.values())].to_dict('records')
+        return {
+            float(record['Sequence']): {
+                key: _native(record[column]) for key, column in columns.items()
+            }
+            for record in records
+        }
+
+    def _maps_info_cache_path(self) -> Optional[str]:
+        """图幅信息缓存文件路径, 未启用缓存时返回None"""
+        if not self._config_manager.get('performance.mapsheet_cache.enabled', True):
+            return None
+        try:
+            return os.path.join(self._config_manager.get_cache_directory(), 'mapsheet_info.json')
+        except Exception as e:
+            logger.warning(f"无法确定图幅信息缓存目录: {e}")
+            return None
+
+    @staticmethod
+    def _source_key(sheet_names_file: str, sequence_min: int, sequence_max: int) -> List[Any]:
+        """缓存的有效性标识: 图幅信息表的路径、大小、修改时间和序号范围"""
+        file_stat = os.stat(sheet_names_file)
+        return [os.path.abspath(sheet_names_file), file_stat.st_size, file_stat.st_mtime_ns,
+                sequence_min, sequence_max]
+
+    @classmethod
+    def _read_maps_info_cache(cls, cache_path: Optional[str],
+                              source_key: List[Any]) -> Optional[Dict[float, Dict[str, Any]]]:
+        if not cache_path:
+            return None
+        try:
+            with open(cache_path, 'r', encoding='utf-8') as file:
+                data = json.load(file)
+        except (OSError, ValueError):
+            return None
+        if data.get('version') != cls.CACHE_VERSION or data.get('source') != source_key:
+            return None
+        return {float(sequence): info for sequence, info in data['maps_info']}
+
+    @classmethod
+    def _write_maps_info_cache(cls, cache_path: Optional[str], source_key: List[Any],
+                               maps_info: Dict[float, Dict[str, Any]]) -> None:
+        if not cache_path:
+            return
+        data = {
+            'version': cls.CACHE_VERSION,
+            'source': source_key,
+            'maps_info': [[sequence, info] for sequence, info in maps_info.items()],
+        }
+        temp_path = f"{cache_path}.{os.getpid()}.tmp"
+        try:
+            with open(temp_path, 'w', encoding='utf-8') as file:
+                json.dump(data, file, ensure_ascii=False)
+            os.replace(temp_path, cache_path)
+        except (OSError, TypeError, ValueError) as e:
+            logger.warning(f"保存图幅信息缓存失败: {e}")
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
     
     @property
     def maps_info(self) -> Dict[float, Dict[str, Any]]:
@@ -165,32 +239,85 @@ class MapsheetManager:
                 return info
         return None
     
+    def get_sequence_mapsheet_filenames(self) -> List[str]:
+        """获取序号范围内各图幅的文件名称, 按图幅序号排列"""
+        sequence_min, sequence_max = self.sequence_range
+        return [
+            self._maps_info[float(map_index)]['File Name']
+            for map_index in range(sequence_min, sequence_max + 1)
+            if float(map_index) in self._maps_info
+        ]
+    
     def create_mapsheet_collection(
         self, 
         mapsheet_class: Type['MapsheetDailyFile'],
-        current_date: 'DateType'
+        current_date: 'DateType',
+        parallel: Optional[bool] = None
     ) -> List['MapsheetDailyFile']:
         """
         创建图幅对象集合
         
+        各图幅之间相互独立, 并行模式下使用线程池处理文件查找和复制等I/O操作,
+        使用进程池解析KML内容; 返回结果的顺序与图幅序号一致
+        
         Args:
             mapsheet_class: 图幅类（MapsheetDailyFile或其子类）
             current_date: 当前日期
+            parallel: 是否并行创建, 为None时使用配置文件中的设置
             
         Returns:
             图幅对象列表
         """
-        mapsheets = []
-        sequence_min, sequence_max = self.sequence_range
+        mapsheet_filenames = self.get_sequence_mapsheet_filenames()
+        
+        if parallel is None:
+            parallel = self._config_manager.get('performance.parallel.enabled', True)
+        thread_workers = self._config_manager.get('performance.parallel.thread_workers', 8) or 1
+        thread_workers = min(thread_workers, len(mapsheet_filenames))
+        
+        if not parallel or thread_workers <= 1:
+            return [mapsheet_class(filename, current_date) for filename in mapsheet_filenames]
+        
+        return self._create_mapsheet_collection_parallel(
+            mapsheet_class, current_date, mapsheet_filenames, thread_workers
+        )
+    
+    def _create_mapsheet_collection_parallel(
+        self,
+        mapsheet_class: Type['MapsheetDailyFile'],
+        current_date: 'DateType',
+        mapsheet_filenames: List[str],
+        thread_workers: int
+    ) -> List['MapsheetDailyFile']:
+        """使用线程池和进程池并行创建图幅对象集合"""
+        from .mapsheet_daily import FileOperationHelper
+        
+        # 在启动线程前加载类级别的图幅信息, 避免各线程重复加载
+        mapsheet_class._load_maps_info()
         
-        for map_index in range(sequence_min, sequence_max + 1):
-            map_key = float(map_index)
-            if map_key in self._maps_info:
-                mapsheet_filename = self._maps_info[map_key]['File Name']
-                mapsheet = mapsheet_class(mapsheet_filename, current_date)
-                mapsheets.append(mapsheet)
+        process_workers = self._config_manager.get('performance.parallel.process_workers', 0)
+        if not process_workers:
+            process_workers = min(os.cpu_count() or 1, len(mapsheet_filenames))
         
-        return mapsheets
+        process_pool = None
+        if process_workers > 1:
+            try:
+                process_pool = ProcessPoolExecutor(max_workers=process_workers)
+            except (OSError, NotImplementedError, ValueError) as e:
+                logger.warning(f"无法创建解析进程池，KML解析将在线程中进行: {e}")
+        
+        FileOperationHelper.parse_executor = process_pool
+        try:
+            with ThreadPoolExecutor(max_workers=thread_workers, thread_name_prefix='mapsheet') as thread_pool:
+                # map 按提交顺序返回结果, 保证与图幅序号顺序一致
+                return list(thread_pool.map(
+                    lambda filename: mapsheet_class(filename, current_date),
+                    mapsheet_filenames
+                ))
+        finally:
+            FileOperationHelper.parse_executor = None
+            if process_pool is not None:
+                process_pool.shutdown(wait=True)
     
     def validate_configuration(self) -> bool:
         """
@@ -256,5 +383,6 @@ class MapsheetManager:
         }
 
 
-# 全局实例
-mapsheet_manager = MapsheetManager()
+def get_mapsheet_manager() -> MapsheetManager:
+    """获取图幅管理器实例, 首次调用时读取图幅信息"""
+    return MapsheetManager()
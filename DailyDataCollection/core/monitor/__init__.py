@@ -3,6 +3,7 @@ Monitor模块 - 文件监控系统的核心组件
 
 该模块提供了完整的文件监控解决方案，包括：
 - 文件系统监控
+- 文件事件的防抖合并与并行处理
 - 文件验证
 - 数据更新管理
 - 状态显示
@@ -10,6 +11,7 @@ Monitor模块 - 文件监控系统的核心组件
 
 from ..utils.matcher.string_matching import NameMatcher, ExactNameMatcher, FuzzyNameMatcher, HybridNameMatcher
 from .file_validator import FileValidator, KMZFileValidator
+from .event_pipeline import EventPipeline
 from .monitor_manager import MonitorManager
 # 暂时注释event_handler，避免循环导入问题
 # from .event_handler import FileEventHandler
@@ -22,6 +24,7 @@ __all__ = [
     'HybridNameMatcher',
     'FileValidator',
     'KMZFileValidator', 
+    'EventPipeline',
     'MonitorManager',
     'FileEventHandler',
     'MonitorMapSheet',
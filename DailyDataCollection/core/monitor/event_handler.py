@@ -3,9 +3,12 @@
 """
 
 import os
+import threading
 from watchdog.events import FileSystemEventHandler
 from ..data_models.date_types import DateType
 from .file_validator import KMZFileValidator
+from .event_pipeline import EventPipeline
+from ..utils.file_index import notify_file_created
 # 临时注释，避免循环导入
 from .mapsheet_monitor import MonitorMapSheetCollection
 from display import MessageDisplay, MonitorDisplay
@@ -15,11 +18,14 @@ class FileEventHandler(FileSystemEventHandler):
     """
     文件系统事件处理器
     
-    负责处理文件创建事件，验证文件并更新相应的图幅状态
+    负责处理文件创建、修改和移动事件，验证文件并更新相应的图幅状态
     支持精确匹配和模糊匹配两种模式
+    
+    观察者线程中只将事件登记到处理管道, 文件写入完成后由管道的工作线程处理
     """
     
-    def __init__(self, current_date: DateType, enable_fuzzy_matching: bool = True, fuzzy_threshold: float = 0.65):
+    def __init__(self, current_date: DateType, enable_fuzzy_matching: bool = True, fuzzy_threshold: float = 0.65,
+                 debounce_seconds: float = 1.0, max_workers: int = 2):
         super().__init__()
         self.current_date = current_date
         self.enable_fuzzy_matching = enable_fuzzy_matching
@@ -32,20 +38,76 @@ class FileEventHandler(FileSystemEventHandler):
             enable_fuzzy_matching=enable_fuzzy_matching,
             fuzzy_threshold=fuzzy_threshold
         )
+        
+        # 图幅状态的更新在工作线程中进行, 同一时间只允许一个线程修改
+        self._state_lock = threading.Lock()
+        self.pipeline = EventPipeline(self.process_file, debounce_seconds=debounce_seconds, max_workers=max_workers)
+        # 变化日志（ChangeJournal）, 设置后已处理且未变化的文件在重启后也不再重复处理
+        self.journal = None
+        # 本次运行中已处理文件的 (路径, 文件大小, 修改时间), 原生事件和轮询扫描发现同一文件时只处理一次
+        self._processed = set()
+        self._processed_lock = threading.Lock()
+    
+    def start_processing(self):
+        """启动事件处理管道"""
+        self.pipeline.start()
+    
+    def stop_processing(self, wait: bool = True):
+        """停止事件处理管道"""
+        self.pipeline.stop(wait=wait)
     
     def on_created(self, event):
         """处理文件创建事件"""
-        if event.is_directory:
+        if not event.is_directory:
+            self.submit(event.src_path)
+    
+    def on_modified(self, event):
+        """处理文件修改事件（文件分多次写入时会产生多个修改事件）"""
+        if not event.is_directory:
+            self.submit(event.src_path)
+    
+    def on_moved(self, event):
+        """处理文件移动事件（下载完成后由临时文件名重命名为最终文件名）"""
+        if not event.is_directory:
+            self.submit(event.dest_path)
+    
+    def submit(self, path: str):
+        """将KMZ文件的事件登记到处理管道（原生事件和轮询发现的文件都经由此方法）"""
+        if path.lower().endswith('.kmz'):
+            self.pipeline.submit(path)
+    
+    def process_file(self, path: str):
+        """处理写入完成的KMZ文件（在管道的工作线程中调用）, 已处理且未变化的文件直接跳过"""
+        key = self._processed_key(path)
+        if key is None:
             return
-        
-        filename = os.path.basename(event.src_path)
-        filename_lower = filename.lower()
-        
-        # 只处理KMZ文件
-        if not filename_lower.endswith('.kmz'):
+        with self._processed_lock:
+            if key in self._processed:
+                return
+            self._processed.add(key)
+        if self.journal is not None and self.journal.is_processed(path):
             return
+        self._process_file(path)
+        if self.journal is not None:
+            self.journal.record(path)
+    
+    @staticmethod
+    def _processed_key(path: str):
+        """文件的 (路径, 文件大小, 修改时间), 文件不存在时返回 None"""
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return None
+        return os.path.normpath(path), stat.st_size, stat.st_mtime_ns
+    
+    def _process_file(self, path: str):
+        """验证文件并更新图幅状态"""
+        filename = os.path.basename(path)
+        filename_lower = filename.lower()
         
         MessageDisplay.show_file_detected(filename)
+        # 将新文件加入文件名索引, 后续查找无需重新遍历目录
+        notify_file_created(path)
         
         # 基础验证
         if not self.file_validator.validate(filename_lower):
@@ -54,15 +116,15 @@ class FileEventHandler(FileSystemEventHandler):
         # 判断文件类型并处理（支持模糊匹配）
         if (self._is_finished_file(filename_lower) or 
             (self.enable_fuzzy_matching and self._is_finished_file_fuzzy(filename_lower))):
-            self._handle_finished_file(filename_lower)
+            self._handle_finished_file(filename_lower, path)
         elif (self._is_plan_file(filename_lower) or 
               (self.enable_fuzzy_matching and self._is_plan_file_fuzzy(filename_lower))):
             self._handle_plan_file(filename_lower)
         else:
             MessageDisplay.show_validation_error(filename_lower, 'invalid_name')
     
-    def _handle_finished_file(self, filename: str):
-        """处理完成点文件（支持模糊匹配）"""
+    def _handle_finished_file(self, filename: str, path: str = None):
+        """处理完成点文件（支持模糊匹配）, path 为事件中的文件路径"""
         # 使用验证器的模糊匹配功能
         if not self.file_validator.validate_finished_file(filename, use_fuzzy=self.enable_fuzzy_matching):
             return
@@ -81,9 +143,10 @@ class FileEventHandler(FileSystemEventHandler):
             (self.enable_fuzzy_matching and self._fuzzy_match_finished_pattern(filename, mapsheet_name))):
             mapsheet = self.mapsheet_collection.get_mapsheet_by_name(mapsheet_name)
             if mapsheet:
-                mapsheet.update_finished()
-                self.mapsheet_collection.remove_from_collection(mapsheet_name)
-                self._display_remaining_files()
+                with self._state_lock:
+                    mapsheet.update_finished(path)
+                    self.mapsheet_collection.mark_finished(mapsheet)
+                    self._display_remaining_files()
         else:
             MessageDisplay.show_validation_error(filename, 'no_valid_finished')
     
@@ -113,7 +176,9 @@ class FileEventHandler(FileSystemEventHandler):
             (self.enable_fuzzy_matching and self._fuzzy_match_plan_pattern(filename, mapsheet_name, file_date_str))):
             mapsheet = self.mapsheet_collection.get_mapsheet_by_name(mapsheet_name)
             if mapsheet:
-                mapsheet.update_plan()
+                with self._state_lock:
+                    mapsheet.update_plan()
+                    self.mapsheet_collection.mark_plan_updated(mapsheet)
         else:
             MessageDisplay.show_validation_error(filename, 'no_valid_plan')
     
@@ -0,0 +1,185 @@
+"""
+文件事件处理管道 - 合并同一文件的多次事件, 等待文件写入完成后交给工作线程处理
+
+微信下载文件时会分多次写入, 同一个文件通常先后产生创建、修改和移动事件。
+管道按路径合并事件: 每次事件都推迟该路径的检查时间（防抖）,
+到期时比较文件大小和修改时间, 与上一次检查一致（且 KMZ 文件的压缩包目录完整）才认为写入完成,
+之后由线程池处理, 观察者线程只负责登记事件, 不会被阻塞
+"""
+
+import os
+import time
+import zipfile
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Callable, Dict, Optional, Set, Tuple
+
+logger = logging.getLogger('Event Pipeline')
+logger.setLevel(logging.ERROR)
+
+
+@dataclass
+class _PendingFile:
+    """等待检查的文件"""
+    due: float
+    first_seen: float
+    # 上一次检查时的 (文件大小, 修改时间), 尚未检查时为 None
+    signature: Optional[Tuple[int, int]] = None
+
+
+class EventPipeline:
+    """
+    防抖、合并的文件事件处理管道
+
+    Args:
+        handler: 处理写入完成的文件的函数, 参数为文件路径
+        debounce_seconds: 防抖时间（秒）, 文件在此时间内没有新的事件且大小和修改时间不变才会被处理
+        max_workers: 处理文件的线程数
+        max_wait_seconds: 文件持续变化的最长等待时间（秒）, 超过后放弃处理
+    """
+
+    def __init__(self, handler: Callable[[str], None], debounce_seconds: float = 1.0,
+                 max_workers: int = 2, max_wait_seconds: float = 600.0):
+        self.handler = handler
+        self.debounce_seconds = debounce_seconds
+        self.max_workers = max(1, max_workers)
+        self.max_wait_seconds = max_wait_seconds
+
+        self._pending: Dict[str, _PendingFile] = {}
+        self._in_flight: Set[str] = set()
+        # 已从待检查表中取出、正在检查的文件数
+        self._checking = 0
+        self._condition = threading.Condition()
+        self._stopping = False
+        self._thread: Optional[threading.Thread] = None
+        self._executor: Optional[ThreadPoolExecutor] = None
+
+    def start(self) -> None:
+        """启动调度线程和工作线程池"""
+        with self._condition:
+            if self._thread is not None:
+                return
+            self._stopping = False
+            self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix='file-event')
+            self._thread = threading.Thread(target=self._schedule_loop, name='file-event-scheduler', daemon=True)
+            self._thread.start()
+
+    def stop(self, wait: bool = True) -> None:
+        """停止管道, 尚未到期的事件不再处理"""
+        with self._condition:
+            if self._thread is None:
+                return
+            self._stopping = True
+            self._condition.notify_all()
+            thread, executor = self._thread, self._executor
+            self._thread = self._executor = None
+        if wait:
+            thread.join()
+        executor.shutdown(wait=wait)
+
+    def submit(self, path: str) -> None:
+        """登记文件事件（在观察者线程中调用, 只更新待检查表, 不访问文件）"""
+        now = time.monotonic()
+        with self._condition:
+            entry = self._pending.get(path)
+            if entry is None:
+                self._pending[path] = _PendingFile(due=now + self.debounce_seconds, first_seen=now)
+            else:
+                entry.due = now + self.debounce_seconds
+            self._condition.notify()
+
+    def pending_count(self) -> int:
+        """等待检查和正在处理的文件数"""
+        with self._condition:
+            return len(self._pending) + self._checking + len(self._in_flight)
+
+    def wait_idle(self, timeout: Optional[float] = None) -> bool:
+        """等待所有已登记的文件处理完毕, 超时返回 False"""
+        with self._condition:
+            return self._condition.wait_for(
+                lambda: not (self._pending or self._checking or self._in_flight), timeout
+            )
+
+    def _schedule_loop(self) -> None:
+        """调度线程: 等待最早到期的文件, 检查其是否写入完成"""
+        while True:
+            with self._condition:
+                due = self._take_due()
+                while not self._stopping and not due:
+                    self._condition.wait(self._next_timeout())
+                    due = self._take_due()
+                if self._stopping:
+                    return
+            for path, entry in due:
+                self._check(path, entry)
+
+    def _take_due(self):
+        """取出已到期且不在处理中的文件（需持有锁）"""
+        now = time.monotonic()
+        due = []
+        for path, entry in list(self._pending.items()):
+            if entry.due > now:
+                continue
+            if path in self._in_flight:
+                # 同一文件的上一次处理尚未结束, 结束后再检查
+                entry.due = now + self.debounce_seconds
+                continue
+            due.append((path, self._pending.pop(path)))
+        self._checking += len(due)
+        return due
+
+    def _next_timeout(self) -> Optional[float]:
+        """距最早到期时间的秒数, 没有待检查文件时返回 None（一直等待）"""
+        if not self._pending:
+            return None
+        return max(0.0, min(entry.due for entry in self._pending.values()) - time.monotonic())
+
+    def _check(self, path: str, entry: _PendingFile) -> None:
+        """检查文件是否写入完成: 写入完成则交给线程池处理, 否则重新排队"""
+        try:
+            stat = os.stat(path)
+        except OSError:
+            stat = None
+
+        if stat is not None:
+            signature = (stat.st_size, stat.st_mtime_ns)
+            stable = (
+                signature == entry.signature and stat.st_size > 0 and
+                (not path.lower().endswith('.kmz') or zipfile.is_zipfile(path))
+            )
+
+        now = time.monotonic()
+        with self._condition:
+            self._checking -= 1
+            self._condition.notify_all()
+            if self._stopping:
+                return
+            if stat is None:
+                # 文件已被删除或移动（移动后的路径会产生新的事件）
+                logger.info(f"文件已不存在, 跳过: {path}")
+                return
+            if path in self._pending:
+                # 检查期间又收到了该文件的事件, 以新的事件为准
+                return
+            if not stable:
+                if now - entry.first_seen > self.max_wait_seconds:
+                    logger.warning(f"文件在{self.max_wait_seconds}秒内未写入完成, 放弃处理: {path}")
+                    return
+                entry.signature = signature
+                entry.due = now + self.debounce_seconds
+                self._pending[path] = entry
+                return
+            self._in_flight.add(path)
+            self._executor.submit(self._run, path)
+
+    def _run(self, path: str) -> None:
+        try:
+            self.handler(path)
+        except Exception as e:
+            logger.error(f"处理文件失败 {path}: {e}")
+        finally:
+            with self._condition:
+                self._in_flight.discard(path)
+                self._condition.notify_all()
@@ -0,0 +1,133 @@
+"""
+混合文件观察者 - 原生文件系统事件与目录快照轮询相结合
+
+watchdog 的原生 Observer 在网络共享、同步文件夹和部分容器中会静默地丢失事件。
+混合观察者在原生事件可用时使用原生事件, 同时按固定间隔扫描目录快照（只重新列出修改时间变化的目录）
+补充遗漏的文件; 原生观察者无法启动或监控路径为网络路径时只使用轮询。
+目录快照和已处理文件保存在变化日志中, 重启后只补充处理停止期间新增的文件
+"""
+
+import logging
+import threading
+from typing import Optional
+
+from watchdog.observers import Observer
+
+from ..utils.directory_snapshot import ChangeJournal, DirectorySnapshot
+
+logger = logging.getLogger('Hybrid Observer')
+logger.setLevel(logging.ERROR)
+
+# 观察模式
+WATCH_MODES = ('auto', 'native', 'polling')
+
+
+class HybridObserver:
+    """
+    混合文件观察者, 接口与 watchdog Observer 的 start / stop / join / is_alive 一致
+
+    Args:
+        event_handler: 文件事件处理器, 原生事件交给其 on_created 等方法, 轮询发现的文件交给其 submit 方法
+        path: 监控目录
+        mode: auto（原生事件 + 轮询补充）、native（只用原生事件）或 polling（只用轮询）
+        poll_interval: 轮询间隔（秒）
+        journal: 变化日志, 为 None 时不保存快照, 重启后以当时的目录内容为基准
+    """
+
+    def __init__(self, event_handler, path: str, mode: str = 'auto', poll_interval: float = 10.0,
+                 journal: Optional[ChangeJournal] = None):
+        if mode not in WATCH_MODES:
+            raise ValueError(f"无效的观察模式: {mode}, 可选: {', '.join(WATCH_MODES)}")
+        self.event_handler = event_handler
+        self.path = path
+        self.mode = mode
+        self.poll_interval = poll_interval
+        self.journal = journal
+
+        self._observer: Optional[Observer] = None
+        self._snapshot = DirectorySnapshot(path)
+        self._stop_event = threading.Event()
+        self._poll_thread: Optional[threading.Thread] = None
+
+    @staticmethod
+    def is_network_path(path: str) -> bool:
+        """UNC 路径（\\\\server\\share）视为网络路径"""
+        return path.startswith('\\\\') or path.startswith('//')
+
+    @property
+    def native(self) -> bool:
+        """原生观察者是否在运行"""
+        return self._observer is not None
+
+    @property
+    def polling(self) -> bool:
+        """轮询线程是否在运行"""
+        return self._poll_thread is not None
+
+    def start(self) -> None:
+        """启动观察: 先补充处理停止期间新增的文件, 再启动原生观察者和（或）轮询线程"""
+        self._stop_event.clear()
+        self._catch_up()
+
+        if self.mode != 'polling' and not self.is_network_path(self.path):
+            try:
+                observer = Observer()
+                observer.schedule(self.event_handler, self.path, recursive=True)
+                observer.start()
+                self._observer = observer
+            except Exception as e:
+                logger.warning(f"无法启动原生文件观察者, 改用轮询: {e}")
+
+        if self.mode != 'native' or self._observer is None:
+            self._poll_thread = threading.Thread(target=self._poll_loop, name='snapshot-poller', daemon=True)
+            self._poll_thread.start()
+
+    def stop(self) -> None:
+        """停止观察"""
+        self._stop_event.set()
+        if self._observer is not None:
+            self._observer.stop()
+
+    def join(self, timeout: Optional[float] = None) -> None:
+        """等待观察线程退出"""
+        if self._observer is not None:
+            self._observer.join(timeout)
+        if self._poll_thread is not None:
+            self._poll_thread.join(timeout)
+
+    def is_alive(self) -> bool:
+        return bool(
+            (self._observer is not None and self._observer.is_alive()) or
+            (self._poll_thread is not None and self._poll_thread.is_alive())
+        )
+
+    def _catch_up(self) -> None:
+        """以变化日志中的快照为基准扫描目录, 提交停止期间新增或变化的文件; 没有快照时只建立基准"""
+        previous = self.journal.snapshot if self.journal is not None else None
+        if previous:
+            self._snapshot.set_state(previous)
+            changed = self._snapshot.scan()
+            for file_path in changed:
+                self.event_handler.submit(file_path)
+            if changed:
+                logger.info(f"补充处理监控停止期间新增的文件: {len(changed)}个")
+        else:
+            self._snapshot.scan()
+        self._save_snapshot()
+
+    def _poll_loop(self) -> None:
+        while not self._stop_event.wait(self.poll_interval):
+            try:
+                changed = self._snapshot.scan()
+            except Exception as e:
+                logger.error(f"扫描目录失败 {self.path}: {e}")
+                continue
+            if not changed:
+                continue
+            for file_path in changed:
+                self.event_handler.submit(file_path)
+            self._save_snapshot()
+
+    def _save_snapshot(self) -> None:
+        if self.journal is not None:
+            self.journal.update_snapshot(self._snapshot.get_state())
@@ -3,14 +3,20 @@
 """
 
 import os
-from typing import List, Optional
+import logging
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from typing import Dict, List, Optional, Set, Tuple, Union
 
 from ..mapsheet.mapsheet_daily import MapsheetDailyFile
-from ..mapsheet.mapsheet_manager import mapsheet_manager
+from ..mapsheet.mapsheet_manager import get_mapsheet_manager
 from ..data_models.date_types import DateType
 from config.config_manager import ConfigManager
 from display import MonitorDisplay
 
+logger = logging.getLogger('Mapsheet Monitor')
+logger.setLevel(logging.ERROR)
+
 
 class MonitorMapSheet(MapsheetDailyFile):
     """
@@ -39,14 +45,23 @@ class MonitorMapSheet(MapsheetDailyFile):
         # 如果当前文件已存在，则标记为已完成
         self.finished: bool = bool(self.currentfilepath and os.path.exists(self.currentfilepath))
     
-    def update_finished(self):
-        """在完成接收完成路线文件时,更新当前图幅的状态"""
-        self.matchedFinishedFileCountNum += 1
-        self.getCurrentDateFile(self)
-        self.findlastFinished(self)
+    def update_finished(self, file_path: Optional[str] = None):
+        """
+        在完成接收完成路线文件时,更新当前图幅的状态
         
-        # 重新计算增量和总数 - 替代原来的 dailyIncrease() 和 soFarfinished()
-        self._update_point_calculations()
+        Args:
+            file_path: 事件中的文件路径; 提供时只拷贝并解析该文件, 复用已载入的上一次文件数据,
+                       不再搜索微信文件夹和回溯历史文件
+        """
+        self.matchedFinishedFileCountNum += 1
+        if file_path and os.path.isfile(file_path):
+            self._update_finished_incremental(file_path)
+        else:
+            self.getCurrentDateFile(self)
+            self.findlastFinished(self)
+            
+            # 重新计算增量和总数 - 替代原来的 dailyIncrease() 和 soFarfinished()
+            self._update_point_calculations()
         
         # 标记为已完成收集
         self.finished = True
@@ -64,19 +79,38 @@ class MonitorMapSheet(MapsheetDailyFile):
             self, 'plan', self.matchedPlanFileCountNum
         )
     
+    def _update_finished_incremental(self, file_path: str):
+        """只处理新到达的文件: 上一次提交的文件在当天不会变化, 其数据已在初始化时载入"""
+        had_current_file = self.currentfilename is not None
+        self._fetch_current_date_file(file_path)
+        self._load_current_file_data()
+        
+        if not had_current_file and self.lastfilepath:
+            # 初始化时当天没有文件, 上一次文件被拷贝到了当天文件夹;
+            # 重新定位历史文件（通过历史文件索引, 不遍历目录）并移除当天文件夹中的拷贝
+            self._find_last_finished_file()
+            self.lastfilename = os.path.basename(self.lastfilepath) if self.lastfilepath else None
+        
+        self._calculate_daily_statistics()
+    
     def _check_has_plan(self):
         """检查当天的计划路线文件是否存在"""
-        config = mapsheet_manager._config_manager.get_config()
-        plan_file_path = os.path.join(
+        self.fileToReceiveFlag = os.path.exists(self.workspace_file_path(
+            self.mapsheetFileName, self.currentDate, "Planned routes", "plan_routes"
+        ))
+        return self.fileToReceiveFlag
+    
+    @staticmethod
+    def workspace_file_path(mapsheet_filename: str, current_date: DateType, folder: str, file_type: str) -> str:
+        """工作文件夹中图幅当天的计划文件（Planned routes）或完成文件（Finished points）路径"""
+        config = get_mapsheet_manager()._config_manager.get_config()
+        return os.path.join(
             config['paths']['workspace'], 
-            self.currentDate.yyyymm_str, 
-            self.currentDate.yyyymmdd_str, 
-            "Planned routes", 
-            f"{self.mapsheetFileName}_plan_routes_{self.currentDate.yyyymmdd_str}.kmz"
+            current_date.yyyymm_str, 
+            current_date.yyyymmdd_str, 
+            folder, 
+            f"{mapsheet_filename}_{file_type}_{current_date.yyyymmdd_str}.kmz"
         )
-        
-        self.fileToReceiveFlag = os.path.exists(plan_file_path)
-        return self.fileToReceiveFlag
 
     def _update_point_calculations(self):
         """更新点数计算 - 计算日增量和当前总数"""
@@ -126,11 +160,39 @@ class MonitorMapSheet(MapsheetDailyFile):
             self.currentTotalRouteNum = 0
 
 
+class PendingMonitorMapSheet:
+    """
+    尚未载入文件数据的图幅
+    
+    只包含图幅信息和工作文件夹中计划文件、完成文件是否存在的检查结果, 供延迟启动时显示状态;
+    完整的 MonitorMapSheet 在后台载入后替换该对象
+    """
+    
+    def __init__(self, mapsheet_filename: str, current_date: DateType, info: dict):
+        self.mapsheetFileName = mapsheet_filename
+        self.currentDate = current_date
+        self.teamNumber = info.get('Team Number')
+        self.romanName = info.get('Roman Name')
+        self.teamleader = info.get('Leaders')
+        self.fileToReceiveFlag: bool = os.path.exists(MonitorMapSheet.workspace_file_path(
+            mapsheet_filename, current_date, "Planned routes", "plan_routes"
+        ))
+        self.finished: bool = os.path.exists(MonitorMapSheet.workspace_file_path(
+            mapsheet_filename, current_date, "Finished points", "finished_points_and_tracks"
+        ))
+
+
 class MonitorMapSheetCollection:
     """
     图幅集合监控器
     
     单例模式的容器类，管理所有需要监控的图幅
+    
+    收集状态变化时（完成文件或计划文件到达）递增状态版本号并唤醒等待的线程,
+    有计划且未完成的图幅数量随状态变化增量维护, 无需遍历全部图幅重新统计
+    
+    延迟启动模式（monitoring.lazy_startup）下只检查工作文件夹中的计划文件和完成文件,
+    各图幅的文件数据由后台线程载入, 首次通过 get_mapsheet_by_name 访问时等待该图幅载入完成
     """
     
     _instance = None
@@ -148,23 +210,34 @@ class MonitorMapSheetCollection:
             return
         
         self.current_date = current_date
-        self.mapsheet_collection: List[MonitorMapSheet] = []
+        self.mapsheet_collection: List[Union[MonitorMapSheet, PendingMonitorMapSheet]] = []
         self.mapsheet_names: List[str] = []
         self.to_collect_names: List[str] = []
         self.planned_route_file_num: int = 0
+        # 有当日计划且尚未完成的图幅名称
+        self._planned_unfinished: Set[str] = set()
+        # 状态版本号, 每次收集状态变化时递增
+        self.version: int = 0
+        self._condition = threading.Condition()
+        # 延迟启动模式下各图幅的后台载入任务
+        self._loading: Dict[str, Future] = {}
         
-        self._initialize_mapsheets()
+        config = ConfigManager().get_config()
+        if config.get('monitoring', {}).get('lazy_startup', True):
+            self._initialize_mapsheets_lazy()
+        else:
+            self._initialize_mapsheets()
         self._initialized = True
     
     @classmethod
     def _load_maps_info(cls):
         """加载图幅信息"""
-        cls._maps_info = mapsheet_manager.maps_info
+        cls._maps_info = get_mapsheet_manager().maps_info
     
     def _initialize_mapsheets(self):
         """初始化图幅列表 - 使用统一的图幅管理器"""
         # 使用图幅管理器创建图幅对象集合
-        mapsheets = mapsheet_manager.create_mapsheet_collection(MonitorMapSheet, self.current_date)
+        mapsheets = get_mapsheet_manager().create_mapsheet_collection(MonitorMapSheet, self.current_date)
         
         for mapsheet in mapsheets:
             # 添加到集合中
@@ -174,12 +247,106 @@ class MonitorMapSheetCollection:
             # 检查是否需要接收
             if mapsheet.fileToReceiveFlag:
                 self.planned_route_file_num += 1
+                if not mapsheet.finished:
+                    self._planned_unfinished.add(mapsheet.mapsheetFileName)
                 # 如果当前文件名为None，表示还未接收完成
                 if mapsheet.currentfilename is None:
                     self.to_collect_names.append(mapsheet.mapsheetFileName)
     
+    def _initialize_mapsheets_lazy(self):
+        """延迟初始化: 先用计划文件和完成文件的检查结果建立图幅列表, 再在后台载入各图幅"""
+        manager = get_mapsheet_manager()
+        info_by_name = {info['File Name']: info for info in self._maps_info.values()}
+        filenames = manager.get_sequence_mapsheet_filenames()
+        
+        for filename in filenames:
+            mapsheet = PendingMonitorMapSheet(filename, self.current_date, info_by_name[filename])
+            self.mapsheet_collection.append(mapsheet)
+            self.mapsheet_names.append(filename)
+            if mapsheet.fileToReceiveFlag:
+                self.planned_route_file_num += 1
+                if not mapsheet.finished:
+                    self.to_collect_names.append(filename)
+                    self._planned_unfinished.add(filename)
+        
+        # 在启动线程前加载类级别的图幅信息, 避免各线程重复加载
+        MonitorMapSheet._load_maps_info()
+        workers = manager._config_manager.get('performance.parallel.thread_workers', 8) or 1
+        executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='mapsheet-load')
+        for index, filename in enumerate(filenames):
+            future = executor.submit(MonitorMapSheet, filename, self.current_date)
+            future.add_done_callback(lambda done, index=index: self._on_mapsheet_loaded(index, done))
+            self._loading[filename] = future
+        # 不等待载入完成, 线程在全部任务结束后退出
+        executor.shutdown(wait=False)
+    
+    def _on_mapsheet_loaded(self, index: int, future: Future) -> None:
+        """后台载入完成后替换列表中的图幅对象, 并按载入结果校正收集状态"""
+        try:
+            mapsheet = future.result()
+        except Exception as e:
+            logger.error(f"载入图幅失败 {self.mapsheet_names[index]}: {e}")
+            return
+        with self._condition:
+            placeholder = self.mapsheet_collection[index]
+            self.mapsheet_collection[index] = mapsheet
+            if self._reconcile_loaded(placeholder, mapsheet):
+                self._notify_changed()
+    
+    def _reconcile_loaded(self, placeholder: PendingMonitorMapSheet, mapsheet: MonitorMapSheet) -> bool:
+        """
+        按载入后图幅的计划和完成状态校正计划数量、待收集列表和未完成集合（需持有锁）
+        
+        占位对象只检查工作文件夹, 载入后的图幅按微信文件夹的搜索结果确定完成状态, 两者可能不一致:
+        工作文件夹中已有当天文件但微信文件夹中没有时, 图幅重新加入待收集列表
+        
+        Returns:
+            bool: 状态是否发生变化
+        """
+        name = mapsheet.mapsheetFileName
+        planned = bool(mapsheet.fileToReceiveFlag)
+        to_collect = planned and not mapsheet.finished
+        changed = False
+        
+        if planned != bool(placeholder.fileToReceiveFlag):
+            self.planned_route_file_num += 1 if planned else -1
+            changed = True
+        
+        if to_collect and name not in self._planned_unfinished:
+            self._planned_unfinished.add(name)
+            changed = True
+        elif not to_collect and name in self._planned_unfinished:
+            self._planned_unfinished.discard(name)
+            changed = True
+        
+        if to_collect and name not in self.to_collect_names:
+            # 按图幅顺序插入, 与非延迟启动时的列表顺序一致
+            order = {filename: position for position, filename in enumerate(self.mapsheet_names)}
+            position = sum(1 for filename in self.to_collect_names if order[filename] < order[name])
+            self.to_collect_names.insert(position, name)
+            changed = True
+        elif not to_collect and self.remove_from_collection(name):
+            changed = True
+        return changed
+    
+    def wait_loaded(self, timeout: Optional[float] = None) -> bool:
+        """等待所有图幅载入完成（非延迟启动模式下直接返回 True）"""
+        for future in self._loading.values():
+            try:
+                future.exception(timeout)
+            except FutureTimeoutError:
+                return False
+        return True
+    
     def get_mapsheet_by_name(self, mapsheet_name: str) -> Optional[MonitorMapSheet]:
-        """根据图幅名称获取图幅对象"""
+        """根据图幅名称获取图幅对象, 延迟启动模式下等待该图幅载入完成"""
+        future = self._loading.get(mapsheet_name)
+        if future is not None:
+            try:
+                return future.result()
+            except Exception as e:
+                logger.error(f"载入图幅失败 {mapsheet_name}: {e}")
+                return None
         for mapsheet in self.mapsheet_collection:
             if mapsheet.mapsheetFileName == mapsheet_name:
                 return mapsheet
@@ -192,6 +359,48 @@ class MonitorMapSheetCollection:
             return True
         return False
     
+    def mark_finished(self, mapsheet: MonitorMapSheet) -> None:
+        """图幅收到完成文件后更新待收集列表和计数, 并唤醒等待状态变化的线程"""
+        with self._condition:
+            self.remove_from_collection(mapsheet.mapsheetFileName)
+            self._planned_unfinished.discard(mapsheet.mapsheetFileName)
+            self._notify_changed()
+    
+    def mark_plan_updated(self, mapsheet: MonitorMapSheet) -> None:
+        """图幅收到计划文件后唤醒等待状态变化的线程"""
+        with self._condition:
+            self._notify_changed()
+    
+    def _notify_changed(self) -> None:
+        """递增状态版本号并唤醒等待的线程（需持有锁）"""
+        self.version += 1
+        self._condition.notify_all()
+    
+    def wait_for_change(self, version: int, timeout: Optional[float] = None) -> int:
+        """
+        等待状态版本号变化
+        
+        Args:
+            version: 调用方已知的版本号
+            timeout: 最长等待时间（秒）, None 表示一直等待
+        
+        Returns:
+            当前的版本号（超时时可能与 version 相同）
+        """
+        with self._condition:
+            self._condition.wait_for(lambda: self.version != version, timeout)
+            return self.version
+    
+    def get_planned_counts(self) -> Tuple[int, int, int]:
+        """
+        获取有当日计划的图幅统计（与 MonitorDisplay.get_planned_mapsheets_count 的结果一致）
+        
+        Returns:
+            tuple: (有当日计划的图幅数量, 总图幅数量, 有计划且未完成的图幅数量)
+        """
+        with self._condition:
+            return self.planned_route_file_num, len(self.mapsheet_collection), len(self._planned_unfinished)
+    
     def get_remaining_count(self) -> int:
         """获取剩余待接收文件数量"""
         return len(self.to_collect_names)
@@ -8,27 +8,29 @@
 支持实时监控、状态显示和自动完成检测。
 
 .. note::
-   本模块依赖于watchdog库进行文件系统监控
+   本模块依赖于watchdog库进行文件系统监控，并以目录快照轮询补充遗漏的事件
 
 .. version:: 1.0
 .. author:: GMAS Team
 """
 
 import os
-import time
-from datetime import datetime
+from datetime import datetime, timedelta
 from typing import Optional, Callable
-from watchdog.observers import Observer
-
 from ..data_models.date_types import DateType
+from ..utils.directory_snapshot import ChangeJournal
 from config import ConfigManager
 from .event_handler import FileEventHandler
+from .hybrid_observer import HybridObserver
 from display import MonitorDisplay
 
 # 初始化配置
 config_manager = ConfigManager()
 config = config_manager.get_config()
 
+# 单次等待的最长时间（秒）: Windows 上等待锁时无法响应 Ctrl+C, 分段等待以便及时处理用户中断
+MAX_WAIT_SLICE_SECONDS = 1.0
+
 
 class MonitorManager:
     """
@@ -53,7 +55,7 @@ class MonitorManager:
     :ivar event_handler: 文件事件处理器
     :type event_handler: FileEventHandler
     :ivar observer: 文件系统观察者
-    :type observer: Optional[Observer]
+    :type observer: Optional[HybridObserver]
     
     .. seealso::
        :class:`FileEventHandler` 文件事件处理器
@@ -81,7 +83,11 @@ class MonitorManager:
         self.fuzzy_threshold = fuzzy_threshold
         
         # 初始化组件
-        self.event_handler = FileEventHandler(current_date, enable_fuzzy_matching, fuzzy_threshold)
+        self.event_handler = FileEventHandler(
+            current_date, enable_fuzzy_matching, fuzzy_threshold,
+            debounce_seconds=config['monitoring'].get('event_debounce_seconds', 1.0),
+            max_workers=config['monitoring'].get('event_workers', 2)
+        )
         self.observer = None
     
     def start_monitoring(self, executor: Optional[Callable] = None, end_time: Optional[datetime] = None):
@@ -124,9 +130,15 @@ class MonitorManager:
         # 显示初始的待收集文件列表
         self._display_initial_status()
         
-        # 启动文件系统监控
-        self.observer = Observer()
-        self.observer.schedule(self.event_handler, wechat_path, recursive=True)
+        # 启动文件系统监控, 事件由处理管道在工作线程中处理
+        self.event_handler.start_processing()
+        self.event_handler.journal = self._open_journal(wechat_path)
+        self.observer = HybridObserver(
+            self.event_handler, wechat_path,
+            mode=config['monitoring'].get('watch_mode', 'auto'),
+            poll_interval=config['monitoring'].get('poll_interval_seconds', config['monitoring']['time_interval_seconds']),
+            journal=self.event_handler.journal
+        )
         self.observer.start()
         
         try:
@@ -139,6 +151,7 @@ class MonitorManager:
         finally:
             self.observer.stop()
             self.observer.join()
+            self.event_handler.stop_processing()
     
     def monitor_until_completion(self, executor: Optional[Callable] = None):
         """
@@ -156,30 +169,38 @@ class MonitorManager:
            * 每隔一定时间间隔显示收集状态
            * 在晚上19点后或剩余文件<=5个时进入催促模式
            * 显示进度指示点（.）表示系统正在运行
+           * 收集状态变化时立即唤醒，全部文件收集完成后立即结束
         """
+        collection = self.event_handler.mapsheet_collection
+        version = collection.version
+        next_status = self._next_status_time(datetime.now())
+        next_heartbeat = datetime.now() + self._heartbeat_interval()
+        
         while not self.event_handler.is_all_collected():
+            # 收集状态变化时立即唤醒, 否则等到下一次状态显示或进度指示时间
+            version = self._wait_for_change(version, min(next_status, next_heartbeat))
             current_time = datetime.now()
             
-            if self._should_display_status(current_time):
+            if current_time >= next_status:
+                next_status = self._next_status_time(current_time)
                 remaining_files = self.event_handler.get_remaining_files()
-                planned_count, total_count, planned_unfinished_count = MonitorDisplay.get_planned_mapsheets_count(
-                    self.event_handler.mapsheet_collection.mapsheet_collection
-                )
+                planned_count, total_count, planned_unfinished_count = collection.get_planned_counts()
                 MonitorDisplay.show_status(
                     "实时监控模式",
                     f"有当日计划的图幅: {planned_count}/{total_count} | 待收集文件数: {planned_unfinished_count}",
-                    self.event_handler.mapsheet_collection.mapsheet_collection
+                    collection.mapsheet_collection
                 )
                 
                 # 检查是否需要进入催促模式
                 if self._should_enter_urgent_mode(current_time, remaining_files):
                     MonitorDisplay.show_urgent_mode(
                         remaining_files, 
-                        self.event_handler.mapsheet_collection.mapsheet_collection
+                        collection.mapsheet_collection
                     )
             
-            time.sleep(config['monitoring']['time_interval_seconds'])
-            print(".", end="", flush=True)
+            if current_time >= next_heartbeat:
+                next_heartbeat = current_time + self._heartbeat_interval()
+                print(".", end="", flush=True)
         
         # 完成收集
         MonitorDisplay.show_completion()
@@ -206,50 +227,100 @@ class MonitorManager:
         * 所有当日计划文件都已收集完成（如果当日有计划文件）
         """
         # 检查是否有当日计划的文件
-        planned_count, total_count, planned_unfinished_count = MonitorDisplay.get_planned_mapsheets_count(
-            self.event_handler.mapsheet_collection.mapsheet_collection
-        )
+        collection = self.event_handler.mapsheet_collection
+        planned_count, total_count, planned_unfinished_count = collection.get_planned_counts()
         
         # 如果没有当日计划的文件，则设置标志为False，表示不需要检查文件收集状态
         check_collection_status = planned_unfinished_count > 0
         
+        version = collection.version
+        next_status = self._next_status_time(datetime.now())
+        next_heartbeat = datetime.now() + self._heartbeat_interval()
+        
         while datetime.now() < end_time and (not check_collection_status or not self.event_handler.is_all_collected()):
-            if self._should_display_status(datetime.now()):
-                planned_count, total_count, planned_unfinished_count = MonitorDisplay.get_planned_mapsheets_count(
-                    self.event_handler.mapsheet_collection.mapsheet_collection
-                )
+            # 收集状态变化时立即唤醒, 否则等到下一次状态显示、进度指示或结束时间
+            version = self._wait_for_change(version, min(next_status, next_heartbeat, end_time))
+            current_time = datetime.now()
+            
+            if current_time >= next_status:
+                next_status = self._next_status_time(current_time)
+                planned_count, total_count, planned_unfinished_count = collection.get_planned_counts()
                 MonitorDisplay.show_status(
                     "监控模式 - 定时检查",
                     f"有当日计划的图幅: {planned_count}/{total_count} | 待收集文件数: {planned_unfinished_count}",
-                    self.event_handler.mapsheet_collection.mapsheet_collection
+                    collection.mapsheet_collection
                 )
             
-            time.sleep(config['monitoring']['time_interval_seconds'])
-            print(".", end="", flush=True)
+            if current_time >= next_heartbeat:
+                next_heartbeat = current_time + self._heartbeat_interval()
+                print(".", end="", flush=True)
         
         # 超时退出
         MonitorDisplay.show_timeout(end_time)
         if executor:
             executor()
     
-    def _should_display_status(self, current_time: datetime) -> bool:
+    def _open_journal(self, wechat_path: str) -> Optional[ChangeJournal]:
         """
-        判断是否应该显示状态信息
+        打开当日的监控变化日志
         
-        根据当前时间和配置的状态显示间隔，判断是否需要显示监控状态。
+        :param wechat_path: 监控目录
+        :type wechat_path: str
+        :return: 变化日志；配置中禁用或缓存目录不可用时返回None
+        :rtype: Optional[ChangeJournal]
+        """
+        if not config['monitoring'].get('journal', True):
+            return None
+        try:
+            journal_dir = config_manager.get_cache_directory('monitor_journal')
+        except Exception as e:
+            print(f"无法创建监控日志目录，重启后将重新建立监控基准: {e}")
+            return None
+        return ChangeJournal(os.path.join(journal_dir, f"{self.current_date.yyyymmdd_str}.json"), wechat_path)
+    
+    def _wait_for_change(self, version: int, deadline: datetime) -> int:
+        """
+        等待收集状态变化或到达指定时间
+        
+        :param version: 已知的状态版本号
+        :type version: int
+        :param deadline: 最晚唤醒时间
+        :type deadline: datetime
+        :return: 当前的状态版本号
+        :rtype: int
+        """
+        collection = self.event_handler.mapsheet_collection
+        while True:
+            remaining = (deadline - datetime.now()).total_seconds()
+            if remaining <= 0:
+                return version
+            current = collection.wait_for_change(version, min(remaining, MAX_WAIT_SLICE_SECONDS))
+            if current != version:
+                return current
+    
+    def _next_status_time(self, current_time: datetime) -> datetime:
+        """
+        计算下一次显示状态信息的时间
+        
+        状态在每小时内分钟数为 status_interval_minutes 整数倍时显示（如间隔30分钟时为每小时的0分和30分）。
         
         :param current_time: 当前时间
         :type current_time: datetime
-        :return: 如果应该显示状态则返回True，否则返回False
-        :rtype: bool
+        :return: 下一次显示状态的时间
+        :rtype: datetime
         
         .. note::
            状态显示的时机由配置文件中的status_interval_minutes参数控制
         """
-        return (
-            current_time.minute % config['monitoring']['status_interval_minutes'] == 0 and 
-            0 <= current_time.second < config['monitoring']['time_interval_seconds']
-        )
+        interval = config['monitoring']['status_interval_minutes']
+        hour_start = current_time.replace(minute=0, second=0, microsecond=0)
+        next_minute = (current_time.minute // interval + 1) * interval
+        # 与按分钟取余的判断一致: 每小时从0分重新开始计算
+        return hour_start + timedelta(minutes=min(next_minute, 60))
+    
+    def _heartbeat_interval(self) -> timedelta:
+        """进度指示点（.）的输出间隔"""
+        return timedelta(seconds=config['monitoring']['time_interval_seconds'])
     
     def _should_enter_urgent_mode(self, current_time: datetime, remaining_files: list) -> bool:
         """
@@ -288,6 +359,7 @@ class MonitorManager:
         if self.observer and self.observer.is_alive():
             self.observer.stop()
             self.observer.join()
+        self.event_handler.stop_processing()
     
     def _display_initial_status(self):
         """
@@ -4,14 +4,20 @@
 包含各种报告生成器：
 - Excel报告生成
 - 数据提交报告
+
+各名称在首次访问时才导入（数据提交依赖 GDAL, Excel报告依赖 openpyxl）
 """
 
-try:
-    from .data_submission import DataSubmition
+from ..lazy_import import lazy_exports
+
+_EXPORTS = {
+    'DataSubmition': '.data_submission',
+    'ReportSheet': '.excel_writer',
+    'write_report': '.excel_writer',
+    'StatisticsWorkbook': '.statistics_workbook',
+    'PatchNotApplicable': '.statistics_workbook',
+}
+
+__all__ = list(_EXPORTS)
 
-    __all__ = [
-        'DataSubmition'
-    ]
-except ImportError as e:
-    print(f"导入报告生成模块时出错: {e}")
-    __all__ = []
+__getattr__, __dir__ = lazy_exports(__name__, _EXPORTS, globals())
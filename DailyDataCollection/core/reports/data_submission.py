@@ -11,7 +11,9 @@ import zipfile
 import logging
 from datetime import timedelta
 from typing import Dict, List, Optional, Any
-from osgeo import ogr, osr
+
+from ..data_models.point_store import PointStore
+from ..file_handlers.vector_writer import format_label, read_points, write_points
 
 # 导入配置
 from config.config_manager import ConfigManager
@@ -20,6 +22,10 @@ config_manager = ConfigManager()
 WORKSPACE = config_manager.get('system.workspace')
 MAP_PROJECT_FOLDER = config_manager.get('system.map_project_folder')
 OBS_FOLDER = config_manager.get('system.observation_pts_foler')
+# 每次提交时保存点要素快照, 下周比较时直接载入, 无需读取（或解压）一周前的SHP文件
+USE_POINT_SNAPSHOT = config_manager.get('performance.weekly_snapshot.enabled', True)
+# 使用快照时是否仍将一周前的SHP文件拷贝（或解压）至制图文件夹
+COPY_PREVIOUS_LAYER = config_manager.get('performance.weekly_snapshot.copy_previous_layer', True)
 
 # 创建 logger 实例
 logger = logging.getLogger('Data Submission')
@@ -93,6 +99,7 @@ class DataSubmition:
                 f"GMAS_points_until_{self.date.yyyymmdd_str}.shp"
             )
             self.pointDictToShp(self.pointDict, output_shp_file)
+            self._save_snapshot(self.date)
 
             # 将shp文件压缩为zip文件
             zip_file = os.path.join(
@@ -146,38 +153,32 @@ class DataSubmition:
                 f"GMAS_points_until_{one_week_ago.yyyymmdd_str}.zip"
             )
 
-            # 根据文件存在情况处理
-            if os.path.exists(one_week_ago_shpfile):
-                # 拷贝一周前的shp文件至制图文件夹中
-                for ext in DataSubmition.SHP_EXTENSIONS:
-                    src_file = one_week_ago_shpfile.replace('.shp', ext)
-                    if os.path.exists(src_file):
-                        shutil.copy(src_file, week_report_folder)
-                os.chmod(week_report_folder, stat.S_IWRITE | stat.S_IREAD)
-            elif os.path.exists(one_week_ago_zipfile):
-                # 解压一周前的zip文件至制图文件夹中
-                with zipfile.ZipFile(one_week_ago_zipfile, 'r') as zip_ref:
-                    zip_ref.extractall(week_report_folder)
-            else:
-                logger.warning(f"一周前的文件不存在: {one_week_ago_zipfile}\\n{one_week_ago_shpfile}")
-                return False
+            # 优先载入一周前提交时保存的点要素快照
+            one_week_ago_points = self._load_snapshot(one_week_ago)
 
-            # 读取一周前的点要素
-            one_week_ago_shp_path = os.path.join(
-                week_report_folder, 
-                f"GMAS_points_until_{one_week_ago.yyyymmdd_str}.shp"
-            )
-            
-            if not os.path.exists(one_week_ago_shp_path):
-                logger.error(f"无法找到一周前的SHP文件: {one_week_ago_shp_path}")
-                return False
+            # 拷贝（或解压）一周前的shp文件至制图文件夹中
+            if one_week_ago_points is None or COPY_PREVIOUS_LAYER:
+                copied = self._copy_previous_layer(one_week_ago_shpfile, one_week_ago_zipfile, week_report_folder)
+                if not copied and one_week_ago_points is None:
+                    logger.warning(f"一周前的文件不存在: {one_week_ago_zipfile}\\n{one_week_ago_shpfile}")
+                    return False
+
+            if one_week_ago_points is None:
+                # 读取一周前的点要素
+                one_week_ago_shp_path = os.path.join(
+                    week_report_folder, 
+                    f"GMAS_points_until_{one_week_ago.yyyymmdd_str}.shp"
+                )
                 
-            one_week_ago_points_dict = self.readShpToPointDict(one_week_ago_shp_path)
-            count_one_week_ago_points_dict = len(one_week_ago_points_dict)
-            logger.info(f"一周前{one_week_ago.yyyymmdd_str}的点要素总数: {count_one_week_ago_points_dict}")
+                if not os.path.exists(one_week_ago_shp_path):
+                    logger.error(f"无法找到一周前的SHP文件: {one_week_ago_shp_path}")
+                    return False
+                    
+                one_week_ago_points = self.readShpToPointDict(one_week_ago_shp_path)
+            logger.info(f"一周前{one_week_ago.yyyymmdd_str}的点要素总数: {len(one_week_ago_points)}")
             
-            # 计算本周新增的点要素
-            diff_dict = {k: v for k, v in self.pointDict.items() if k not in one_week_ago_points_dict}
+            # 计算本周新增的点要素（按 OBSID 数组做向量化差集）
+            diff_dict = PointStore.from_mapping(self.pointDict).difference(one_week_ago_points)
 
             one_week_ago_nextday = DateType(date_datetime=(self.date.date_datetime - timedelta(days=6)))
             logger.info(f"{one_week_ago_nextday.yyyymmdd_str}至{self.date.yyyymmdd_str}, 本周新增点要素: {len(diff_dict)}")
@@ -196,83 +197,67 @@ class DataSubmition:
             logger.error(f"处理周比较失败: {e}")
             return False
 
+    @staticmethod
+    def _copy_previous_layer(shp_file: str, zip_file: str, target_folder: str) -> bool:
+        """根据文件存在情况拷贝shp文件或解压zip文件至目标文件夹, 均不存在时返回False"""
+        if os.path.exists(shp_file):
+            for ext in DataSubmition.SHP_EXTENSIONS:
+                src_file = shp_file.replace('.shp', ext)
+                if os.path.exists(src_file):
+                    shutil.copy(src_file, target_folder)
+            os.chmod(target_folder, stat.S_IWRITE | stat.S_IREAD)
+            return True
+        if os.path.exists(zip_file):
+            with zipfile.ZipFile(zip_file, 'r') as zip_ref:
+                zip_ref.extractall(target_folder)
+            return True
+        return False
+
     def pointDictToShp(self, pointDict: Dict[str, Dict[str, float]], output_shp_file: str) -> bool:
         """将点要素字典转换为SHP文件"""
         try:
-            # 创建 SHP 文件驱动
-            shp_driver = ogr.GetDriverByName('ESRI Shapefile')
-            if os.path.exists(output_shp_file):
-                shp_driver.DeleteDataSource(output_shp_file)
-                
-            shp_ds = shp_driver.CreateDataSource(output_shp_file)
-            if shp_ds is None:
-                raise RuntimeError("Failed to create SHP file")
-                
-            # 创建 SHP 图层
-            srs = osr.SpatialReference()
-            srs.ImportFromEPSG(4326)  # WGS84
-            shp_layer = shp_ds.CreateLayer('points', srs, ogr.wkbPoint)
-            
-            # 创建字段
-            field_name = ogr.FieldDefn('Name', ogr.OFTString)
-            field_name.SetWidth(24)
-            shp_layer.CreateField(field_name)
-            field_longitude = ogr.FieldDefn('Longitude', ogr.OFTReal)
-            shp_layer.CreateField(field_longitude)
-            field_latitude = ogr.FieldDefn('Latitude', ogr.OFTReal)
-            shp_layer.CreateField(field_latitude)
-            
-            # 创建要素并添加到图层
-            for obspid, coords in pointDict.items():
-                feature = ogr.Feature(shp_layer.GetLayerDefn())
-                feature.SetField('Name', obspid)
-                feature.SetField('Longitude', float(coords['longitude']))
-                feature.SetField('Latitude', float(coords['latitude']))
-                point = ogr.Geometry(ogr.wkbPoint)
-                point.AddPoint(float(coords['longitude']), float(coords['latitude']))
-                feature.SetGeometry(point)
-                shp_layer.CreateFeature(feature)
-                feature = None  # 清理要素
-                
-            # 清理
-            shp_ds = None
-            print(f"点要素已成功生成 SHP 文件: {output_shp_file}")
+            write_points(output_shp_file, pointDict)
+            print(f"点要素已成功生成 {format_label(output_shp_file)} 文件: {output_shp_file}")
             return True
             
         except Exception as e:
-            logger.error(f"转换SHP文件失败: {e}")
+            logger.error(f"转换{format_label(output_shp_file)}文件失败: {e}")
             return False
 
-    def readShpToPointDict(self, shp_file: str) -> Dict[str, Dict[str, float]]:
-        """从SHP文件读取点要素字典"""
-        points_dict = {}
-        
+    def readShpToPointDict(self, shp_file: str) -> PointStore:
+        """从SHP文件按列读取点要素, 返回与点要素字典接口一致的 PointStore"""
         try:
-            # 打开 SHP 文件
-            shp_driver = ogr.GetDriverByName('ESRI Shapefile')
-            shp_ds = shp_driver.Open(shp_file, 0)  # 0 表示只读模式
-            if shp_ds is None:
-                raise RuntimeError(f"Failed to open SHP file: {shp_file}")
-                
-            # 获取图层
-            shp_layer = shp_ds.GetLayer()
-            
-            # 遍历要素
-            for feature in shp_layer:
-                obspid = feature.GetField('Name')
-                longitude = feature.GetField('Longitude')
-                latitude = feature.GetField('Latitude')
-                
-                if obspid and longitude is not None and latitude is not None:
-                    points_dict[obspid] = {
-                        'longitude': longitude,
-                        'latitude': latitude
-                    }
-                    
-            # 清理
-            shp_ds = None
-            
+            return read_points(shp_file)
         except Exception as e:
             logger.error(f"读取SHP文件失败: {e}")
-            
-        return points_dict
+            return PointStore()
+
+    @staticmethod
+    def _snapshot_path(date: Any) -> str:
+        """点要素快照文件路径"""
+        return os.path.join(
+            config_manager.get_cache_directory('weekly_points'),
+            f"GMAS_points_until_{date.yyyymmdd_str}.npz"
+        )
+
+    def _save_snapshot(self, date: Any) -> None:
+        """保存提交日的点要素快照"""
+        if not USE_POINT_SNAPSHOT:
+            return
+        try:
+            PointStore.from_mapping(self.pointDict).save(self._snapshot_path(date))
+        except Exception as e:
+            logger.warning(f"保存点要素快照失败: {e}")
+
+    def _load_snapshot(self, date: Any) -> Optional[PointStore]:
+        """载入指定日期的点要素快照, 不存在时返回None"""
+        if not USE_POINT_SNAPSHOT:
+            return None
+        path = self._snapshot_path(date)
+        if not os.path.exists(path):
+            return None
+        try:
+            return PointStore.load(path)
+        except Exception as e:
+            logger.warning(f"载入点要素快照失败: {e}")
+            return None
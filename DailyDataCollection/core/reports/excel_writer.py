@@ -0,0 +1,172 @@
+"""
+Excel报告写入模块
+
+先在内存中构建完整的表格（值、表头行、合并区域）, 再一次性流式写出:
+优先使用 xlsxwriter, 未安装时使用 openpyxl 的只写模式;
+样式只定义一次, 列宽根据表格数据计算, 不再逐个单元格回读
+"""
+
+import logging
+from dataclasses import dataclass, field
+from typing import Any, List, Optional, Set
+
+from openpyxl import Workbook
+from openpyxl.styles import Alignment, Border, Font, NamedStyle, Side
+from openpyxl.cell import WriteOnlyCell
+from openpyxl.utils import get_column_letter
+from openpyxl.utils.cell import range_boundaries
+
+try:
+    import xlsxwriter
+except ImportError:  # 可选依赖
+    xlsxwriter = None
+
+logger = logging.getLogger('Excel Writer')
+logger.setLevel(logging.ERROR)
+
+ENGINE_AUTO = 'auto'
+ENGINE_XLSXWRITER = 'xlsxwriter'
+ENGINE_OPENPYXL = 'openpyxl'
+
+FONT_NAME = 'Calibri'
+HEADER_FONT_SIZE = 12
+BODY_FONT_SIZE = 11
+
+
+@dataclass
+class ReportSheet:
+    """
+    待写入的工作表
+
+    rows 为完整的表格内容（None 表示带边框的空单元格）, 行号和列号均从1开始计算:
+    header_rows 中的行使用表头样式, merged_ranges 为 "B1:D1" 形式的合并区域
+    """
+    title: str
+    rows: List[List[Any]]
+    header_rows: Set[int] = field(default_factory=set)
+    merged_ranges: List[str] = field(default_factory=list)
+
+    @property
+    def column_count(self) -> int:
+        return max((len(row) for row in self.rows), default=0)
+
+    def column_widths(self) -> List[int]:
+        """按各列最长的文本计算列宽（数值和公式不参与计算）"""
+        widths = [0] * self.column_count
+        for row in self.rows:
+            for col, value in enumerate(row):
+                if isinstance(value, str) and not value.startswith('='):
+                    widths[col] = max(widths[col], len(value))
+        return [width + 2 for width in widths]
+
+
+def resolve_engine(engine: Optional[str] = None) -> str:
+    """确定实际使用的写入引擎, 指定 xlsxwriter 但未安装时退回 openpyxl"""
+    engine = (engine or ENGINE_AUTO).lower()
+    if engine in (ENGINE_AUTO, ENGINE_XLSXWRITER) and xlsxwriter is not None:
+        return ENGINE_XLSXWRITER
+    if engine == ENGINE_XLSXWRITER:
+        logger.warning("未安装 xlsxwriter, 使用 openpyxl 只写模式")
+    return ENGINE_OPENPYXL
+
+
+def _merged_cells(sheet: ReportSheet):
+    """返回 {合并区域左上角单元格: 区域} 和被合并覆盖的其余单元格集合"""
+    anchors = {}
+    covered = set()
+    for cell_range in sheet.merged_ranges:
+        min_col, min_row, max_col, max_row = range_boundaries(cell_range)
+        anchors[(min_row, min_col)] = (min_row, min_col, max_row, max_col)
+        for row in range(min_row, max_row + 1):
+            for col in range(min_col, max_col + 1):
+                if (row, col) != (min_row, min_col):
+                    covered.add((row, col))
+    return anchors, covered
+
+
+def _write_xlsxwriter(output_path: str, sheet: ReportSheet) -> None:
+    book = xlsxwriter.Workbook(output_path)
+    try:
+        worksheet = book.add_worksheet(sheet.title)
+        common = {'font_name': FONT_NAME, 'border': 1, 'align': 'center', 'valign': 'vcenter'}
+        header_format = book.add_format(dict(common, font_size=HEADER_FONT_SIZE, bold=True))
+        body_format = book.add_format(dict(common, font_size=BODY_FONT_SIZE))
+
+        for col, width in enumerate(sheet.column_widths()):
+            worksheet.set_column(col, col, width)
+
+        anchors, covered = _merged_cells(sheet)
+        column_count = sheet.column_count
+        for row_number, values in enumerate(sheet.rows, start=1):
+            cell_format = header_format if row_number in sheet.header_rows else body_format
+            for col_number in range(1, column_count + 1):
+                if (row_number, col_number) in covered:
+                    continue
+                value = values[col_number - 1] if col_number <= len(values) else None
+                merged = anchors.get((row_number, col_number))
+                if merged is not None:
+                    first_row, first_col, last_row, last_col = merged
+                    worksheet.merge_range(first_row - 1, first_col - 1, last_row - 1, last_col - 1,
+                                          value if value is not None else '', cell_format)
+                elif value is None or value == '':
+                    worksheet.write_blank(row_number - 1, col_number - 1, None, cell_format)
+                else:
+                    worksheet.write(row_number - 1, col_number - 1, value, cell_format)
+    finally:
+        book.close()
+
+
+def _named_style(name: str, size: int, bold: bool) -> NamedStyle:
+    side = Side(border_style='thin')
+    style = NamedStyle(name=name)
+    style.font = Font(name=FONT_NAME, size=size, bold=bold)
+    style.border = Border(left=side, right=side, top=side, bottom=side)
+    style.alignment = Alignment(horizontal='center', vertical='center')
+    return style
+
+
+def _write_openpyxl(output_path: str, sheet: ReportSheet) -> None:
+    book = Workbook(write_only=True)
+    header_style = _named_style('gmas_header', HEADER_FONT_SIZE, True)
+    body_style = _named_style('gmas_body', BODY_FONT_SIZE, False)
+    book.add_named_style(header_style)
+    book.add_named_style(body_style)
+
+    worksheet = book.create_sheet(sheet.title)
+    # 只写模式下列宽和合并区域必须在写入单元格之前设置
+    for col, width in enumerate(sheet.column_widths(), start=1):
+        worksheet.column_dimensions[get_column_letter(col)].width = width
+    for cell_range in sheet.merged_ranges:
+        worksheet.merged_cells.add(cell_range)
+
+    column_count = sheet.column_count
+    for row_number, values in enumerate(sheet.rows, start=1):
+        style_name = header_style.name if row_number in sheet.header_rows else body_style.name
+        cells = []
+        for col_number in range(column_count):
+            value = values[col_number] if col_number < len(values) else None
+            cell = WriteOnlyCell(worksheet, value=None if value == '' else value)
+            cell.style = style_name
+            cells.append(cell)
+        worksheet.append(cells)
+    book.save(output_path)
+
+
+def write_report(output_path: str, sheet: ReportSheet, engine: Optional[str] = None) -> str:
+    """
+    将工作表写入新的Excel文件
+
+    Args:
+        output_path: 输出文件路径
+        sheet: 待写入的工作表
+        engine: 写入引擎（auto / xlsxwriter / openpyxl）
+
+    Returns:
+        实际使用的写入引擎
+    """
+    engine = resolve_engine(engine)
+    if engine == ENGINE_XLSXWRITER:
+        _write_xlsxwriter(output_path, sheet)
+    else:
+        _write_openpyxl(output_path, sheet)
+    return engine
@@ -0,0 +1,328 @@
+"""
+累计统计工作簿快速更新模块
+
+Daily_statistics_details 工作簿跨越多年, 使用 openpyxl 完整载入和保存的开销远大于写入的一列数据。
+本模块直接读写 xlsx 压缩包:
+- 第1行的日期 -> 列号索引保存在工作簿旁的隐藏文件中, 工作簿大小和修改时间不变时直接使用
+- 写入时只修改目标工作表的 XML 中受影响的单元格, 并设置打开时重新计算公式, 其余条目原样复制
+"""
+
+import os
+import re
+import json
+import zipfile
+import logging
+from datetime import date, datetime, timedelta
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from lxml import etree
+from openpyxl.utils.cell import column_index_from_string, coordinate_from_string, get_column_letter
+
+from ..file_handlers.kmz_writer import atomic_zip_writer
+
+logger = logging.getLogger('Statistics Workbook')
+logger.setLevel(logging.ERROR)
+
+MAIN_NS = 'http://schemas.openxmlformats.org/spreadsheetml/2006/main'
+REL_NS = 'http://schemas.openxmlformats.org/officeDocument/2006/relationships'
+PKG_REL_NS = 'http://schemas.openxmlformats.org/package/2006/relationships'
+
+# 日期从第9列开始（前8列为图幅信息）
+DATE_COLUMN_MIN = 9
+
+_EXCEL_EPOCH = datetime(1899, 12, 30)
+# 1904 日期系统（Mac 版 Excel 创建的工作簿, workbookPr 的 date1904 属性）
+_EXCEL_EPOCH_1904 = datetime(1904, 1, 1)
+_DATE_IN_TEXT_RE = re.compile(r'(\d{4})[-/]?(\d{2})[-/]?(\d{2})')
+# calcPr 之前可能出现的 workbook 子元素（按架构顺序）
+_BEFORE_CALC_PR = ('sheets', 'functionGroups', 'externalReferences', 'definedNames')
+
+
+def _q(tag: str) -> str:
+    return f'{{{MAIN_NS}}}{tag}'
+
+
+class PatchNotApplicable(ValueError):
+    """工作簿结构不适合直接修改（例如目标单元格包含公式）, 调用方应改用 openpyxl"""
+
+
+def excel_serial_to_date(value: float, date1904: bool = False) -> Optional[date]:
+    """将 Excel 日期序列号转换为日期, date1904 为 True 时使用 1904 日期系统"""
+    if not 1 <= value < 2958466:
+        return None
+    epoch = _EXCEL_EPOCH_1904 if date1904 else _EXCEL_EPOCH
+    try:
+        return (epoch + timedelta(days=int(value))).date()
+    except OverflowError:
+        return None
+
+
+class StatisticsWorkbook:
+    """
+    累计统计工作簿
+
+    Args:
+        path: 工作簿路径
+        sheet_name: 工作表名称, 不存在时使用活动工作表
+    """
+
+    INDEX_VERSION = 2
+
+    def __init__(self, path: str, sheet_name: str = "总表"):
+        self.path = path
+        self.sheet_name = sheet_name
+
+    @property
+    def index_path(self) -> str:
+        """日期索引文件路径"""
+        folder, name = os.path.split(self.path)
+        return os.path.join(folder, f".{name}.dates.json")
+
+    def _stamp(self) -> Tuple[int, int]:
+        file_stat = os.stat(self.path)
+        return file_stat.st_size, file_stat.st_mtime_ns
+
+    # ---- 压缩包结构 ----
+
+    def _sheet_entry(self, archive: zipfile.ZipFile) -> str:
+        """根据工作表名称确定工作表 XML 在压缩包中的路径"""
+        workbook = etree.fromstring(archive.read('xl/workbook.xml'))
+        sheets = workbook.findall(f"{_q('sheets')}/{_q('sheet')}")
+        if not sheets:
+            raise PatchNotApplicable("工作簿中没有工作表")
+        selected = next((sheet for sheet in sheets if sheet.get('name') == self.sheet_name), None)
+        if selected is None:
+            view = workbook.find(f"{_q('bookViews')}/{_q('workbookView')}")
+            active = int(view.get('activeTab', 0)) if view is not None else 0
+            selected = sheets[min(active, len(sheets) - 1)]
+            logger.warning(f"未找到'{self.sheet_name}'工作表，使用默认工作表")
+
+        rel_id = selected.get(f'{{{REL_NS}}}id')
+        rels = etree.fromstring(archive.read('xl/_rels/workbook.xml.rels'))
+        for rel in rels.iter(f'{{{PKG_REL_NS}}}Relationship'):
+            if rel.get('Id') == rel_id:
+                target = rel.get('Target')
+                return target.lstrip('/') if target.startswith('/') else f"xl/{target}"
+        raise PatchNotApplicable(f"无法确定工作表路径: {rel_id}")
+
+    @staticmethod
+    def _uses_date1904(archive: zipfile.ZipFile) -> bool:
+        """工作簿是否使用 1904 日期系统"""
+        workbook = etree.fromstring(archive.read('xl/workbook.xml'))
+        workbook_pr = workbook.find(_q('workbookPr'))
+        return workbook_pr is not None and workbook_pr.get('date1904', '0').lower() in ('1', 'true')
+
+    @staticmethod
+    def _shared_strings(archive: zipfile.ZipFile) -> List[str]:
+        try:
+            data = archive.open('xl/sharedStrings.xml')
+        except KeyError:
+            return []
+        strings = []
+        with data:
+            for _, item in etree.iterparse(data, tag=_q('si')):
+                strings.append(''.join(item.itertext()))
+                item.clear()
+        return strings
+
+    # ---- 日期索引 ----
+
+    def _scan_dates(self) -> Dict[str, int]:
+        """读取第1行, 返回 {YYYYMMDD: 列号}（只解析到第1行为止）"""
+        dates: Dict[str, int] = {}
+        with zipfile.ZipFile(self.path) as archive:
+            sheet_entry = self._sheet_entry(archive)
+            first_row = None
+            with archive.open(sheet_entry) as stream:
+                for _, row in etree.iterparse(stream, tag=_q('row')):
+                    if row.get('r', '1') == '1':
+                        first_row = row
+                    break
+            if first_row is None:
+                return dates
+            date1904 = self._uses_date1904(archive)
+            shared_strings = None
+
+            for cell in first_row.iterfind(_q('c')):
+                ref = cell.get('r')
+                value_element = cell.find(_q('v'))
+                if ref is None:
+                    continue
+                col = column_index_from_string(coordinate_from_string(ref)[0])
+                if col < DATE_COLUMN_MIN:
+                    continue
+
+                cell_type = cell.get('t', 'n')
+                cell_date = None
+                if cell_type == 'n' and value_element is not None and value_element.text:
+                    try:
+                        cell_date = excel_serial_to_date(float(value_element.text), date1904)
+                    except ValueError:
+                        cell_date = None
+                else:
+                    if cell_type == 's' and value_element is not None:
+                        if shared_strings is None:
+                            shared_strings = self._shared_strings(archive)
+                        text = shared_strings[int(value_element.text)]
+                    elif cell_type == 'inlineStr':
+                        text = ''.join(cell.find(_q('is')).itertext()) if cell.find(_q('is')) is not None else ''
+                    else:
+                        text = value_element.text if value_element is not None else ''
+                    match = _DATE_IN_TEXT_RE.search(text or '')
+                    if match:
+                        try:
+                            cell_date = date(int(match.group(1)), int(match.group(2)), int(match.group(3)))
+                        except ValueError:
+                            cell_date = None
+
+                if cell_date is not None:
+                    dates.setdefault(cell_date.strftime('%Y%m%d'), col)
+        return dates
+
+    def _load_index(self) -> Optional[Dict[str, int]]:
+        try:
+            with open(self.index_path, 'r', encoding='utf-8') as file:
+                data = json.load(file)
+        except (OSError, ValueError):
+            return None
+        if (data.get('version') != self.INDEX_VERSION or data.get('sheet') != self.sheet_name
+                or tuple(data.get('stamp', ())) != self._stamp()):
+            return None
+        return data.get('dates')
+
+    def _save_index(self, dates: Dict[str, int]) -> None:
+        data = {'version': self.INDEX_VERSION, 'sheet': self.sheet_name,
+                'stamp': list(self._stamp()), 'dates': dates}
+        temp_path = f"{self.index_path}.{os.getpid()}.tmp"
+        try:
+            with open(temp_path, 'w', encoding='utf-8') as file:
+                json.dump(data, file)
+            os.replace(temp_path, self.index_path)
+        except OSError as e:
+            logger.warning(f"保存日期索引失败: {e}")
+
+    def date_columns(self) -> Dict[str, int]:
+        """获取 {YYYYMMDD: 列号} 索引, 工作簿未变化时直接读取索引文件"""
+        dates = self._load_index()
+        if dates is None:
+            dates = self._scan_dates()
+            self._save_index(dates)
+        return dates
+
+    def find_date_column(self, target: datetime) -> Optional[int]:
+        """查找日期所在的列号, 未找到时返回None"""
+        return self.date_columns().get(target.strftime('%Y%m%d'))
+
+    # ---- 写入 ----
+
+    @staticmethod
+    def _patch_sheet(sheet_xml: bytes, col: int, start_row: int, values: Sequence[Optional[float]]) -> bytes:
+        """修改工作表 XML 中第 col 列从 start_row 开始的单元格"""
+        parser = etree.XMLParser(huge_tree=True, remove_blank_text=False)
+        root = etree.fromstring(sheet_xml, parser)
+        sheet_data = root.find(_q('sheetData'))
+        if sheet_data is None:
+            raise PatchNotApplicable("工作表缺少 sheetData")
+
+        rows = {}
+        for row in sheet_data.iterfind(_q('row')):
+            if row.get('r') is None:
+                raise PatchNotApplicable("工作表的行缺少行号")
+            rows[int(row.get('r'))] = row
+        letter = get_column_letter(col)
+
+        for offset, value in enumerate(values):
+            row_number = start_row + offset
+            row = rows.get(row_number)
+            if row is None:
+                row = etree.Element(_q('row'), r=str(row_number))
+                following = [number for number in rows if number > row_number]
+                if following:
+                    rows[min(following)].addprevious(row)
+                else:
+                    sheet_data.append(row)
+                rows[row_number] = row
+
+            ref = f"{letter}{row_number}"
+            cell = None
+            insert_before = None
+            for existing in row.iterfind(_q('c')):
+                existing_ref = existing.get('r')
+                if existing_ref is None:
+                    raise PatchNotApplicable("单元格缺少引用")
+                if existing_ref == ref:
+                    cell = existing
+                    break
+                if column_index_from_string(coordinate_from_string(existing_ref)[0]) > col:
+                    insert_before = existing
+                    break
+            if cell is None:
+                if value is None:
+                    continue
+                cell = etree.Element(_q('c'), r=ref)
+                if insert_before is not None:
+                    insert_before.addprevious(cell)
+                else:
+                    row.append(cell)
+                # 新增单元格可能超出原有的 spans 范围
+                row.attrib.pop('spans', None)
+
+            if cell.find(_q('f')) is not None:
+                raise PatchNotApplicable(f"单元格 {ref} 包含公式")
+            cell.attrib.pop('t', None)
+            for child in list(cell):
+                cell.remove(child)
+            if value is not None:
+                etree.SubElement(cell, _q('v')).text = str(value)
+
+        return etree.tostring(root, xml_declaration=True, encoding='UTF-8', standalone=True)
+
+    @staticmethod
+    def _patch_workbook(workbook_xml: bytes) -> bytes:
+        """设置打开工作簿时重新计算全部公式（其他单元格中公式的缓存值已过期）"""
+        root = etree.fromstring(workbook_xml)
+        calc_pr = root.find(_q('calcPr'))
+        if calc_pr is None:
+            calc_pr = etree.Element(_q('calcPr'))
+            anchor = None
+            for tag in _BEFORE_CALC_PR:
+                found = root.find(_q(tag))
+                if found is not None:
+                    anchor = found
+            if anchor is None:
+                raise PatchNotApplicable("工作簿缺少 sheets")
+            anchor.addnext(calc_pr)
+        calc_pr.set('fullCalcOnLoad', '1')
+        return etree.tostring(root, xml_declaration=True, encoding='UTF-8', standalone=True)
+
+    def write_column(self, col: int, start_row: int, values: Sequence[Optional[float]]) -> None:
+        """
+        将数值写入指定列（None 表示清空单元格的值, 保留单元格样式）
+
+        先写入同一文件夹中的临时文件再替换原文件, 写入失败时原文件保持不变
+
+        Raises:
+            PatchNotApplicable: 工作簿结构不适合直接修改
+            OSError: 文件读写失败（例如文件被其他程序锁定）
+        """
+        dates = self._load_index()
+        with zipfile.ZipFile(self.path) as source:
+            sheet_entry = self._sheet_entry(source)
+            patched = {
+                sheet_entry: self._patch_sheet(source.read(sheet_entry), col, start_row, values),
+                'xl/workbook.xml': self._patch_workbook(source.read('xl/workbook.xml')),
+            }
+            temp_path, target = atomic_zip_writer(self.path)
+            try:
+                with target:
+                    for info in source.infolist():
+                        data = patched.get(info.filename)
+                        target.writestr(info, data if data is not None else source.read(info))
+                os.replace(temp_path, self.path)
+            except BaseException:
+                if os.path.exists(temp_path):
+                    os.remove(temp_path)
+                raise
+        # 第1行未改动, 沿用已有的日期索引并更新工作簿状态
+        if dates is not None:
+            self._save_index(dates)
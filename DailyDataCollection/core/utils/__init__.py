@@ -3,6 +3,7 @@
 
 包含系统中使用的各种工具函数：
 - 文件搜索工具
+- 文件名索引
 - 路径处理工具
 - 数据转换工具
 - 匹配器模块 (matcher)
@@ -16,12 +17,25 @@ except ImportError:
 try:
     from .file_utils import (
         list_fullpath_of_files_with_keywords,
-        find_files_with_max_number
+        find_files_with_max_number,
+        compute_file_hash,
+        files_differ
     )
+    from .file_index import FileNameIndex, get_file_index, notify_file_created
+    from .file_index_store import FileIndexStore
+    from .hash_cache import FileHashCache, get_hash_cache
 
     __all__ = [
         'list_fullpath_of_files_with_keywords',
-        'find_files_with_max_number'
+        'find_files_with_max_number',
+        'compute_file_hash',
+        'files_differ',
+        'FileNameIndex',
+        'get_file_index',
+        'notify_file_created',
+        'FileIndexStore',
+        'FileHashCache',
+        'get_hash_cache'
     ]
 except ImportError as e:
     print(f"导入工具函数模块时出错: {e}")
@@ -0,0 +1,183 @@
+"""
+目录快照与变化日志
+
+- DirectorySnapshot: 记录目录树中候选文件的 (大小, 修改时间), 每次扫描只重新列出修改时间变化的目录,
+  返回新增或发生变化的文件; 用于文件系统事件不可靠（网络共享、同步文件夹、部分容器）时的轮询监控
+- ChangeJournal: 保存已处理文件的 (大小, 修改时间) 和目录快照, 程序重启后据此继续监控,
+  停止期间新增的文件会被补充处理, 已处理过的文件不再重复处理
+"""
+
+import os
+import json
+import logging
+import threading
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+logger = logging.getLogger('Directory Snapshot')
+logger.setLevel(logging.ERROR)
+
+# 目录路径 -> (修改时间, {文件名: (文件大小, 修改时间)}, 子目录名称列表)
+SnapshotState = Dict[str, Tuple[int, Dict[str, Tuple[int, int]], List[str]]]
+
+
+class DirectorySnapshot:
+    """
+    目录树快照
+
+    只收录文件名以 suffixes 中任一后缀结尾（不区分大小写）的文件。
+    目录的修改时间只在其中的文件被创建、删除或重命名时变化, 因此原地追加写入的文件不会在扫描中再次出现,
+    写入是否完成由调用方（如 EventPipeline）检查
+    """
+
+    def __init__(self, root: str, suffixes: Iterable[str] = ('.kmz',)):
+        self.root = os.path.normpath(root)
+        self.suffixes: Tuple[str, ...] = tuple(s.lower() for s in suffixes)
+        self._dirs: SnapshotState = {}
+        self._lock = threading.Lock()
+
+    def _list_directory(self, path: str) -> Tuple[Dict[str, Tuple[int, int]], List[str]]:
+        files: Dict[str, Tuple[int, int]] = {}
+        subdirs: List[str] = []
+        try:
+            with os.scandir(path) as iterator:
+                for item in iterator:
+                    try:
+                        if item.is_dir(follow_symlinks=False):
+                            subdirs.append(item.name)
+                        elif item.name.lower().endswith(self.suffixes):
+                            item_stat = item.stat(follow_symlinks=False)
+                            files[item.name] = (item_stat.st_size, item_stat.st_mtime_ns)
+                    except OSError:
+                        continue
+        except OSError as e:
+            logger.warning(f"无法读取目录 {path}: {e}")
+        return files, subdirs
+
+    def scan(self) -> List[str]:
+        """
+        增量扫描目录树
+
+        Returns:
+            与上一次扫描相比新增或大小、修改时间发生变化的文件路径（首次扫描时为全部文件）
+        """
+        with self._lock:
+            changed_files: List[str] = []
+            seen: Set[str] = set()
+            stack = [self.root] if os.path.isdir(self.root) else []
+            while stack:
+                path = stack.pop()
+                try:
+                    mtime_ns = os.stat(path).st_mtime_ns
+                except OSError:
+                    continue
+                seen.add(path)
+                previous = self._dirs.get(path)
+                if previous is None or previous[0] != mtime_ns:
+                    files, subdirs = self._list_directory(path)
+                    old_files = previous[1] if previous is not None else {}
+                    changed_files.extend(
+                        os.path.join(path, name) for name, signature in files.items()
+                        if old_files.get(name) != signature
+                    )
+                    self._dirs[path] = (mtime_ns, files, subdirs)
+                else:
+                    subdirs = previous[2]
+                stack.extend(os.path.join(path, name) for name in subdirs)
+
+            for path in [p for p in self._dirs if p not in seen]:
+                del self._dirs[path]
+            return changed_files
+
+    def get_state(self) -> SnapshotState:
+        """获取可序列化的快照内容"""
+        with self._lock:
+            return {path: (mtime_ns, dict(files), list(subdirs))
+                    for path, (mtime_ns, files, subdirs) in self._dirs.items()}
+
+    def set_state(self, state: SnapshotState) -> None:
+        """载入之前保存的快照内容, 之后的扫描只返回相对于该快照的变化"""
+        with self._lock:
+            self._dirs = {
+                path: (int(mtime_ns), {name: tuple(signature) for name, signature in files.items()}, list(subdirs))
+                for path, (mtime_ns, files, subdirs) in state.items()
+            }
+
+
+class ChangeJournal:
+    """
+    监控变化日志
+
+    以 JSON 文件保存监控根目录、目录快照和已处理文件的 (大小, 修改时间), 写入时先写临时文件再原子替换
+    """
+
+    FORMAT_VERSION = 1
+
+    def __init__(self, journal_path: str, root: str):
+        self.journal_path = journal_path
+        self.root = os.path.normpath(root)
+        self._processed: Dict[str, Tuple[int, int]] = {}
+        self._snapshot: SnapshotState = {}
+        self._lock = threading.Lock()
+        self._load()
+
+    def _load(self) -> None:
+        try:
+            with open(self.journal_path, 'r', encoding='utf-8') as file:
+                data = json.load(file)
+        except (OSError, ValueError):
+            return
+        if data.get('version') != self.FORMAT_VERSION or data.get('root') != self.root:
+            return
+        self._processed = {path: tuple(signature) for path, signature in data.get('processed', {}).items()}
+        self._snapshot = data.get('snapshot', {})
+
+    @property
+    def snapshot(self) -> SnapshotState:
+        """上一次保存的目录快照, 没有时为空字典"""
+        return self._snapshot
+
+    @staticmethod
+    def _signature(path: str) -> Optional[Tuple[int, int]]:
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return None
+        return stat.st_size, stat.st_mtime_ns
+
+    def is_processed(self, path: str) -> bool:
+        """文件是否已处理过且之后没有变化"""
+        signature = self._signature(path)
+        with self._lock:
+            return signature is not None and self._processed.get(os.path.normpath(path)) == signature
+
+    def record(self, path: str) -> None:
+        """记录文件已处理并保存日志"""
+        signature = self._signature(path)
+        if signature is None:
+            return
+        with self._lock:
+            self._processed[os.path.normpath(path)] = signature
+            self._save()
+
+    def update_snapshot(self, snapshot: SnapshotState) -> None:
+        """保存最新的目录快照"""
+        with self._lock:
+            self._snapshot = snapshot
+            self._save()
+
+    def _save(self) -> None:
+        """写入日志文件（需持有锁）"""
+        data = {
+            'version': self.FORMAT_VERSION,
+            'root': self.root,
+            'processed': self._processed,
+            'snapshot': self._snapshot,
+        }
+        temp_path = f"{self.journal_path}.{os.getpid()}.tmp"
+        try:
+            os.makedirs(os.path.dirname(self.journal_path) or '.', exist_ok=True)
+            with open(temp_path, 'w', encoding='utf-8') as file:
+                json.dump(data, file, ensure_ascii=False)
+            os.replace(temp_path, self.journal_path)
+        except OSError as e:
+            logger.warning(f"保存监控日志失败 {self.journal_path}: {e}")
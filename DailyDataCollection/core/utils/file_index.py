@@ -0,0 +1,334 @@
+"""
+文件名索引模块
+
+对大型目录（如微信聊天记录文件夹）建立内存中的文件名索引:
+- 使用 os.scandir 遍历目录, 只在目录的修改时间变化时重新列出该目录
+- 按文件名中的8位数字（日期）建立倒排表, 关键字查询无需再次遍历目录
+- 可选地将索引持久化到磁盘（见 file_index_store）, 跨多次运行增量更新
+"""
+
+import os
+import re
+import time
+import logging
+import threading
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from .file_index_store import FileIndexStore, parse_kmz_name_tokens
+
+logger = logging.getLogger('File Index')
+logger.setLevel(logging.ERROR)
+
+# 文件名中的连续数字, 用于提取日期形式的8位数字子串
+_DIGITS_RE = re.compile(r'\d{8,}')
+_DATE_KEYWORD_RE = re.compile(r'\d{8}')
+
+# 索引的默认有效期（秒）, 超过有效期的查询会先增量刷新索引
+DEFAULT_MAX_AGE = 60.0
+
+
+@dataclass
+class _DirectoryEntry:
+    """单个目录的索引记录"""
+    mtime_ns: int
+    # 文件名 -> (文件大小, 修改时间)
+    files: Dict[str, Tuple[int, int]] = field(default_factory=dict)
+    subdirs: List[str] = field(default_factory=list)
+
+
+def _date_tokens(name: str) -> Set[str]:
+    """提取文件名中所有长度为8的数字子串"""
+    tokens = set()
+    for match in _DIGITS_RE.finditer(name):
+        digits = match.group()
+        for start in range(len(digits) - 7):
+            tokens.add(digits[start:start + 8])
+    return tokens
+
+
+class FileNameIndex:
+    """
+    目录文件名索引
+
+    只收录文件名包含 name_filter 中任一字符串（不区分大小写）的文件,
+    查询语义与 list_fullpath_of_files_with_keywords 相同: 返回文件名包含所有关键字的文件
+    """
+
+    def __init__(self, root: str, name_filter: Iterable[str] = ('.kmz',), max_age: float = DEFAULT_MAX_AGE,
+                 store: Optional[FileIndexStore] = None):
+        self.root = os.path.normpath(root) if root else root
+        self.name_filter: Tuple[str, ...] = tuple(f.lower() for f in name_filter)
+        self.max_age = max_age
+        self.store = store
+
+        self._dirs: Dict[str, _DirectoryEntry] = {}
+        # 文件全路径 -> 小写文件名
+        self._names: Dict[str, str] = {}
+        # 8位数字子串 -> 文件全路径集合
+        self._by_date: Dict[str, Set[str]] = {}
+        # 标准命名文件的 (图幅名称小写, 文件类型, 日期) -> 文件全路径集合
+        self._by_tokens: Dict[Tuple[str, str, str], Set[str]] = {}
+        self._last_refresh: Optional[float] = None
+        self._lock = threading.RLock()
+
+        if self.store is not None and self.root:
+            self._load_from_store()
+
+    def _load_from_store(self) -> None:
+        """从持久化存储中载入上一次运行时的索引"""
+        try:
+            directories = self.store.load(self.root)
+        except Exception as e:
+            logger.warning(f"载入文件索引失败, 将重新遍历目录: {e}")
+            return
+        with self._lock:
+            for path, (mtime_ns, files, subdirs) in directories.items():
+                self._replace_directory(path, _DirectoryEntry(mtime_ns, files, subdirs))
+        logger.info(f"已从磁盘载入文件索引: {self.root}, 共{len(self._names)}个文件")
+
+    def _accept(self, name_lower: str) -> bool:
+        """判断文件名是否需要收录"""
+        return not self.name_filter or any(f in name_lower for f in self.name_filter)
+
+    def _index_file(self, path: str) -> None:
+        name_lower = os.path.basename(path).lower()
+        self._names[path] = name_lower
+        for token in _date_tokens(name_lower):
+            self._by_date.setdefault(token, set()).add(path)
+        tokens = parse_kmz_name_tokens(name_lower)
+        if tokens[1] is not None:
+            self._by_tokens.setdefault(tokens, set()).add(path)
+
+    def _unindex_file(self, path: str) -> None:
+        name_lower = self._names.pop(path, None)
+        if name_lower is None:
+            return
+        for token in _date_tokens(name_lower):
+            paths = self._by_date.get(token)
+            if paths is not None:
+                paths.discard(path)
+                if not paths:
+                    del self._by_date[token]
+        tokens = parse_kmz_name_tokens(name_lower)
+        paths = self._by_tokens.get(tokens)
+        if paths is not None:
+            paths.discard(path)
+            if not paths:
+                del self._by_tokens[tokens]
+
+    def _list_directory(self, path: str, mtime_ns: int) -> _DirectoryEntry:
+        """列出目录内容, 返回新的目录记录"""
+        entry = _DirectoryEntry(mtime_ns=mtime_ns)
+        try:
+            with os.scandir(path) as iterator:
+                for item in iterator:
+                    try:
+                        if item.is_dir(follow_symlinks=False):
+                            entry.subdirs.append(item.name)
+                        elif self._accept(item.name.lower()):
+                            item_stat = item.stat(follow_symlinks=False)
+                            entry.files[item.name] = (item_stat.st_size, item_stat.st_mtime_ns)
+                    except OSError:
+                        continue
+        except OSError as e:
+            logger.warning(f"无法读取目录 {path}: {e}")
+        return entry
+
+    def _replace_directory(self, path: str, entry: Optional[_DirectoryEntry]) -> None:
+        """用新的目录记录替换旧记录, 并同步更新文件索引"""
+        old = self._dirs.get(path)
+        if old is not None:
+            for name in old.files:
+                self._unindex_file(os.path.join(path, name))
+        if entry is None:
+            self._dirs.pop(path, None)
+            return
+        self._dirs[path] = entry
+        for name in entry.files:
+            self._index_file(os.path.join(path, name))
+
+    def refresh(self) -> int:
+        """
+        增量刷新索引
+
+        逐级检查目录的修改时间, 未变化的目录直接沿用已有记录, 只重新列出发生变化的目录
+
+        Returns:
+            重新列出的目录数量
+        """
+        with self._lock:
+            changed: Dict[str, _DirectoryEntry] = {}
+            seen: Set[str] = set()
+            stack = [self.root] if self.root and os.path.isdir(self.root) else []
+            while stack:
+                path = stack.pop()
+                try:
+                    mtime_ns = os.stat(path).st_mtime_ns
+                except OSError:
+                    continue
+                seen.add(path)
+                entry = self._dirs.get(path)
+                if entry is None or entry.mtime_ns != mtime_ns:
+                    entry = self._list_directory(path, mtime_ns)
+                    self._replace_directory(path, entry)
+                    changed[path] = entry
+                stack.extend(os.path.join(path, name) for name in entry.subdirs)
+
+            # 移除已被删除的目录
+            removed = [p for p in self._dirs if p not in seen]
+            for path in removed:
+                self._replace_directory(path, None)
+
+            if self.store is not None and (changed or removed):
+                self.store.save(
+                    self.root,
+                    {path: (e.mtime_ns, e.files, e.subdirs) for path, e in changed.items()},
+                    removed
+                )
+
+            self._last_refresh = time.monotonic()
+            logger.info(f"文件索引已刷新: {self.root}, 重新列出{len(changed)}个目录, 共{len(self._names)}个文件")
+            return len(changed)
+
+    def invalidate(self) -> None:
+        """使索引过期, 下一次查询时重新刷新"""
+        with self._lock:
+            self._last_refresh = None
+
+    def _ensure_fresh(self) -> None:
+        with self._lock:
+            if self._last_refresh is None or time.monotonic() - self._last_refresh > self.max_age:
+                self.refresh()
+
+    def add_file(self, path: str) -> bool:
+        """
+        将新出现的文件加入索引（如文件监控收到创建事件时）, 无需等待下一次刷新
+
+        Returns:
+            文件是否位于索引根目录下并被收录
+        """
+        path = os.path.normpath(path)
+        directory, name = os.path.split(path)
+        try:
+            if not self.root or os.path.commonpath([self.root, directory]) != self.root:
+                return False
+        except ValueError:
+            # 位于不同驱动器上的路径
+            return False
+        if not self._accept(name.lower()):
+            return False
+        with self._lock:
+            entry = self._dirs.get(directory)
+            if entry is None:
+                # 目录尚未被索引, 交由下一次刷新处理
+                self._last_refresh = None
+                return True
+            if name not in entry.files:
+                try:
+                    file_stat = os.stat(path)
+                except OSError:
+                    return False
+                entry.files[name] = (file_stat.st_size, file_stat.st_mtime_ns)
+                self._index_file(path)
+            return True
+
+    def search(self, keywords: List[str]) -> List[str]:
+        """
+        返回文件名包含所有关键字（不区分大小写）的文件全路径
+
+        Args:
+            keywords: 关键字列表
+
+        Returns:
+            匹配的文件路径列表
+        """
+        self._ensure_fresh()
+        keywords_lower = [keyword.lower() for keyword in keywords]
+        with self._lock:
+            date_keywords = [k for k in keywords_lower if _DATE_KEYWORD_RE.fullmatch(k)]
+            if date_keywords:
+                candidates = set(self._by_date.get(date_keywords[0], ()))
+                for keyword in date_keywords[1:]:
+                    candidates &= self._by_date.get(keyword, set())
+            else:
+                candidates = self._names.keys()
+            return sorted(
+                path for path in candidates
+                if all(keyword in self._names[path] for keyword in keywords_lower)
+            )
+
+    def find(self, mapsheet: Optional[str] = None, date: Optional[str] = None,
+             kind: Optional[str] = None) -> List[str]:
+        """
+        按文件名解析出的 (图幅名称, 日期, 文件类型) 查找标准命名的KMZ文件
+
+        文件名在收录时解析一次, 三项都指定时直接查表, 无需逐个比较文件名
+
+        Args:
+            mapsheet: 图幅文件名称
+            date: 日期字符串 YYYYMMDD
+            kind: 文件类型, 'finished_points_and_tracks' 或 'plan_routes'
+
+        Returns:
+            匹配的文件路径列表
+        """
+        self._ensure_fresh()
+        mapsheet_lower = mapsheet.lower() if mapsheet else None
+        with self._lock:
+            if mapsheet_lower and kind and date:
+                return sorted(self._by_tokens.get((mapsheet_lower, kind, date), ()))
+            results = []
+            for (file_mapsheet, file_kind, file_date), paths in self._by_tokens.items():
+                if ((mapsheet_lower is None or file_mapsheet == mapsheet_lower) and
+                        (date is None or file_date == date) and
+                        (kind is None or file_kind == kind)):
+                    results.extend(paths)
+            return sorted(results)
+
+    def __len__(self) -> int:
+        return len(self._names)
+
+
+# 进程内共享的索引实例, 键为 (根目录, 文件名过滤条件)
+_indexes: Dict[Tuple[str, Tuple[str, ...]], FileNameIndex] = {}
+_indexes_lock = threading.Lock()
+
+
+def get_file_index(root: str, name_filter: Iterable[str] = ('.kmz',)) -> FileNameIndex:
+    """
+    获取指定目录的共享文件名索引, 同一进程中对同一目录只遍历一次;
+    启用持久化时, 索引会在多次运行之间保存在缓存目录中
+
+    Args:
+        root: 索引根目录
+        name_filter: 只收录文件名包含其中任一字符串的文件
+
+    Returns:
+        文件名索引实例
+    """
+    key = (os.path.normpath(root) if root else root, tuple(f.lower() for f in name_filter))
+    with _indexes_lock:
+        index = _indexes.get(key)
+        if index is None:
+            max_age = DEFAULT_MAX_AGE
+            store = None
+            try:
+                from config.config_manager import ConfigManager
+                config_manager = ConfigManager()
+                max_age = config_manager.get('performance.file_index.max_age_seconds', DEFAULT_MAX_AGE)
+                if config_manager.get('performance.file_index.persistent', True):
+                    store = FileIndexStore(config_manager.get_cache_directory())
+            except Exception as e:
+                logger.warning(f"无法使用持久化文件索引: {e}")
+            index = FileNameIndex(key[0], key[1], max_age=max_age, store=store)
+            _indexes[key] = index
+        return index
+
+
+def notify_file_created(path: str) -> None:
+    """通知所有已创建的索引有新文件出现"""
+    with _indexes_lock:
+        indexes = list(_indexes.values())
+    for index in indexes:
+        index.add_file(path)
@@ -0,0 +1,143 @@
+"""
+文件名索引的持久化存储
+
+将 FileNameIndex 的目录记录和候选文件信息保存到SQLite文件中, 程序再次启动时直接载入,
+只需检查目录修改时间并重新列出发生变化的目录, 无需冷启动遍历整个微信文件夹
+"""
+
+import os
+import re
+import json
+import sqlite3
+import logging
+import threading
+from typing import Dict, Iterable, Optional, Tuple
+
+logger = logging.getLogger('File Index Store')
+logger.setLevel(logging.ERROR)
+
+# 从文件名中解析 (图幅名称, 文件类型, 日期)
+_KMZ_NAME_RE = re.compile(r'^(?P<mapsheet>.+?)_(?P<kind>finished_points_and_tracks|plan_routes)_(?P<date>\d{8})')
+
+
+def parse_kmz_name_tokens(name: str) -> Tuple[Optional[str], Optional[str], Optional[str]]:
+    """
+    解析KMZ文件名中的图幅名称、文件类型和日期
+
+    Args:
+        name: 文件名
+
+    Returns:
+        (图幅名称小写, 文件类型, 日期字符串), 无法解析的部分为None
+    """
+    match = _KMZ_NAME_RE.match(name.lower())
+    if not match:
+        return None, None, None
+    return match.group('mapsheet'), match.group('kind'), match.group('date')
+
+
+class FileIndexStore:
+    """
+    文件名索引的SQLite存储
+
+    - dirs: 目录路径、修改时间及子目录列表
+    - files: 候选文件的路径、大小、修改时间及解析出的 (图幅, 日期, 类型)
+    """
+
+    FORMAT_VERSION = 1
+    DB_FILENAME = 'file_index.sqlite'
+
+    def __init__(self, cache_dir: str):
+        self.db_path = os.path.join(cache_dir, self.DB_FILENAME)
+        os.makedirs(cache_dir, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.db_path, timeout=10, check_same_thread=False)
+        self._setup()
+
+    def _setup(self) -> None:
+        """初始化数据表, 版本不一致时清空旧索引"""
+        with self._lock:
+            version = self._conn.execute('PRAGMA user_version').fetchone()[0]
+            if version != self.FORMAT_VERSION:
+                self._conn.execute('DROP TABLE IF EXISTS dirs')
+                self._conn.execute('DROP TABLE IF EXISTS files')
+                self._conn.execute(f'PRAGMA user_version = {self.FORMAT_VERSION}')
+            self._conn.execute(
+                'CREATE TABLE IF NOT EXISTS dirs ('
+                'root TEXT NOT NULL, path TEXT NOT NULL, mtime_ns INTEGER NOT NULL, '
+                'subdirs TEXT NOT NULL, PRIMARY KEY (root, path))'
+            )
+            self._conn.execute(
+                'CREATE TABLE IF NOT EXISTS files ('
+                'root TEXT NOT NULL, path TEXT NOT NULL, dir TEXT NOT NULL, '
+                'size INTEGER NOT NULL, mtime_ns INTEGER NOT NULL, '
+                'mapsheet TEXT, date TEXT, kind TEXT, PRIMARY KEY (root, path))'
+            )
+            self._conn.execute('CREATE INDEX IF NOT EXISTS files_by_dir ON files (root, dir)')
+            self._conn.execute('CREATE INDEX IF NOT EXISTS files_by_date ON files (root, date)')
+            self._conn.commit()
+
+    def load(self, root: str) -> Dict[str, Tuple[int, Dict[str, Tuple[int, int]], list]]:
+        """
+        载入指定根目录的索引
+
+        Returns:
+            目录路径 -> (修改时间, {文件名: (大小, 修改时间)}, 子目录名列表)
+        """
+        with self._lock:
+            directories = {
+                path: (mtime_ns, {}, json.loads(subdirs))
+                for path, mtime_ns, subdirs in self._conn.execute(
+                    'SELECT path, mtime_ns, subdirs FROM dirs WHERE root = ?', (root,)
+                )
+            }
+            for path, directory, size, mtime_ns in self._conn.execute(
+                'SELECT path, dir, size, mtime_ns FROM files WHERE root = ?', (root,)
+            ):
+                if directory in directories:
+                    directories[directory][1][os.path.basename(path)] = (size, mtime_ns)
+        return directories
+
+    def save(self, root: str, changed: Dict[str, Tuple[int, Dict[str, Tuple[int, int]], list]],
+             removed: Iterable[str]) -> None:
+        """
+        保存发生变化的目录记录
+
+        Args:
+            root: 索引根目录
+            changed: 重新列出的目录, 格式同 load 的返回值
+            removed: 已删除的目录路径
+        """
+        with self._lock:
+            try:
+                for path in list(removed) + list(changed):
+                    self._conn.execute('DELETE FROM dirs WHERE root = ? AND path = ?', (root, path))
+                    self._conn.execute('DELETE FROM files WHERE root = ? AND dir = ?', (root, path))
+                for path, (mtime_ns, files, subdirs) in changed.items():
+                    self._conn.execute(
+                        'INSERT INTO dirs (root, path, mtime_ns, subdirs) VALUES (?, ?, ?, ?)',
+                        (root, path, mtime_ns, json.dumps(subdirs))
+                    )
+                    self._conn.executemany(
+                        'INSERT INTO files (root, path, dir, size, mtime_ns, mapsheet, date, kind) '
+                        'VALUES (?, ?, ?, ?, ?, ?, ?, ?)',
+                        [
+                            (root, os.path.join(path, name), path, size, file_mtime_ns,
+                             *self._tokens_for_row(name))
+                            for name, (size, file_mtime_ns) in files.items()
+                        ]
+                    )
+                self._conn.commit()
+            except sqlite3.Error as e:
+                self._conn.rollback()
+                logger.warning(f"保存文件索引失败: {e}")
+
+    @staticmethod
+    def _tokens_for_row(name: str) -> Tuple[Optional[str], Optional[str], Optional[str]]:
+        mapsheet, kind, date = parse_kmz_name_tokens(name)
+        return mapsheet, date, kind
+
+    def close(self) -> None:
+        """关闭数据库连接"""
+        with self._lock:
+            self._conn.close()
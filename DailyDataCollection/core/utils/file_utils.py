@@ -6,7 +6,11 @@
 
 import os
 import re
-from typing import List, Dict, Tuple
+import hashlib
+from typing import Callable, List, Dict, Optional, Tuple
+
+# 分块读取文件时的块大小
+HASH_CHUNK_SIZE = 1024 * 1024
 
 
 def list_fullpath_of_files_with_keywords(directory: str, keywords: List[str]) -> List[str]:
@@ -62,3 +66,51 @@ def find_files_with_max_number(directory: str) -> Dict[str, Tuple[str, int]]:
     files_dict = {base_name: (file_path, number) for base_name, (file_path, number) in files_dict.items() if number != -1}
     # 输出包含相同基础文件名中括号内数字最大的文件
     return files_dict
+
+
+def compute_file_hash(filepath: str, algorithm: str = 'md5', chunk_size: int = HASH_CHUNK_SIZE) -> str:
+    """
+    分块计算文件的哈希值，不会将整个文件读入内存
+    
+    Args:
+        filepath: 文件路径
+        algorithm: 哈希算法名称, 如 'md5', 'sha256'
+        chunk_size: 每次读取的字节数
+        
+    Returns:
+        十六进制格式的哈希值
+    """
+    hasher = hashlib.new(algorithm)
+    with open(filepath, 'rb') as file:
+        for chunk in iter(lambda: file.read(chunk_size), b''):
+            hasher.update(chunk)
+    return hasher.hexdigest()
+
+
+def files_differ(file1: str, file2: str, algorithm: str = 'md5',
+                 hash_func: Optional[Callable[[str], Optional[str]]] = None) -> bool:
+    """
+    判断两个文件的内容是否不同
+    
+    先比较文件大小（只需一次 stat）, 大小不同即可判定不同; 大小相同时再分块计算哈希比较
+    
+    Args:
+        file1: 第一个文件路径
+        file2: 第二个文件路径
+        algorithm: 哈希算法名称（未指定 hash_func 时使用）
+        hash_func: 获取文件哈希值的函数（如带缓存的实现）, 返回 None 表示无法获取, 此时视为不同
+        
+    Returns:
+        内容不同返回 True, 相同返回 False
+    """
+    stat1 = os.stat(file1)
+    stat2 = os.stat(file2)
+    if stat1.st_size != stat2.st_size:
+        return True
+    if os.path.samestat(stat1, stat2):
+        return False
+    if hash_func is None:
+        return compute_file_hash(file1, algorithm) != compute_file_hash(file2, algorithm)
+    hash1 = hash_func(file1)
+    hash2 = hash_func(file2)
+    return hash1 is None or hash2 is None or hash1 != hash2
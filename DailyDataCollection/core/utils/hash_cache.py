@@ -0,0 +1,182 @@
+"""
+文件哈希缓存模块
+
+容量有限的LRU哈希缓存, 以 (文件标识, 大小, 修改时间) 为键, 可持久化到磁盘供下次运行使用
+"""
+
+import os
+import json
+import atexit
+import logging
+import threading
+from collections import OrderedDict
+from typing import Dict, Optional
+
+from .file_utils import compute_file_hash
+
+logger = logging.getLogger('Hash Cache')
+logger.setLevel(logging.ERROR)
+
+DEFAULT_MAX_ENTRIES = 4096
+
+
+class FileHashCache:
+    """
+    文件哈希值的LRU缓存
+
+    键由文件标识（支持时为设备号和inode, 否则为绝对路径）、文件大小和修改时间（纳秒）组成,
+    文件内容变化后键随之变化, 旧记录会按LRU顺序被淘汰
+    """
+
+    FORMAT_VERSION = 1
+    # 新增条目达到该数量时自动保存, 避免长时间运行的监控进程异常退出时丢失缓存
+    SAVE_EVERY = 64
+
+    def __init__(self, max_entries: int = DEFAULT_MAX_ENTRIES, persist_path: Optional[str] = None):
+        self.max_entries = max_entries
+        self.persist_path = persist_path
+        self._entries: 'OrderedDict[str, str]' = OrderedDict()
+        self._lock = threading.Lock()
+        self._dirty = False
+        self._unsaved = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+        if self.persist_path:
+            self.load()
+
+    @staticmethod
+    def make_key(filepath: str, algorithm: str = 'md5') -> str:
+        """根据文件状态生成缓存键"""
+        file_stat = os.stat(filepath)
+        if file_stat.st_ino:
+            identity = f"{file_stat.st_dev}:{file_stat.st_ino}"
+        else:
+            identity = os.path.abspath(filepath)
+        return f"{algorithm}|{identity}|{file_stat.st_size}|{file_stat.st_mtime_ns}"
+
+    def get_hash(self, filepath: str, algorithm: str = 'md5') -> str:
+        """
+        获取文件哈希值, 缓存未命中时分块计算并写入缓存
+
+        Args:
+            filepath: 文件路径
+            algorithm: 哈希算法名称
+
+        Returns:
+            十六进制格式的哈希值
+        """
+        key = self.make_key(filepath, algorithm)
+        with self._lock:
+            value = self._entries.get(key)
+            if value is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return value
+            self.misses += 1
+
+        value = compute_file_hash(filepath, algorithm)
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+            self._dirty = True
+            self._unsaved += 1
+            should_save = self.persist_path is not None and self._unsaved >= self.SAVE_EVERY
+        if should_save:
+            self.save()
+        return value
+
+    def load(self) -> None:
+        """从磁盘载入缓存"""
+        if not self.persist_path or not os.path.exists(self.persist_path):
+            return
+        try:
+            with open(self.persist_path, 'r', encoding='utf-8') as file:
+                data = json.load(file)
+            if data.get('version') != self.FORMAT_VERSION:
+                return
+            with self._lock:
+                # 文件中按从旧到新的顺序保存, 只保留最近的 max_entries 条
+                entries = data.get('entries', [])[-self.max_entries:]
+                self._entries = OrderedDict((key, value) for key, value in entries)
+        except (OSError, ValueError) as e:
+            logger.warning(f"载入哈希缓存失败: {e}")
+
+    def save(self) -> None:
+        """将缓存写入磁盘（先写入临时文件再替换, 避免写入中断导致文件损坏）"""
+        if not self.persist_path:
+            return
+        with self._lock:
+            if not self._dirty:
+                return
+            data = {'version': self.FORMAT_VERSION, 'entries': list(self._entries.items())}
+            self._dirty = False
+            self._unsaved = 0
+        temp_path = f"{self.persist_path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            with open(temp_path, 'w', encoding='utf-8') as file:
+                json.dump(data, file)
+            os.replace(temp_path, self.persist_path)
+        except OSError as e:
+            logger.warning(f"保存哈希缓存失败: {e}")
+
+    def clear(self) -> None:
+        """清空缓存及统计信息"""
+        with self._lock:
+            self._entries.clear()
+            self.hits = self.misses = self.evictions = 0
+            self._dirty = True
+
+    def stats(self) -> Dict[str, float]:
+        """
+        获取缓存统计信息
+
+        Returns:
+            包含条目数、命中次数、未命中次数、淘汰次数和命中率的字典
+        """
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                'entries': len(self._entries),
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'hit_rate': self.hits / total if total else 0.0,
+            }
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+_hash_cache: Optional[FileHashCache] = None
+_hash_cache_lock = threading.Lock()
+
+
+def get_hash_cache() -> FileHashCache:
+    """
+    获取进程级的文件哈希缓存, 启用持久化时在程序退出时自动保存
+
+    Returns:
+        文件哈希缓存实例
+    """
+    global _hash_cache
+    with _hash_cache_lock:
+        if _hash_cache is None:
+            max_entries = DEFAULT_MAX_ENTRIES
+            persist_path = None
+            try:
+                from config.config_manager import ConfigManager
+                config_manager = ConfigManager()
+                max_entries = config_manager.get('performance.hash_cache.max_entries', DEFAULT_MAX_ENTRIES)
+                if config_manager.get('performance.hash_cache.persistent', True):
+                    persist_path = os.path.join(config_manager.get_cache_directory(), 'file_hashes.json')
+            except Exception as e:
+                logger.warning(f"无法读取哈希缓存配置, 使用默认设置: {e}")
+            _hash_cache = FileHashCache(max_entries=max_entries, persist_path=persist_path)
+            if persist_path:
+                atexit.register(_hash_cache.save)
+        return _hash_cache
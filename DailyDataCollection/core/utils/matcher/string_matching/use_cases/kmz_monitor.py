@@ -16,6 +16,7 @@ from threading import Event, Lock
 try:
     from .use_cases.kmz_matcher import KMZFileMatcher
     from ..data_models.date_types import DateType
+    from ....directory_snapshot import DirectorySnapshot
 except ImportError:
     # 处理独立运行的情况
     import sys
@@ -25,6 +26,7 @@ except ImportError:
     sys.path.insert(0, parent_dir)
     
     from core.utils.matcher.string_matching.use_cases.kmz_matcher import KMZFileMatcher
+    from core.utils.directory_snapshot import DirectorySnapshot
 
 
 @dataclass
@@ -130,6 +132,10 @@ class KMZFileMonitor:
         self.processed_files: Dict[str, KMZFileInfo] = {}
         self.is_running = False
         self.stop_event = Event()
+        # 目录快照: 每次扫描只重新列出修改时间变化的目录
+        self._snapshot = DirectorySnapshot(config.watch_directory)
+        # 已发现但尚未稳定（仍可能在写入）的文件
+        self._unstable_files: set = set()
         
         # 创建输出目录
         self._setup_directories()
@@ -236,28 +242,28 @@ class KMZFileMonitor:
         current_time = datetime.now()
         
         try:
-            for root, dirs, files in os.walk(self.config.watch_directory):
-                for file in files:
-                    if file.lower().endswith('.kmz'):
-                        file_path = os.path.join(root, file)
-                        
-                        # 检查是否已处理过
-                        if file_path in self.processed_files:
-                            continue
-                        
-                        # 检查文件是否稳定（防止处理正在写入的文件）
-                        try:
-                            stat = os.stat(file_path)
-                            file_age = current_time - datetime.fromtimestamp(stat.st_mtime)
-                            
-                            if file_age.total_seconds() >= self.config.file_stable_time:
-                                new_files.append(file_path)
-                        except OSError:
-                            continue
-        
+            # 只重新列出修改时间变化的目录, 新发现的文件与上次尚未稳定的文件一起检查
+            self._unstable_files.update(self._snapshot.scan())
         except Exception as e:
             self._log(f"扫描文件时发生错误: {e}")
         
+        for file_path in sorted(self._unstable_files):
+            # 检查是否已处理过
+            if file_path in self.processed_files:
+                self._unstable_files.discard(file_path)
+                continue
+            
+            # 检查文件是否稳定（防止处理正在写入的文件）
+            try:
+                stat = os.stat(file_path)
+            except OSError:
+                self._unstable_files.discard(file_path)
+                continue
+            file_age = current_time - datetime.fromtimestamp(stat.st_mtime)
+            if file_age.total_seconds() >= self.config.file_stable_time:
+                new_files.append(file_path)
+                self._unstable_files.discard(file_path)
+        
         return new_files
     
     def _process_kmz_file(self, file_path: str) -> Optional[KMZFileInfo]:
@@ -0,0 +1,188 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+目录快照、变化日志与混合观察者测试
+
+- 增量扫描只返回新增或变化的KMZ文件
+- 变化日志在重启后保留已处理文件和目录快照, 补充扫描只提交停止期间新增的文件
+- 原生事件和轮询扫描发现同一文件时只处理一次（未启用变化日志时也是如此）
+"""
+
+import unittest
+import sys
+import os
+import time
+import tempfile
+from unittest import mock
+
+# 添加项目根目录到Python路径
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.utils.directory_snapshot import ChangeJournal, DirectorySnapshot
+
+
+def _touch(path, data=b'data'):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'wb') as file:
+        file.write(data)
+    return path
+
+
+class SnapshotTestCase(unittest.TestCase):
+    """在临时目录中模拟微信文件夹"""
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.root = os.path.join(self.tmpdir.name, 'WeChat Files')
+        os.makedirs(self.root)
+        self.journal_path = os.path.join(self.tmpdir.name, 'cache', 'monitor_journal.json')
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def _new_file(self, *parts, data=b'data'):
+        """创建新文件; 先等待片刻, 保证所在目录的修改时间发生变化"""
+        time.sleep(0.05)
+        return _touch(os.path.join(self.root, *parts), data)
+
+
+class TestDirectorySnapshot(SnapshotTestCase):
+    """测试目录快照的增量扫描"""
+
+    def test_scan_reports_new_and_changed_files(self):
+        """测试首次扫描返回全部KMZ文件, 之后只返回新增的文件"""
+        first = _touch(os.path.join(self.root, '2025-08', 'A_finished_points_and_tracks_20250830.kmz'))
+        _touch(os.path.join(self.root, '2025-08', 'notes.txt'))
+        snapshot = DirectorySnapshot(self.root)
+
+        self.assertEqual(snapshot.scan(), [first])
+        self.assertEqual(snapshot.scan(), [])
+
+        second = self._new_file('2025-08', 'B_plan_routes_20250901.KMZ')
+        third = self._new_file('2025-09', 'C_finished_points_and_tracks_20250901.kmz')
+        self.assertEqual(sorted(snapshot.scan()), sorted([second, third]))
+        self.assertEqual(snapshot.scan(), [])
+
+    def test_state_round_trip(self):
+        """测试载入保存的快照后只返回相对于快照的变化"""
+        existing = _touch(os.path.join(self.root, '2025-08', 'A_finished_points_and_tracks_20250830.kmz'))
+        snapshot = DirectorySnapshot(self.root)
+        snapshot.scan()
+
+        restored = DirectorySnapshot(self.root)
+        restored.set_state(snapshot.get_state())
+        added = self._new_file('2025-08', 'B_finished_points_and_tracks_20250830.kmz')
+        self.assertEqual(restored.scan(), [added])
+        self.assertNotIn(existing, restored.scan())
+
+
+class TestChangeJournal(SnapshotTestCase):
+    """测试变化日志的持久化"""
+
+    def test_processed_files_survive_restart(self):
+        """测试重新打开日志后已处理文件和快照仍然有效"""
+        path = _touch(os.path.join(self.root, 'A_finished_points_and_tracks_20250830.kmz'))
+        journal = ChangeJournal(self.journal_path, self.root)
+        self.assertFalse(journal.is_processed(path))
+        journal.record(path)
+        journal.update_snapshot({'dir': (1, {}, [])})
+
+        reopened = ChangeJournal(self.journal_path, self.root)
+        self.assertTrue(reopened.is_processed(path))
+        self.assertEqual(list(reopened.snapshot), ['dir'])
+
+        # 文件内容变化后需要重新处理
+        time.sleep(0.05)
+        _touch(path, b'changed data')
+        self.assertFalse(reopened.is_processed(path))
+
+    def test_other_root_is_ignored(self):
+        """测试监控根目录不同时不使用日志内容"""
+        path = _touch(os.path.join(self.root, 'A_finished_points_and_tracks_20250830.kmz'))
+        ChangeJournal(self.journal_path, self.root).record(path)
+        other = ChangeJournal(self.journal_path, os.path.join(self.tmpdir.name, 'other'))
+        self.assertFalse(other.is_processed(path))
+        self.assertEqual(other.snapshot, {})
+
+
+class TestHybridObserverCatchUp(SnapshotTestCase):
+    """测试重启后的补充扫描"""
+
+    def _run_observer(self, journal):
+        from core.monitor.hybrid_observer import HybridObserver
+
+        handler = mock.Mock()
+        observer = HybridObserver(handler, self.root, mode='polling', poll_interval=60, journal=journal)
+        observer.start()
+        observer.stop()
+        observer.join(5)
+        return [call.args[0] for call in handler.submit.call_args_list]
+
+    def test_restart_submits_only_new_files(self):
+        """测试重启后只提交停止期间新增的文件"""
+        _touch(os.path.join(self.root, '2025-08', 'A_finished_points_and_tracks_20250830.kmz'))
+
+        # 首次启动没有快照, 只建立基准
+        self.assertEqual(self._run_observer(ChangeJournal(self.journal_path, self.root)), [])
+
+        # 停止期间新增的文件
+        added = self._new_file('2025-08', 'B_finished_points_and_tracks_20250831.kmz')
+        self.assertEqual(self._run_observer(ChangeJournal(self.journal_path, self.root)), [added])
+
+        # 再次重启时没有新文件
+        self.assertEqual(self._run_observer(ChangeJournal(self.journal_path, self.root)), [])
+
+    def test_without_journal_only_builds_baseline(self):
+        """测试未启用变化日志时启动只建立基准, 不提交已有文件"""
+        _touch(os.path.join(self.root, 'A_finished_points_and_tracks_20250830.kmz'))
+        self.assertEqual(self._run_observer(None), [])
+
+
+class TestEventHandlerDeduplication(SnapshotTestCase):
+    """测试同一文件版本只处理一次"""
+
+    def setUp(self):
+        super().setUp()
+        from core.monitor import event_handler
+
+        for name in ('MonitorMapSheetCollection', 'KMZFileValidator'):
+            patcher = mock.patch.object(event_handler, name)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        self.handler = event_handler.FileEventHandler(current_date=None)
+        self.process = mock.Mock()
+        self.handler._process_file = self.process
+
+    def test_native_event_and_poll_without_journal(self):
+        """测试未启用变化日志时, 原生事件和轮询扫描发现的同一文件只处理一次"""
+        path = _touch(os.path.join(self.root, 'A_finished_points_and_tracks_20250830.kmz'))
+        self.assertIsNone(self.handler.journal)
+
+        self.handler.process_file(path)
+        self.handler.process_file(os.path.join(self.root, '.', os.path.basename(path)))
+        self.assertEqual(self.process.call_count, 1)
+
+        # 文件再次写入后重新处理
+        time.sleep(0.05)
+        _touch(path, b'newer data')
+        self.handler.process_file(path)
+        self.assertEqual(self.process.call_count, 2)
+
+    def test_journal_skips_files_processed_before_restart(self):
+        """测试变化日志中已处理且未变化的文件不再处理"""
+        path = _touch(os.path.join(self.root, 'A_finished_points_and_tracks_20250830.kmz'))
+        journal = ChangeJournal(self.journal_path, self.root)
+        journal.record(path)
+        self.handler.journal = journal
+
+        self.handler.process_file(path)
+        self.process.assert_not_called()
+
+    def test_missing_file_is_skipped(self):
+        """测试处理前已不存在的文件被跳过"""
+        self.handler.process_file(os.path.join(self.root, 'missing.kmz'))
+        self.process.assert_not_called()
+
+
+if __name__ == '__main__':
+    unittest.main()
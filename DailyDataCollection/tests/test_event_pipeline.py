@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+文件事件处理管道测试
+
+- 写入尚未完成（大小或修改时间仍在变化）的文件不会交给处理函数
+- 同一文件的多次事件合并为一次处理
+"""
+
+import unittest
+import sys
+import os
+import time
+import zipfile
+import tempfile
+import threading
+
+# 添加项目根目录到Python路径
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.monitor.event_pipeline import EventPipeline
+
+DEBOUNCE_SECONDS = 0.15
+
+
+class TestEventPipeline(unittest.TestCase):
+    """测试防抖、合并的文件事件处理管道"""
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.calls = []
+        self.calls_lock = threading.Lock()
+        self.pipeline = EventPipeline(self._handle, debounce_seconds=DEBOUNCE_SECONDS, max_workers=2)
+        self.pipeline.start()
+
+    def tearDown(self):
+        self.pipeline.stop()
+        self.tmpdir.cleanup()
+
+    def _handle(self, path):
+        """记录处理时的文件路径和文件大小"""
+        with self.calls_lock:
+            self.calls.append((path, os.path.getsize(path)))
+
+    def _path(self, name):
+        return os.path.join(self.tmpdir.name, name)
+
+    def test_partial_write_waits_until_stable(self):
+        """测试文件分块写入期间（没有新的事件）不会被处理, 大小和修改时间不再变化后才处理"""
+        path = self._path('points.txt')
+        chunk = b'x' * 1024
+        with open(path, 'wb') as file:
+            file.write(chunk)
+            file.flush()
+            self.pipeline.submit(path)
+            # 写入间隔短于防抖时间, 每次检查时文件都已变化
+            for _ in range(6):
+                time.sleep(DEBOUNCE_SECONDS / 2)
+                file.write(chunk)
+                file.flush()
+                with self.calls_lock:
+                    self.assertEqual(self.calls, [])
+
+        self.assertTrue(self.pipeline.wait_idle(timeout=10))
+        self.assertEqual(self.calls, [(path, len(chunk) * 7)])
+
+    def test_incomplete_kmz_is_not_handed_off(self):
+        """测试压缩包目录不完整的KMZ文件不会被处理, 写入完整后才处理"""
+        source = self._path('source.kmz')
+        with zipfile.ZipFile(source, 'w') as archive:
+            archive.writestr('doc.kml', '<kml/>' * 100)
+        with open(source, 'rb') as file:
+            data = file.read()
+
+        path = self._path('Sheet_finished_points_and_tracks_20250831.kmz')
+        with open(path, 'wb') as file:
+            file.write(data[:len(data) // 2])
+        self.pipeline.submit(path)
+        time.sleep(DEBOUNCE_SECONDS * 5)
+        self.assertEqual(self.calls, [])
+        self.assertGreater(self.pipeline.pending_count(), 0)
+
+        with open(path, 'ab') as file:
+            file.write(data[len(data) // 2:])
+        self.pipeline.submit(path)
+        self.assertTrue(self.pipeline.wait_idle(timeout=10))
+        self.assertEqual(self.calls, [(path, len(data))])
+
+    def test_repeated_events_coalesce(self):
+        """测试同一文件的多次事件只处理一次, 不同文件各处理一次"""
+        first = self._path('first.txt')
+        second = self._path('second.txt')
+        for path in (first, second):
+            with open(path, 'wb') as file:
+                file.write(b'data')
+
+        for _ in range(20):
+            self.pipeline.submit(first)
+            self.pipeline.submit(second)
+        self.assertTrue(self.pipeline.wait_idle(timeout=10))
+
+        self.assertEqual(sorted(path for path, _ in self.calls), [first, second])
+
+    def test_deleted_file_is_skipped(self):
+        """测试到期检查前已被删除的文件不会被处理"""
+        path = self._path('temporary.txt')
+        with open(path, 'wb') as file:
+            file.write(b'data')
+        self.pipeline.submit(path)
+        os.remove(path)
+
+        self.assertTrue(self.pipeline.wait_idle(timeout=10))
+        self.assertEqual(self.calls, [])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,217 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+图幅集合监控器测试
+
+使用模拟的图幅管理器和图幅对象, 不读取图幅信息表和工作文件夹
+"""
+
+import unittest
+import sys
+import os
+import time
+import threading
+from types import SimpleNamespace
+from unittest import mock
+
+# 添加项目根目录到Python路径
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.monitor import mapsheet_monitor
+from core.monitor.mapsheet_monitor import MonitorMapSheetCollection
+
+
+def _mapsheet(name, planned=True, finished=False):
+    """模拟的图幅对象"""
+    return SimpleNamespace(mapsheetFileName=name, fileToReceiveFlag=planned, finished=finished,
+                           currentfilename='current.kmz' if finished else None)
+
+
+class MonitorCollectionTestCase(unittest.TestCase):
+    """每个测试使用新的图幅集合单例"""
+
+    def setUp(self):
+        MonitorMapSheetCollection._instance = None
+        self.manager = mock.Mock()
+        self.manager._config_manager.get.return_value = 2
+        self.config = {'monitoring': {'lazy_startup': False}}
+        patches = [
+            mock.patch.object(mapsheet_monitor, 'get_mapsheet_manager', return_value=self.manager),
+            mock.patch.object(mapsheet_monitor, 'ConfigManager'),
+        ]
+        for patcher in patches:
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        mapsheet_monitor.ConfigManager.return_value.get_config.return_value = self.config
+
+    def tearDown(self):
+        MonitorMapSheetCollection._instance = None
+        MonitorMapSheetCollection._maps_info = None
+
+
+class TestCollectionStateChanges(MonitorCollectionTestCase):
+    """测试收集状态变化时的计数和唤醒"""
+
+    def setUp(self):
+        super().setUp()
+        self.manager.create_mapsheet_collection.return_value = [
+            _mapsheet('A'), _mapsheet('B'), _mapsheet('C', planned=False),
+        ]
+        self.collection = MonitorMapSheetCollection(None)
+
+    def test_initial_counts(self):
+        """测试初始化时统计有计划且未完成的图幅"""
+        self.assertEqual(self.collection.get_planned_counts(), (2, 3, 2))
+        self.assertEqual(self.collection.to_collect_names, ['A', 'B'])
+
+    def test_mark_finished_wakes_waiter(self):
+        """测试收到完成文件后等待状态变化的线程立即被唤醒, 计数同步更新"""
+        version = self.collection.version
+        result = {}
+
+        def wait():
+            started = time.monotonic()
+            result['version'] = self.collection.wait_for_change(version, timeout=10)
+            result['elapsed'] = time.monotonic() - started
+
+        waiter = threading.Thread(target=wait)
+        waiter.start()
+        time.sleep(0.1)
+        self.assertTrue(waiter.is_alive())
+
+        self.collection.mark_finished(self.collection.get_mapsheet_by_name('A'))
+        waiter.join(5)
+        self.assertFalse(waiter.is_alive())
+        self.assertEqual(result['version'], version + 1)
+        self.assertLess(result['elapsed'], 5)
+        self.assertEqual(self.collection.get_planned_counts(), (2, 3, 1))
+        self.assertEqual(self.collection.get_remaining_count(), 1)
+        self.assertFalse(self.collection.is_collection_complete())
+
+        self.collection.mark_finished(self.collection.get_mapsheet_by_name('B'))
+        self.assertTrue(self.collection.is_collection_complete())
+        self.assertEqual(self.collection.get_planned_counts(), (2, 3, 0))
+
+    def test_wait_for_change_timeout(self):
+        """测试状态未变化时等待超时, 返回原版本号"""
+        version = self.collection.version
+        self.assertEqual(self.collection.wait_for_change(version, timeout=0.05), version)
+
+    def test_mark_plan_updated(self):
+        """测试收到计划文件后递增版本号, 不改变完成计数"""
+        version = self.collection.version
+        self.collection.mark_plan_updated(self.collection.get_mapsheet_by_name('C'))
+        self.assertEqual(self.collection.wait_for_change(version, timeout=0), version + 1)
+        self.assertEqual(self.collection.get_planned_counts(), (2, 3, 2))
+
+
+class TestLazyStartup(MonitorCollectionTestCase):
+    """测试延迟启动: 先用占位对象建立图幅列表, 后台载入完成后替换"""
+
+    # 工作文件夹中已有当天完成文件的图幅（占位对象据此判断完成状态）
+    workspace_finished = ()
+    # 载入时在微信文件夹中找到当天文件的图幅
+    loaded_finished = ('A',)
+
+    def setUp(self):
+        super().setUp()
+        self.config['monitoring']['lazy_startup'] = True
+        self.manager.maps_info = {1.0: {'File Name': 'A'}, 2.0: {'File Name': 'B'}}
+        self.manager.get_sequence_mapsheet_filenames.return_value = ['A', 'B']
+
+        # 后台载入在对应的事件被设置后才完成
+        self.release = {'A': threading.Event(), 'B': threading.Event()}
+        self.addCleanup(lambda: [event.set() for event in self.release.values()])
+
+        def load(name, current_date):
+            self.release[name].wait(10)
+            return _mapsheet(name, finished=(name in self.loaded_finished))
+
+        def pending(name, current_date, info):
+            return SimpleNamespace(mapsheetFileName=name, fileToReceiveFlag=True,
+                                   finished=(name in self.workspace_finished), pending=True)
+
+        for name, replacement in (('MonitorMapSheet', mock.Mock(side_effect=load)),
+                                  ('PendingMonitorMapSheet', pending)):
+            patcher = mock.patch.object(mapsheet_monitor, name, replacement)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+        self.collection = MonitorMapSheetCollection(None)
+
+    @staticmethod
+    def _wait_until(predicate, timeout=5.0):
+        deadline = time.monotonic() + timeout
+        while not predicate():
+            if time.monotonic() > deadline:
+                return False
+            time.sleep(0.01)
+        return True
+
+    def test_placeholders_before_loading(self):
+        """测试载入完成前使用占位对象, 按文件检查结果统计计划"""
+        self.assertTrue(all(getattr(mapsheet, 'pending', False) for mapsheet in self.collection.mapsheet_collection))
+        self.assertEqual(self.collection.mapsheet_names, ['A', 'B'])
+        self.assertEqual(self.collection.get_planned_counts(), (2, 2, 2))
+        self.assertFalse(self.collection.wait_loaded(timeout=0.05))
+
+    def test_get_mapsheet_waits_for_its_own_load(self):
+        """测试按名称获取图幅时只等待该图幅载入完成, 并替换占位对象"""
+        result = {}
+        getter = threading.Thread(target=lambda: result.setdefault('B', self.collection.get_mapsheet_by_name('B')))
+        getter.start()
+        time.sleep(0.1)
+        self.assertTrue(getter.is_alive())
+
+        self.release['B'].set()
+        getter.join(5)
+        self.assertFalse(getter.is_alive())
+        self.assertEqual(result['B'].mapsheetFileName, 'B')
+        self.assertFalse(hasattr(result['B'], 'pending'))
+        self.assertTrue(self._wait_until(lambda: self.collection.mapsheet_collection[1] is result['B']))
+        # A 仍在载入中
+        self.assertTrue(getattr(self.collection.mapsheet_collection[0], 'pending', False))
+
+    def test_loaded_finished_mapsheet_updates_state(self):
+        """测试载入时发现当天文件已存在的图幅从待收集列表中移除, 并唤醒等待的线程"""
+        version = self.collection.version
+        self.release['A'].set()
+
+        self.assertEqual(self.collection.wait_for_change(version, timeout=5), version + 1)
+        self.assertEqual(self.collection.to_collect_names, ['B'])
+        self.assertEqual(self.collection.get_planned_counts(), (2, 2, 1))
+
+        self.release['B'].set()
+        self.assertTrue(self.collection.wait_loaded(timeout=5))
+        self.assertTrue(self._wait_until(
+            lambda: not any(getattr(mapsheet, 'pending', False) for mapsheet in self.collection.mapsheet_collection)
+        ))
+
+
+class TestLazyStartupWorkspaceOnly(TestLazyStartup):
+    """测试工作文件夹中已有当天文件、但微信文件夹中没有时, 载入后图幅重新加入待收集列表"""
+
+    workspace_finished = ('A', 'B')
+    loaded_finished = ('B',)
+
+    def test_placeholders_before_loading(self):
+        """测试载入完成前按工作文件夹中的文件统计, 两个图幅均已完成"""
+        self.assertEqual(self.collection.to_collect_names, [])
+        self.assertEqual(self.collection.get_planned_counts(), (2, 2, 0))
+
+    def test_loaded_finished_mapsheet_updates_state(self):
+        """测试载入后未完成的图幅按图幅顺序重新加入待收集列表, 已完成的图幅保持不变"""
+        version = self.collection.version
+        self.release['B'].set()
+        self.assertTrue(self._wait_until(lambda: not getattr(self.collection.mapsheet_collection[1], 'pending', False)))
+        self.assertEqual(self.collection.version, version)
+
+        self.release['A'].set()
+        self.assertEqual(self.collection.wait_for_change(version, timeout=5), version + 1)
+        self.assertEqual(self.collection.to_collect_names, ['A'])
+        self.assertEqual(self.collection.get_planned_counts(), (2, 2, 1))
+        self.assertFalse(self.collection.is_collection_complete())
+
+
+if __name__ == '__main__':
+    unittest.main()
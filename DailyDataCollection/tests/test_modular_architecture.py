@@ -70,6 +70,36 @@ class TestCoreModules(unittest.TestCase):
         except Exception as e:
             print(f"工具函数测试警告: {e}")
 
+    def test_file_name_index(self):
+        """测试文件名索引与关键字搜索结果一致"""
+        import tempfile
+        from core.utils import FileNameIndex
+
+        with tempfile.TemporaryDirectory() as tmpdir:
+            subdir = os.path.join(tmpdir, "2025-08")
+            os.makedirs(subdir)
+            for name in ["Sheet_finished_points_and_tracks_20250831.kmz",
+                         "Sheet_plan_routes_20250901.kmz", "notes_20250831.txt"]:
+                open(os.path.join(subdir, name), "w").close()
+
+            index = FileNameIndex(tmpdir)
+            keywords = ["20250831", "sheet", "finished_points_and_tracks", ".kmz"]
+            self.assertEqual(index.search(keywords),
+                             sorted(list_fullpath_of_files_with_keywords(tmpdir, keywords)))
+            self.assertEqual(len(index), 2)
+
+            # 按 (图幅, 日期, 类型) 查找与关键字搜索结果一致
+            self.assertEqual(index.find("Sheet", "20250831", "finished_points_and_tracks"),
+                             index.search(keywords))
+            self.assertEqual(index.find("Sheet", "20250831", "plan_routes"), [])
+            self.assertEqual(index.find(kind="plan_routes"),
+                             [os.path.join(subdir, "Sheet_plan_routes_20250901.kmz")])
+
+            # 删除文件后查找结果同步更新
+            os.remove(os.path.join(subdir, "Sheet_plan_routes_20250901.kmz"))
+            index.refresh()
+            self.assertEqual(index.find(kind="plan_routes"), [])
+
 
 class TestIntegration(unittest.TestCase):
     """测试模块集成功能"""
@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+观测数据减法测试
+
+ObservationData.__sub__ 的结果须与原先逐项比较的实现一致
+"""
+
+import unittest
+import sys
+import os
+
+# 添加项目根目录到Python路径
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.data_models.observation_data import ObservationData
+from core.data_models.point_store import PointStore
+
+
+def _points(*obsids):
+    return {obsid: {'longitude': 30.0 + index, 'latitude': 10.0 + index} for index, obsid in enumerate(obsids)}
+
+
+class TestObservationDataSubtraction(unittest.TestCase):
+    """测试观测数据的差集计算"""
+
+    def test_points_difference(self):
+        """测试点要素差集与字典差集一致"""
+        today_points = _points('12345A001', '12345A002', '12345A003', '12345A004')
+        last_points = {key: today_points[key] for key in ('12345A001', '12345A003')}
+        today = ObservationData.from_parsed(today_points, [])
+        last = ObservationData.from_parsed(last_points, [])
+
+        increase = today - last
+        expected = {key: value for key, value in today_points.items() if key not in last_points}
+        self.assertEqual(dict(increase.points.items()), expected)
+        self.assertEqual(list(increase.points), list(expected))
+        self.assertEqual(increase.pointsCount, 2)
+
+    def test_routes_with_duplicates(self):
+        """测试重复的线要素: 未出现在减数中的重复项全部保留, 出现过的全部移除"""
+        today = ObservationData.from_parsed({}, ['r1', 'r2', 'r2', 'r3', 'r4', 'r4'])
+        last = ObservationData.from_parsed({}, ['r1', 'r3', 'r3'])
+
+        increase = today - last
+        expected = [route for route in today.routes if route not in last.routes]
+        self.assertEqual(increase.routes, expected)
+        self.assertEqual(increase.routes, ['r2', 'r2', 'r4', 'r4'])
+        self.assertEqual(increase.routesCount, 4)
+
+    def test_routes_replaced_in_place(self):
+        """测试减数的线要素被原地替换（数量不变）后, 再次相减使用新的线要素"""
+        today = ObservationData.from_parsed({}, ['r1', 'r2', 'r3'])
+        last = ObservationData.from_parsed({}, ['r1', 'r2'])
+        self.assertEqual((today - last).routes, ['r3'])
+
+        last.routes[1] = 'r3'
+        self.assertEqual((today - last).routes, ['r2'])
+
+    def test_not_subset(self):
+        """测试上一次的点要素不是当天点要素的子集时返回空结果"""
+        today = ObservationData.from_parsed(_points('12345A001', '12345A002'), ['r1'])
+        last = ObservationData.from_parsed(_points('12345A003'), [])
+
+        increase = today - last
+        self.assertEqual(len(increase.points), 0)
+        self.assertEqual(increase.routes, [])
+
+    def test_dict_points(self):
+        """测试未启用列式存储时结果一致"""
+        compact = ObservationData.COMPACT_POINTS
+        ObservationData.COMPACT_POINTS = False
+        try:
+            today = ObservationData.from_parsed(_points('12345A001', '12345A002'), [])
+            last = ObservationData.from_parsed(_points('12345A001'), [])
+            increase = today - last
+        finally:
+            ObservationData.COMPACT_POINTS = compact
+        self.assertNotIsInstance(increase.points, PointStore)
+        self.assertEqual(list(increase.points), ['12345A002'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+点要素列式存储测试
+
+PointStore 的合并、去重和差集结果须与原先基于字典的实现一致
+"""
+
+import unittest
+import sys
+import os
+import tempfile
+
+# 添加项目根目录到Python路径
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.data_models.point_store import PointStore
+
+
+def _points(*items):
+    """由 (OBSID, 经度, 纬度) 构建点要素字典"""
+    return {obsid: {'longitude': longitude, 'latitude': latitude} for obsid, longitude, latitude in items}
+
+
+class TestPointStore(unittest.TestCase):
+    """测试点要素列式存储"""
+
+    def setUp(self):
+        self.first = _points(('12345A001', 30.1, 10.1), ('12345A002', 30.2, 10.2), ('12345A003', 30.3, 10.3))
+        self.second = _points(('12345A004', 31.4, 11.4), ('12345A002', 31.2, 11.2), ('12345A005', 31.5, 11.5))
+
+    def test_mapping_interface(self):
+        """测试只读字典接口"""
+        store = PointStore.from_mapping(self.first)
+        self.assertEqual(len(store), 3)
+        self.assertIn('12345A002', store)
+        self.assertNotIn('12345A009', store)
+        self.assertEqual(store['12345A003'], {'longitude': 30.3, 'latitude': 10.3})
+        self.assertEqual(store.to_dict(), self.first)
+
+    def test_concat_matches_dict_update(self):
+        """测试合并结果与依次调用 dict.update 的顺序和坐标一致"""
+        expected = {}
+        expected.update(self.first)
+        expected.update(self.second)
+
+        merged = PointStore.concat([self.first, PointStore.from_mapping(self.second)])
+        self.assertEqual(list(merged.items()), list(expected.items()))
+
+    def test_constructor_deduplicates_like_dict(self):
+        """测试重复的 OBSID 保留首次出现的位置和最后一次出现的坐标"""
+        store = PointStore(['B', 'A', 'B', 'C', 'A'], [1.0, 2.0, 3.0, 4.0, 5.0], [6.0, 7.0, 8.0, 9.0, 10.0])
+
+        expected = {}
+        for obsid, longitude, latitude in zip('BABCA', [1.0, 2.0, 3.0, 4.0, 5.0], [6.0, 7.0, 8.0, 9.0, 10.0]):
+            expected[obsid] = {'longitude': longitude, 'latitude': latitude}
+        self.assertEqual(list(store.items()), list(expected.items()))
+
+    def test_difference_matches_dict_diff(self):
+        """测试差集结果与字典推导式的差集一致, 减数可以是字典或 PointStore"""
+        today = {**self.first, **self.second}
+        yesterday = self.first
+        expected = {key: value for key, value in today.items() if key not in yesterday}
+
+        store = PointStore.from_mapping(today)
+        self.assertEqual(list(store.difference(yesterday).items()), list(expected.items()))
+        self.assertEqual(list(store.difference(PointStore.from_mapping(yesterday)).items()),
+                         list(expected.items()))
+        self.assertEqual(len(store.difference(store)), 0)
+        self.assertEqual(store.difference({}).to_dict(), today)
+
+    def test_save_and_load(self):
+        """测试保存为 .npz 文件后载入结果一致"""
+        store = PointStore.concat([self.first, self.second])
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = os.path.join(tmpdir, 'points.npz')
+            store.save(path)
+            self.assertEqual(list(PointStore.load(path).items()), list(store.items()))
+
+
+if __name__ == '__main__':
+    unittest.main()
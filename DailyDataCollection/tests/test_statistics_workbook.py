@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+累计统计工作簿测试
+
+直接修改工作表 XML 的结果须能被 openpyxl 正确读取, 包含公式的单元格不得被覆盖
+"""
+
+import unittest
+import sys
+import os
+import tempfile
+import zipfile
+from datetime import datetime
+
+from openpyxl import Workbook, load_workbook
+from openpyxl.utils.datetime import CALENDAR_MAC_1904
+
+# 添加项目根目录到Python路径
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.reports.statistics_workbook import PatchNotApplicable, StatisticsWorkbook
+
+
+class TestStatisticsWorkbook(unittest.TestCase):
+    """测试累计统计工作簿的日期查找和写入"""
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmpdir.name, 'Daily_statistics_details.xlsx')
+
+        workbook = Workbook()
+        workbook.active.title = '说明'
+        sheet = workbook.create_sheet('总表')
+        for col in range(1, 9):
+            sheet.cell(row=1, column=col, value=f'信息{col}')
+        # 日期列: 日期值、文本日期、日期值
+        sheet.cell(row=1, column=9, value=datetime(2025, 8, 30))
+        sheet.cell(row=1, column=10, value='2025-08-31')
+        sheet.cell(row=1, column=11, value=datetime(2025, 9, 1))
+        for row in range(2, 5):
+            sheet.cell(row=row, column=1, value=f'Sheet {row}')
+            sheet.cell(row=row, column=9, value=row * 10)
+        sheet['K3'] = '=SUM(I3:J3)'
+        sheet['L2'] = '=SUM(I2:K2)'
+        workbook.save(self.path)
+
+        self.workbook = StatisticsWorkbook(self.path, '总表')
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def test_find_date_column(self):
+        """测试按日期值和文本日期查找列号, 并生成日期索引文件"""
+        self.assertEqual(self.workbook.find_date_column(datetime(2025, 8, 30)), 9)
+        self.assertEqual(self.workbook.find_date_column(datetime(2025, 8, 31)), 10)
+        self.assertEqual(self.workbook.find_date_column(datetime(2025, 9, 1)), 11)
+        self.assertIsNone(self.workbook.find_date_column(datetime(2025, 9, 2)))
+        self.assertTrue(os.path.exists(self.workbook.index_path))
+
+        # 工作簿未变化时直接读取索引
+        self.assertEqual(self.workbook._load_index(), self.workbook.date_columns())
+
+    def test_find_date_column_1904(self):
+        """测试使用 1904 日期系统的工作簿（Mac 版 Excel 创建）按正确的日期查找列号"""
+        workbook = Workbook()
+        workbook.epoch = CALENDAR_MAC_1904
+        sheet = workbook.active
+        sheet.title = '总表'
+        sheet.cell(row=1, column=9, value=datetime(2025, 8, 30))
+        sheet.cell(row=1, column=10, value=datetime(2025, 8, 31))
+        path = os.path.join(self.tmpdir.name, 'mac_statistics.xlsx')
+        workbook.save(path)
+
+        mac_workbook = StatisticsWorkbook(path, '总表')
+        self.assertEqual(mac_workbook.find_date_column(datetime(2025, 8, 30)), 9)
+        self.assertEqual(mac_workbook.find_date_column(datetime(2025, 8, 31)), 10)
+
+    def test_write_column_round_trip(self):
+        """测试写入的数值可由 openpyxl 读取, 其余单元格和公式保持不变"""
+        self.workbook.write_column(10, 2, [5, 7.5, None])
+
+        workbook = load_workbook(self.path)
+        sheet = workbook['总表']
+        self.assertEqual(sheet['J2'].value, 5)
+        self.assertEqual(sheet['J3'].value, 7.5)
+        self.assertIsNone(sheet['J4'].value)
+        self.assertEqual(sheet['I3'].value, 30)
+        self.assertEqual(sheet['A4'].value, 'Sheet 4')
+        self.assertEqual(sheet['K3'].value, '=SUM(I3:J3)')
+        self.assertEqual(sheet['L2'].value, '=SUM(I2:K2)')
+        self.assertEqual(workbook.sheetnames, ['说明', '总表'])
+
+        # 打开时重新计算公式
+        with zipfile.ZipFile(self.path) as archive:
+            self.assertIn(b'fullCalcOnLoad="1"', archive.read('xl/workbook.xml'))
+
+        # 第1行未改动, 写入后日期索引仍然有效
+        self.assertEqual(self.workbook.find_date_column(datetime(2025, 8, 31)), 10)
+
+    @unittest.skipIf(os.name == 'nt', 'Windows 不使用 POSIX 权限位')
+    def test_write_column_keeps_file_mode(self):
+        """测试替换后的工作簿保留原有的文件权限"""
+        os.chmod(self.path, 0o664)
+        self.workbook.write_column(10, 2, [1, 2, 3])
+        self.assertEqual(os.stat(self.path).st_mode & 0o777, 0o664)
+
+    def test_refuse_formula_cells(self):
+        """测试目标单元格包含公式时拒绝修改, 原文件保持不变"""
+        with open(self.path, 'rb') as file:
+            original = file.read()
+
+        with self.assertRaises(PatchNotApplicable):
+            self.workbook.write_column(11, 2, [1, 2, 3])
+
+        with open(self.path, 'rb') as file:
+            self.assertEqual(file.read(), original)
+        self.assertEqual([name for name in os.listdir(self.tmpdir.name) if name.endswith('.tmp')], [])
+
+
+if __name__ == '__main__':
+    unittest.main()